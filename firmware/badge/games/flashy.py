@@ -11,6 +11,9 @@ import gui.fonts.arial10 as arial10
 from gui.core.colors import *
 from bdg.widgets.hidden_active_widget import HiddenActiveWidget
 from bdg.bleds import clear_leds, dimm_gamma, L_PINK
+from bdg.log import get_log
+
+log = get_log(__name__)
 
 
 class Flashy(Screen):
@@ -84,7 +87,7 @@ class Flashy(Screen):
 
     # Radio button callback
     def set_mode(self, button, mode):
-        print("Mode selected:", mode)
+        log.debug("Mode selected: %s", mode)
         self.mode = mode
 
     # Screen lifecycle
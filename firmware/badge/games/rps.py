@@ -10,6 +10,9 @@ from gui.core.writer import CWriter
 from gui.fonts import font10
 import gui.fonts.arial10 as arial10
 from gui.core.colors import *
+from bdg.log import get_log
+
+log = get_log(__name__)
 
 
 # -----------------------------
@@ -17,6 +20,9 @@ from gui.core.colors import *
 # -----------------------------
 @AppMsg.register
 class RpsMove(BadgeMsg):
+    _tid = 24
+    _fields = ("weapon",)
+
     def __init__(self, weapon=None):
         super().__init__()
         self.weapon = weapon
@@ -24,6 +30,9 @@ class RpsMove(BadgeMsg):
 
 @AppMsg.register
 class MatchOver(BadgeMsg):
+    _tid = 25
+    _fields = ("winner",)
+
     def __init__(self, winner=None):
         super().__init__()
         self.winner = winner
@@ -31,6 +40,9 @@ class MatchOver(BadgeMsg):
 
 @AppMsg.register
 class Nickname(BadgeMsg):
+    _tid = 26
+    _fields = ("nick",)
+
     def __init__(self, nick=None):
         super().__init__()
         self.nick = nick
@@ -156,7 +168,7 @@ class RpsScreen(Screen):
     # Lifecycle
     # -----------------------------
     def on_open(self):
-        Beacon.suspend(True)
+        Beacon.busy(True)
 
         if self.conn and not hasattr(self.conn, "_rps_reader_started"):
             self.conn._rps_reader_started = True
@@ -169,7 +181,7 @@ class RpsScreen(Screen):
             pass
 
     def on_hide(self):
-        Beacon.suspend(False)
+        Beacon.busy(False)
         if self.round_timeout_task:
             self.round_timeout_task.cancel()
             self.round_timeout_task = None
@@ -179,7 +191,7 @@ class RpsScreen(Screen):
             await asyncio.sleep(0.1)
 
         async for msg in self.conn.get_msg_aiter():
-            print("RPS RECEIVED:", msg.msg_type, msg.__dict__)
+            log.debug("RPS RECEIVED: %s %s", msg.msg_type, msg.__dict__)
 
             if msg.msg_type == "ConTerm":
                 self.ready_for_input = False
@@ -232,14 +244,14 @@ class RpsScreen(Screen):
             return
 
         if self.my_weapon is not None:
-            print("IGNORED duplicate LOCAL PICK")
+            log.debug("IGNORED duplicate LOCAL PICK")
             return
 
         if not self.ready_for_input or self.round_resolved:
-            print("IGNORED LOCAL PICK (not ready)")
+            log.debug("IGNORED LOCAL PICK (not ready)")
             return
 
-        print("LOCAL PICK:", player_weapon)
+        log.debug("LOCAL PICK: %s", player_weapon)
 
         self.ready_for_input = False
         self.my_weapon = player_weapon
@@ -280,10 +292,10 @@ class RpsScreen(Screen):
             return
 
         if self.remote_move_received_this_round:
-            print("IGNORED duplicate REMOTE PICK")
+            log.debug("IGNORED duplicate REMOTE PICK")
             return
 
-        print("REMOTE PICK:", weapon)
+        log.debug("REMOTE PICK: %s", weapon)
 
         self.remote_move_received_this_round = True
         self.their_weapon = weapon
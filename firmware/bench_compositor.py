@@ -0,0 +1,160 @@
+"""
+Moving sprites, saved backgrounds against the compositor.
+
+SPRITES sprites of 16x16 with transparent corners bounce around a 320x170
+RGB565 screen over a striped background for FRAMES frames, overlapping each
+other as they go. Sprite.show() used to put back the background it saved,
+save the background at the new place with blit_to_buf()'s Python loop and
+blit the sprite, one sprite after the other (saved). bdg.widgets.sprite now
+moves layers of a Compositor and composes the rectangles they left and
+entered (compositor). Per way:
+    ms/frame    moving every sprite and drawing the frame
+    KB/frame    drawn onto the screen, what DirtyDisplay then sends
+    wrong px    pixels that differ from the background with the sprites
+                drawn over it in order, saved backgrounds of overlapping
+                sprites put back each other's pixels
+On CPython host.py's framebuf blits with a colour key pixel by pixel, the
+badge numbers are the ones that count.
+
+Unix port: make sim_exec CMD='import bench_compositor'
+CPython: make host_exec CMD='import bench_compositor'
+Badge: make dev_exec CMD='import bench_compositor'
+"""
+
+import framebuf
+import time
+
+from bdg.utils import blit_to_buf
+from bdg.widgets.compositor import Compositor
+from bdg.widgets.sprite_frames import SpriteBuffer
+
+try:
+    import tracemalloc  # host.py traces allocations, it would be most of the time
+
+    tracemalloc.stop()
+except ImportError:
+    pass
+
+W = 320
+H = 170
+SIZE = 16
+SPRITES = (1, 10, 30)
+FRAMES = 20
+KEY = 0
+
+
+class Screen(SpriteBuffer):
+    # counts what is blitted onto it
+    def __init__(self):
+        super().__init__(W, H)
+        self.drawn = 0
+
+    def blit(self, fbuf, x, y, key=-1, palette=None):
+        if isinstance(fbuf, tuple):
+            self.drawn += fbuf[1] * fbuf[2] * 2
+        else:
+            self.drawn += fbuf.width * fbuf.height * 2
+        super().blit(fbuf, x, y, key)
+
+
+def background(ssd):
+    for y in range(0, H, 10):
+        ssd.fill_rect(0, y, W, 10, 0x18E3 if y % 20 else 0x4208)
+
+
+def sprites(n):
+    frames = []
+    for i in range(n):
+        f = SpriteBuffer(SIZE, SIZE)
+        f.fill(KEY)
+        f.fill_rect(2, 2, SIZE - 4, SIZE - 4, 0xF800 | (i * 0x0841) & 0x07FF)
+        frames.append(f)
+    return frames
+
+
+def paths(n):
+    # start and speed of each, the same for both ways
+    p = []
+    for i in range(n):
+        p.append([(i * 37) % (W - SIZE), (i * 23) % (H - SIZE), 1 + i % 4, 1 + (i * 3) % 4])
+    return p
+
+
+def step(p):
+    for s in p:
+        s[0] += s[2]
+        s[1] += s[3]
+        if not 0 <= s[0] <= W - SIZE:
+            s[2] = -s[2]
+            s[0] += 2 * s[2]
+        if not 0 <= s[1] <= H - SIZE:
+            s[3] = -s[3]
+            s[1] += 2 * s[3]
+
+
+def saved(ssd, frames, p):
+    # Sprite.show() before the compositor
+    stores = []
+    for f, s in zip(frames, p):
+        bg = SpriteBuffer(SIZE, SIZE)
+        blit_to_buf(ssd, bg.mvb, SIZE, SIZE, s[1], s[0])
+        ssd.blit(f, s[0], s[1], KEY)
+        stores.append([bg, s[0], s[1]])
+
+    def frame():
+        step(p)
+        for f, s, st in zip(frames, p, stores):
+            ssd.blit(st[0], st[1], st[2])
+            blit_to_buf(ssd, st[0].mvb, SIZE, SIZE, s[1], s[0])
+            ssd.blit(f, s[0], s[1], KEY)
+            st[1] = s[0]
+            st[2] = s[1]
+
+    return frame
+
+
+def composed(ssd, frames, p):
+    comp = Compositor(ssd)
+    comp.capture()
+    layers = [comp.add(f, s[0], s[1], KEY) for f, s in zip(frames, p)]
+    comp.compose()
+
+    def frame():
+        step(p)
+        for layer, s in zip(layers, p):
+            layer.move(s[0], s[1])
+        comp.compose()
+
+    return frame
+
+
+def run(way, n):
+    ssd = Screen()
+    background(ssd)
+    frames = sprites(n)
+    p = paths(n)
+    frame = way(ssd, frames, p)
+    ssd.drawn = 0
+    t = time.ticks_us()
+    for _ in range(FRAMES):
+        frame()
+    us = time.ticks_diff(time.ticks_us(), t)
+    ref = SpriteBuffer(W, H)
+    background(ref)
+    for f, s in zip(frames, p):
+        ref.blit(f, s[0], s[1], KEY)
+    a = ssd.mvb
+    b = ref.mvb
+    wrong = sum(1 for i in range(0, len(a), 2) if a[i] != b[i] or a[i + 1] != b[i + 1])
+    return us / FRAMES / 1000, ssd.drawn / FRAMES / 1024, wrong
+
+
+def main():
+    print(f"{'sprites':>7s} {'way':>10s} {'ms/frame':>8s} {'KB/frame':>8s} {'wrong px':>8s}")
+    for n in SPRITES:
+        for name, way in (("saved", saved), ("compositor", composed)):
+            ms, kb, wrong = run(way, n)
+            print(f"{n:7d} {name:>10s} {ms:8.2f} {kb:8.1f} {wrong:8d}")
+
+
+main()
@@ -0,0 +1,225 @@
+"""
+Frame cost of the display with and without dirty rectangles (bdg.display).
+
+A simulated ST7789 of the badge's 320x170 RGB565 panel: a framebuf with the
+driver's _wcd(), _dc, _cs and an SPI that counts bytes instead of sending
+them. show() sends the whole frame like the driver does. Each scenario draws
+FRAMES frames the way the screen does and calls show() after each, once on the
+plain driver and once with DirtyDisplay mixed in. Scenarios:
+    static      a menu drawn once, the GUI refresh loop keeps calling show()
+    label       a 100x16 label redrawn, GameLobbyScr's nick, "Time Left"
+    list        a 316x110 Listbox redrawn, scrolling the scanner list
+    tictac      one 30x30 tictac cell and its mark
+    cutefox     the cute fox demo: screen filled, 32x32 sprite at 6x
+Per scenario and display: KB sent per frame, ms per frame for drawing and
+show() (cpu, on CPython the slow framebuf of host.py) and the SPI transfer at
+SPI_HZ (spi). Dirty frames should cost about what changed, the cutefox full
+frames what they did before.
+
+Event loop lag: the SPI blocks for the time a transfer takes at SPI_HZ and a
+task that sleeps 1 ms measures how late it wakes up while the screen is
+refreshed for LAG_S, the way the GUI's refresh loop does it:
+    full        the plain driver's blocking show()
+    show        DirtyDisplay.show(), blocking
+    async       DirtyDisplay.do_refresh(), sliced
+Scenarios flash (whole screen filled every 50 ms, VibeDemo) and list (the
+scanner list redrawn every 50 ms). Lag p50/p99/max in ms and the frames
+sent per second. Sliced refreshes should keep max lag near budget_ms.
+
+Unix port: make sim_exec CMD='import bench_display'
+CPython: make host_exec CMD='import bench_display'
+Badge: make dev_exec CMD='import bench_display'
+"""
+
+import asyncio
+import framebuf
+import time
+
+from bdg.display import DirtyDisplay, CASET, RASET, RAMWR
+
+try:
+    import tracemalloc  # host.py traces allocations, it would be most of the lag
+
+    tracemalloc.stop()
+except ImportError:
+    pass
+
+W = 320
+H = 170
+FRAMES = 30
+SPI_HZ = 80_000_000
+LAG_S = 5
+DRAW_MS = 50
+
+
+class CountingSPI:
+    def __init__(self):
+        self.bytes = 0
+
+    def write(self, buf):
+        self.bytes += len(buf)
+
+
+class BlockingSPI(CountingSPI):
+    # takes as long as the transfer would
+    def write(self, buf):
+        super().write(buf)
+        if len(buf) > 64:  # commands, the sleep would cost more
+            time.sleep_us(len(buf) * 8_000_000 // SPI_HZ)
+
+
+class SimST7789(framebuf.FrameBuffer):
+    # the parts of drivers.st7789.st7789_16bit that DirtyDisplay uses
+    def __init__(self, width=W, height=H, spi=CountingSPI):
+        self.width = width
+        self.height = height
+        self.mode = framebuf.RGB565
+        self.buffer = bytearray(width * height * 2)
+        self.mvb = memoryview(self.buffer)
+        super().__init__(self.buffer, width, height, self.mode)
+        self._spi = spi()
+        self._dc = self._cs = lambda v: None
+        # ADAFRUIT_1_9 is offset 35 rows in the controller's RAM
+        self._wcd(CASET, bytes((0, 0, (width - 1) >> 8, (width - 1) & 0xFF)))
+        self._wcd(RASET, bytes((0, 35, (height + 34) >> 8, (height + 34) & 0xFF)))
+
+    def _wcd(self, c, d):
+        self._spi.write(c)
+        self._spi.write(d)
+
+    def show(self):
+        self._spi.write(RAMWR)
+        self._spi.write(self.mvb)
+
+
+class DirtySimST7789(DirtyDisplay, SimST7789):
+    pass
+
+
+def menu(ssd):
+    ssd.fill(0)
+    ssd.rect(2, 2, W - 4, H - 4, 0xFFFF)
+    for i in range(6):
+        ssd.fill_rect(20, 20 + 24 * i, 200, 20, 0x39E7)
+        ssd.text(f"Option {i}", 28, 26 + 24 * i, 0xFFFF)
+
+
+def static(ssd, i):
+    pass
+
+
+def label(ssd, i):
+    ssd.fill_rect(200, 140, 100, 16, 0)
+    ssd.text(f"Time Left {FRAMES - i}", 200, 144, 0xFFFF)
+
+
+def listbox(ssd, i):
+    ssd.fill_rect(2, 30, 316, 110, 0)
+    ssd.rect(2, 30, 316, 110, 0xFFFF)
+    for r in range(6):
+        ssd.text(f"Badge{i + r:03d} [-5{r}dBm]", 8, 36 + 18 * r, 0xFFFF)
+    ssd.fill_rect(4, 32 + 18 * (i % 6), 312, 18, 0x001F)
+
+
+def tictac(ssd, i):
+    x = 100 + 34 * (i % 3)
+    y = 30 + 34 * (i // 3 % 3)
+    ssd.fill_rect(x, y, 30, 30, 0)
+    ssd.line(x + 4, y + 4, x + 25, y + 25, 0xF800)
+    ssd.line(x + 25, y + 4, x + 4, y + 25, 0xF800)
+
+
+def cutefox(ssd, i):
+    ssd.fill(0x0320)
+    x = 40 + 2 * i
+    for r in range(0, 32, 2):
+        for c in range(0, 32, 2):
+            ssd.fill_rect(x + c * 6, 20 + r * 6, 12, 12, 0xFD20)
+    ssd.text("Badge", 220, 15, 0xFFFF)
+
+
+SCENARIOS = (
+    ("static", static),
+    ("label", label),
+    ("list", listbox),
+    ("tictac", tictac),
+    ("cutefox", cutefox),
+)
+
+
+def run(cls, draw):
+    ssd = cls()
+    menu(ssd)
+    ssd.show()
+    sent = ssd._spi.bytes
+    t = time.ticks_us()
+    for i in range(FRAMES):
+        draw(ssd, i)
+        ssd.show()
+    us = time.ticks_diff(time.ticks_us(), t)
+    sent = ssd._spi.bytes - sent
+    return sent / FRAMES / 1024, us / FRAMES / 1000, sent * 8 / SPI_HZ * 1000 / FRAMES
+
+
+def flash(ssd, i):
+    ssd.fill(0xFFFF if i & 1 else 0)
+
+
+async def lag(mode, draw):
+    ssd = (SimST7789 if mode == "full" else DirtySimST7789)(spi=BlockingSPI)
+    menu(ssd)
+    lags = []
+    frames = [0]
+    done = []
+
+    async def probe():
+        while not done:
+            t = time.ticks_us()
+            await asyncio.sleep_ms(1)
+            lags.append(time.ticks_diff(time.ticks_us(), t) / 1000 - 1)
+
+    async def app():
+        i = 0
+        while not done:
+            draw(ssd, i)
+            i += 1
+            await asyncio.sleep_ms(DRAW_MS)
+
+    async def refresh():
+        # Screen.auto_refresh
+        while not done:
+            n = ssd._spi.bytes
+            if mode == "async":
+                await ssd.do_refresh()
+            else:
+                ssd.show()
+                await asyncio.sleep_ms(0)
+            frames[0] += ssd._spi.bytes > n
+
+    tasks = [asyncio.create_task(f()) for f in (probe, app, refresh)]
+    await asyncio.sleep(LAG_S)
+    done.append(True)
+    await asyncio.sleep_ms(100)
+    for t in tasks:
+        t.cancel()
+    lags.sort()
+    n = len(lags)
+    return lags[n // 2], lags[n * 99 // 100], lags[-1], frames[0] / LAG_S
+
+
+def main():
+    print(f"{'scenario':>8s} {'display':>7s} {'KB/frame':>8s} {'cpu ms':>7s} {'spi ms':>7s}")
+    for name, draw in SCENARIOS:
+        for cls in (SimST7789, DirtySimST7789):
+            kb, cpu, spi = run(cls, draw)
+            kind = "dirty" if cls is DirtySimST7789 else "full"
+            print(f"{name:>8s} {kind:>7s} {kb:8.1f} {cpu:7.1f} {spi:7.2f}")
+    print()
+    print(f"{'scenario':>8s} {'refresh':>7s} {'lag p50':>7s} {'p99':>6s} {'max':>6s} {'frames/s':>8s}")
+    for name, draw in (("flash", flash), ("list", listbox)):
+        for mode in ("full", "show", "async"):
+            p50, p99, top, fps = asyncio.run(lag(mode, draw))
+            print(f"{name:>8s} {mode:>7s} {p50:7.1f} {p99:6.1f} {top:6.1f} {fps:8.1f}")
+
+
+main()
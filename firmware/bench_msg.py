@@ -0,0 +1,298 @@
+"""
+Messaging benchmarks with a baseline to catch bdg.msg regressions.
+
+Two badges A and B on a vradio Medium, each with its own NowListener,
+and a Connection between them. Cases:
+    send_app_msg    A streams N RPSMsgs, latency is send to B's in_q
+    send_wait_reply A sends an AppMsg and waits for B's echo, N times
+    lossy_reply     the same with LOSS of the frames lost on air
+    ping            Connection.ping(), B replies from the stack
+    rx_task         N AppMsg frames put straight into B's rx buffer, only
+                    NowListener.task and dispatch to in_q are timed
+Per case: msgs/s, latency p50/p95/p99 in ms, retries per delivered message,
+bytes on air per message and heap allocated per message (the virtual radio's
+share included). Pacing of the out_q is lifted so that the numbers are about
+the code, not about OutScheduler.rate.
+
+The first run saves its results as the baseline in bench_msg.json next to
+this file, one per platform. Later runs print the change against it and flag
+metrics that got more than TOLERANCE % worse. After an intended change:
+bench_msg.run(save=True)
+
+Unix port: make sim_exec CMD='import bench_msg'
+CPython: make host_exec CMD='import bench_msg'
+Badge, before the badge stack is started: make dev_exec CMD='import bench_msg'
+"""
+
+import asyncio
+import builtins
+import gc
+import json
+import sys
+import time
+
+import vradio
+
+vradio.install()
+
+from bdg.msg import AppMsg, BadgeMsg, RPSMsg, WIRE_COMPACT
+from bdg.msg.connection import NowListener
+from bdg.msg.scheduler import PRIO_APP
+
+N = 200  # messages per case
+LOSS = 0.05
+LATENCY_MS = 2
+CON_ID = 7
+MAC_A = b"\xb0\x00\x00\x00\x0a\x01"
+MAC_B = b"\xb0\x00\x00\x00\x0a\x02"
+REPLY_S = 5
+TOLERANCE = 15  # %
+
+# metric: (higher is better, change below this is noise)
+METRICS = {
+    "msgs_s": (True, 0),
+    "p50_ms": (False, 1.0),
+    "p95_ms": (False, 2.0),
+    "p99_ms": (False, 3.0),
+    "retries": (False, 0.05),
+    "air_b": (False, 4),
+    "heap_b": (False, 64),
+}
+
+# tails of the lossy case depend on which frames the loss hits, not on the code
+NOISY = {"lossy_reply": ("p95_ms", "p99_ms")}
+
+# both badges run this firmware, compact frames without beacons heard first
+BadgeMsg.wire_format = WIRE_COMPACT
+
+PLATFORM = f"{sys.implementation.name}-{sys.platform}"
+_dir = __file__.rpartition("/")[0]
+BASELINE = (_dir + "/" if _dir else "") + "bench_msg.json"
+
+_print = print
+
+
+def quiet(on):
+    # the stack prints every frame, that would be most of what gets measured
+    builtins.print = (lambda *args, **kwargs: None) if on else _print
+
+
+def pct(values, p):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, len(values) * p // 100)] / 1000
+
+
+class Pair:
+    def __init__(self):
+        self.medium = vradio.Medium(latency_ms=LATENCY_MS, seed=1)
+        self.nl_a = NowListener(self.medium.radio(MAC_A, rxbuf=8192), self.con_cb, shared=False)
+        self.nl_b = NowListener(self.medium.radio(MAC_B, rxbuf=64 * 1024), self.con_cb, shared=False)
+        for nl in (self.nl_a, self.nl_b):
+            nl.out_q.rate = 100_000
+            nl.out_q.burst = 1000
+        self.conn_b = None
+        self.echo = False
+        self.got = {}  # choice: ticks_us when B's in_q gave it
+
+    async def con_cb(self, conn, req=False):
+        if not req:
+            self.conn_b = conn
+            asyncio.create_task(self.serve(conn))
+        return True
+
+    async def serve(self, conn):
+        async for msg in conn.get_msg_aiter():
+            self.got[msg.choice] = time.ticks_us()
+            if self.echo:
+                conn.send_app_msg(RPSMsg(msg.choice))
+
+    async def open(self):
+        self.nl_a.run()
+        self.nl_b.run()
+        if not await self.nl_a.request_con(MAC_B, CON_ID):
+            raise RuntimeError("no connection")
+        self.conn = self.nl_a.connections[CON_ID]
+
+    def reset(self, loss=0.0):
+        self.medium.loss = loss
+        self.medium.reset()
+        self.got = {}
+        while not self.conn.in_q.empty():
+            self.conn.in_q.get_nowait()  # late replies of the previous case
+        for nl in (self.nl_a, self.nl_b):
+            nl.ack_stats.reset()
+
+    async def settle(self):
+        # until acks of the case are in, so they don't count for the next one
+        for _ in range(200):
+            if not self.nl_a.waiting_ack and not self.nl_b.waiting_ack:
+                return
+            await asyncio.sleep_ms(10)
+
+
+async def send_app_msg(pair, n):
+    sent = [0] * n
+    for i in range(n):
+        await pair.nl_a.out_q.room(PRIO_APP)
+        sent[i] = time.ticks_us()
+        pair.conn.send_app_msg(RPSMsg(i))
+    while len(pair.got) < n:
+        await asyncio.sleep_ms(1)
+    return [time.ticks_diff(pair.got[i], sent[i]) for i in range(n)]
+
+
+async def send_wait_reply(pair, n):
+    pair.echo = True
+    conn = pair.conn
+    lat = []
+    try:
+        for i in range(n):
+            t = time.ticks_us()
+            msg = AppMsg(RPSMsg(i), con_id=CON_ID, session_id=conn.session_id)
+            await conn.send_wait_reply(msg, timeout=REPLY_S)
+            lat.append(time.ticks_diff(time.ticks_us(), t))
+    finally:
+        pair.echo = False
+    return lat
+
+
+async def ping(pair, n):
+    lat = []
+    for i in range(n):
+        t = time.ticks_us()
+        await pair.conn.ping()
+        lat.append(time.ticks_diff(time.ticks_us(), t))
+    return lat
+
+
+async def rx_task(pair, n):
+    frames = []
+    for i in range(n):
+        msg = AppMsg(RPSMsg(i), con_id=CON_ID, session_id=pair.conn_b.session_id)
+        pair.nl_a._msg_id += 1  # ids B has not seen from A yet
+        msg.set_id(pair.nl_a._msg_id)
+        frames.append(msg.srlz())
+    radio = pair.medium.radios[MAC_B]
+    for frame in frames:
+        radio.rx(MAC_A, frame, -40)
+    while len(pair.got) < n:
+        await asyncio.sleep_ms(0)
+    return None
+
+
+CASES = (
+    ("send_app_msg", send_app_msg, 0.0),
+    ("send_wait_reply", send_wait_reply, 0.0),
+    ("lossy_reply", send_wait_reply, LOSS),
+    ("ping", ping, 0.0),
+    ("rx_task", rx_task, 0.0),
+)
+
+
+async def measure(pair, case, loss, n):
+    pair.reset(loss)
+    gc.collect()
+    gc.disable()  # mem_alloc only grows while the case runs
+    try:
+        heap = gc.mem_alloc()
+        t = time.ticks_us()
+        lat = await case(pair, n)
+        us = time.ticks_diff(time.ticks_us(), t)
+        heap = gc.mem_alloc() - heap
+    finally:
+        gc.enable()
+    await pair.settle()
+    retries = pair.nl_a.ack_stats.retries + pair.nl_b.ack_stats.retries
+    return {
+        "msgs_s": round(n * 1_000_000 / max(1, us)),
+        "p50_ms": pct(lat, 50),
+        "p95_ms": pct(lat, 95),
+        "p99_ms": pct(lat, 99),
+        "retries": round(retries / n, 3),
+        "air_b": pair.medium.bytes // n,
+        "heap_b": heap // n,
+    }
+
+
+async def main(n):
+    pair = Pair()
+    quiet(True)
+    try:
+        await pair.open()
+        results = {}
+        for name, case, loss in CASES:
+            results[name] = await measure(pair, case, loss, n)
+        await pair.conn.terminate()
+        await asyncio.sleep_ms(50)
+    finally:
+        quiet(False)
+    return results
+
+
+def load():
+    try:
+        with open(BASELINE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def compare(base, results, tolerance=TOLERANCE):
+    """Returns [(case, metric, baseline, now)] of metrics worse than tolerance %."""
+    worse = []
+    for name, _, _ in CASES:
+        metrics = results[name]
+        for k, (higher, noise) in METRICS.items():
+            if k in NOISY.get(name, ()):
+                continue
+            now, was = metrics.get(k), base.get(name, {}).get(k)
+            if now is None or was is None:
+                continue
+            change = now - was if higher else was - now  # negative is worse
+            if -change > noise and -change * 100 > abs(was) * tolerance:
+                worse.append((name, k, was, now))
+    return worse
+
+
+def _row(label, metrics):
+    row = f"{label:16s}"
+    for k in METRICS:
+        v = metrics.get(k)
+        row += f"{'-':>9s}" if v is None else f"{v:9.1f}" if isinstance(v, float) else f"{v:9d}"
+    return row
+
+
+def report(results, base, n):
+    print(f"\n{'='*78}")
+    print(f"{PLATFORM}, {n} messages per case")
+    print(f"{'case':16s}" + "".join(f"{k:>9s}" for k in METRICS))
+    for name, _, _ in CASES:
+        print(_row(name, results[name]))
+        if name in base:
+            print(_row("  baseline", base[name]))
+    print(f"{'='*78}")
+
+
+def run(save=False, n=N, tolerance=TOLERANCE):
+    """Runs the cases, returns False if a metric regressed against the baseline."""
+    results = asyncio.run(main(n))
+    baselines = load()
+    base = baselines.get(PLATFORM, {})
+    report(results, base, n)
+    if save or not base:
+        baselines[PLATFORM] = results
+        with open(BASELINE, "w") as f:
+            json.dump(baselines, f)
+        print(f"baseline for {PLATFORM} saved to {BASELINE}")
+        return True
+    worse = compare(base, results, tolerance)
+    for name, k, was, now in worse:
+        print(f"REGRESSION {name} {k}: {was} -> {now}")
+    if not worse:
+        print(f"no regressions over {tolerance}% against the baseline")
+    return not worse
+
+
+run()
@@ -0,0 +1,93 @@
+"""
+Draw time of a scaled sprite, fill_rect per pixel against pre-scaled frames.
+
+CuteFoxDemo draws a 32x32 sprite at 6x. It used to clear the screen and
+decode every pixel into a 6x6 fill_rect() for each frame (per pixel), it now
+blits frames that bdg.widgets.sprite.ScaledFrames scaled once (scaled). A
+sheet of FRAMES frames of made up pixels is drawn ROUNDS times round on a
+320x170 RGB565 framebuf. Per way:
+    first ms    the first round, scaling included
+    ms/frame    a frame after that
+    fps         frames per second that leaves room for at most
+    KB          memory of the scaled frames
+The scaled frames are checked to come out as the per pixel drawing did. On
+CPython host.py's framebuf is Python, the badge numbers are the ones that
+count.
+
+Unix port: make sim_exec CMD='import bench_sprite'
+CPython: make host_exec CMD='import bench_sprite'
+Badge: make dev_exec CMD='import bench_sprite'
+"""
+
+import framebuf
+import time
+
+from bdg.widgets.sprite_frames import ScaledFrames
+
+try:
+    import tracemalloc  # host.py traces allocations, it would be most of the time
+
+    tracemalloc.stop()
+except ImportError:
+    pass
+
+W = 320
+H = 170
+SIZE = 32
+SCALE = 6
+FRAMES = 5
+ROUNDS = 4
+X = 10
+Y = -32
+
+
+def sheet():
+    # big-endian RGB565 like the fox, a few colours in blocks
+    data = bytearray(FRAMES * SIZE * SIZE * 2)
+    seed = 1
+    for i in range(0, len(data), 8):
+        seed = (seed * 1103515245 + 12345) & 0x7FFFFFFF
+        c = (seed >> 8) & 0xFFFF
+        data[i : i + 8] = bytes((c >> 8, c & 0xFF)) * 4
+    return data
+
+
+def per_pixel(ssd, data, i):
+    # CuteFoxDemo._draw_sprite() before ScaledFrames
+    ssd.fill(0)
+    sprite = data[i * SIZE * SIZE * 2 : (i + 1) * SIZE * SIZE * 2]
+    for row in range(SIZE):
+        for col in range(SIZE):
+            o = (row * SIZE + col) * 2
+            pixel = (sprite[o] << 8) | sprite[o + 1]
+            ssd.fill_rect(X + col * SCALE, Y + row * SCALE, SCALE, SCALE, pixel)
+
+
+def run(draw):
+    buf = bytearray(W * H * 2)
+    ssd = framebuf.FrameBuffer(buf, W, H, framebuf.RGB565)
+    t = time.ticks_us()
+    for i in range(FRAMES):
+        draw(ssd, i)
+    first = time.ticks_diff(time.ticks_us(), t)
+    t = time.ticks_us()
+    for _ in range(ROUNDS - 1):
+        for i in range(FRAMES):
+            draw(ssd, i)
+    us = time.ticks_diff(time.ticks_us(), t) / ((ROUNDS - 1) * FRAMES)
+    return buf, first / 1000, us / 1000
+
+
+def main():
+    data = sheet()
+    frames = ScaledFrames(data, SIZE, SIZE, SCALE, swap=True)
+    old, first_o, ms_o = run(lambda ssd, i: per_pixel(ssd, data, i))
+    new, first_n, ms_n = run(lambda ssd, i: frames.blit(ssd, i, X, Y))
+    kb = len(frames._cache) * SIZE * SIZE * SCALE * SCALE * 2 / 1024
+    print(f"{SIZE}x{SIZE} at {SCALE}x, {FRAMES} frames, same pixels: {old == new}")
+    print(f"{'draw':>9s} {'first ms':>9s} {'ms/frame':>9s} {'fps':>7s} {'KB':>6s}")
+    print(f"{'per pixel':>9s} {first_o:9.1f} {ms_o:9.2f} {1000 / ms_o:7.0f} {0:6.0f}")
+    print(f"{'scaled':>9s} {first_n:9.1f} {ms_n:9.2f} {1000 / ms_n:7.0f} {kb:6.0f}")
+
+
+main()
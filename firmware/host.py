@@ -0,0 +1,210 @@
+"""
+MicroPython stand-ins for running the radio stack (bdg.msg) and bdg.display
+under CPython.
+
+Adds what they use from MicroPython to CPython's modules: time.ticks_* and
+sleep_ms, asyncio.sleep_ms and wait_for_ms, gc.mem_alloc and mem_free, the
+micropython module, a slow framebuf (RGB565 only, no text) and aioespnow as
+firmware/vradio.py. Puts firmware and frozen_firmware/modules on sys.path. Import
+it first:
+    make host_exec CMD='import bench_msg'
+or from the repo root: python3 -c 'import sys; sys.path[:0] = ["firmware"]; import host, bench_msg'
+
+gc.mem_alloc() is the memory CPython still holds (tracemalloc), so heap numbers
+show what a run keeps, not the allocation churn the MicroPython heap shows.
+CPython mangles __names, the legacy dict format of app messages does not
+decode here, the compact format does. The GUI does not run under CPython.
+"""
+
+import asyncio
+import gc
+import os
+import sys
+import time
+import tracemalloc
+import types
+
+_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for _p in ("frozen_firmware/modules", "firmware"):
+    _p = os.path.join(_root, _p)
+    if _p not in sys.path:
+        sys.path.insert(0, _p)
+
+# ticks wrap like on the badge, so ticks_diff bugs show up here too
+TICKS_PERIOD = 1 << 30
+_TICKS_MAX = TICKS_PERIOD - 1
+_TICKS_HALF = TICKS_PERIOD // 2
+
+
+def ticks_ms():
+    return time.monotonic_ns() // 1_000_000 & _TICKS_MAX
+
+
+def ticks_us():
+    return time.monotonic_ns() // 1000 & _TICKS_MAX
+
+
+def ticks_add(ticks, delta):
+    return (ticks + delta) & _TICKS_MAX
+
+
+def ticks_diff(ticks1, ticks2):
+    return ((ticks1 - ticks2 + _TICKS_HALF) & _TICKS_MAX) - _TICKS_HALF
+
+
+time.ticks_ms = ticks_ms
+time.ticks_us = ticks_us
+time.ticks_cpu = ticks_us
+time.ticks_add = ticks_add
+time.ticks_diff = ticks_diff
+time.sleep_ms = lambda ms: time.sleep(ms / 1000)
+time.sleep_us = lambda us: time.sleep(us / 1_000_000)
+
+
+def sleep_ms(ms):
+    # sleep_ms(0) goes behind tasks whose sleep is up, as on MicroPython, not
+    # ahead of them as asyncio.sleep(0)
+    return asyncio.sleep(ms / 1000 or 1e-9)
+
+
+def wait_for_ms(aw, timeout):
+    return asyncio.wait_for(aw, None if timeout is None else timeout / 1000)
+
+
+asyncio.sleep_ms = sleep_ms
+asyncio.wait_for_ms = wait_for_ms
+
+tracemalloc.start()
+gc.mem_alloc = lambda: tracemalloc.get_traced_memory()[0]
+gc.mem_free = lambda: 0
+gc.threshold = lambda amount=None: -1
+
+micropython = types.ModuleType("micropython")
+micropython.const = lambda value: value
+micropython.native = micropython.viper = lambda f: f
+micropython.mem_info = lambda verbose=None: print(f"traced {gc.mem_alloc()}B")
+micropython.schedule = lambda f, arg: f(arg)
+sys.modules.setdefault("micropython", micropython)
+
+
+
+class FrameBuffer:
+    # RGB565 only, text() draws nothing, ellipse() and poly() their box outline
+    def __init__(self, buf, width, height, mode, stride=None):
+        if mode != 1:
+            raise ValueError("RGB565 only")
+        self._buf = buf
+        self._fw = width
+        self._fh = height
+
+    def _run(self, x, y, w, c):
+        if y < 0 or y >= self._fh:
+            return
+        x0 = max(x, 0)
+        x1 = min(x + w, self._fw)
+        if x1 > x0:
+            a = (y * self._fw + x0) * 2
+            self._buf[a : a + (x1 - x0) * 2] = c.to_bytes(2, "little") * (x1 - x0)
+
+    def fill(self, c):
+        self._buf[:] = c.to_bytes(2, "little") * (self._fw * self._fh)
+
+    def fill_rect(self, x, y, w, h, c):
+        for r in range(max(y, 0), min(y + h, self._fh)):
+            self._run(x, r, w, c)
+
+    def rect(self, x, y, w, h, c, f=False):
+        if f:
+            return self.fill_rect(x, y, w, h, c)
+        self.hline(x, y, w, c)
+        self.hline(x, y + h - 1, w, c)
+        self.vline(x, y, h, c)
+        self.vline(x + w - 1, y, h, c)
+
+    def hline(self, x, y, w, c):
+        self._run(x, y, w, c)
+
+    def vline(self, x, y, h, c):
+        self.fill_rect(x, y, 1, h, c)
+
+    def pixel(self, x, y, c=None):
+        if not (0 <= x < self._fw and 0 <= y < self._fh):
+            return None
+        a = (y * self._fw + x) * 2
+        if c is None:
+            return int.from_bytes(self._buf[a : a + 2], "little")
+        self._buf[a : a + 2] = c.to_bytes(2, "little")
+
+    def line(self, x0, y0, x1, y1, c):
+        dx, dy = abs(x1 - x0), -abs(y1 - y0)
+        sx, sy = (1 if x0 < x1 else -1), (1 if y0 < y1 else -1)
+        e = dx + dy
+        while True:
+            self.pixel(x0, y0, c)
+            if x0 == x1 and y0 == y1:
+                return
+            e2 = 2 * e
+            if e2 >= dy:
+                e += dy
+                x0 += sx
+            if e2 <= dx:
+                e += dx
+                y0 += sy
+
+    def ellipse(self, x, y, xr, yr, c, f=False, m=15):
+        self.rect(x - xr, y - yr, 2 * xr + 1, 2 * yr + 1, c, f)
+
+    def poly(self, x, y, coords, c, f=False):
+        xs, ys = coords[0::2], coords[1::2]
+        self.rect(x + min(xs), y + min(ys), max(xs) - min(xs) + 1, max(ys) - min(ys) + 1, c, f)
+
+    def text(self, s, x, y, c=1):
+        pass
+
+    def blit(self, fbuf, x, y, key=-1, palette=None):
+        if isinstance(fbuf, tuple):
+            src, fw, fh = fbuf[:3]
+        else:
+            src, fw, fh = fbuf._buf, fbuf._fw, fbuf._fh
+        if key == -1:
+            x0 = max(x, 0)
+            x1 = min(x + fw, self._fw)
+            for r in range(max(y, 0), min(y + fh, self._fh)):
+                if x1 > x0:
+                    a = ((r - y) * fw + x0 - x) * 2
+                    d = (r * self._fw + x0) * 2
+                    self._buf[d : d + (x1 - x0) * 2] = src[a : a + (x1 - x0) * 2]
+            return
+        for r in range(fh):
+            for col in range(fw):
+                a = (r * fw + col) * 2
+                c = int.from_bytes(src[a : a + 2], "little")
+                if c != key:
+                    self.pixel(x + col, y + r, c)
+
+    def scroll(self, xstep, ystep):
+        old = bytes(self._buf)
+        w, h = self._fw, self._fh
+        for r in range(h):
+            for col in range(w):
+                sr, sc = r - ystep, col - xstep
+                if 0 <= sr < h and 0 <= sc < w:
+                    a, b = (r * w + col) * 2, (sr * w + sc) * 2
+                    self._buf[a : a + 2] = old[b : b + 2]
+
+
+# formats used by bdg.utils.blit, a slow RGB565 FrameBuffer for the display code
+framebuf = types.ModuleType("framebuf")
+framebuf.FrameBuffer = FrameBuffer
+framebuf.MONO_VLSB = 0
+framebuf.MONO_HLSB = 3
+framebuf.MONO_HMSB = 4
+framebuf.RGB565 = 1
+framebuf.GS2_HMSB = 5
+framebuf.GS4_HMSB = 2
+framebuf.GS8 = 6
+sys.modules.setdefault("framebuf", framebuf)
+
+import vradio
+
+vradio.install()
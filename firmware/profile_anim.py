@@ -0,0 +1,112 @@
+"""
+Animated sprites on the shared animation clock against a loop per sprite.
+
+SPRITES sprites of 32x32 play a 4 frame animation of FRAME_MS per frame on a
+320x170 RGB565 framebuf for RUN_S. The sprites of bdg.widgets.sprite draw
+from one AnimationClock task, frames are memoryview slices of the sheet
+(clock). The way CuteFoxDemo did it is a task per sprite that sleeps a frame
+and copies its frame out of the sheet (loop). Per way:
+    tasks       asyncio tasks running the sprites
+    frames/s    frames drawn per second, SPRITES * 1000 / FRAME_MS is on time
+    B/frame     heap allocated per frame drawn, MicroPython only: the GC is
+                off during the run and gc.mem_alloc() counts every allocation
+
+Unix port: make sim_exec CMD='import profile_anim'
+CPython: make host_exec CMD='import profile_anim'
+Badge: make dev_exec CMD='import profile_anim'
+"""
+
+import asyncio
+import framebuf
+import gc
+import sys
+
+from bdg.widgets.sprite_frames import SpriteSheet, Animation, Animator, LOOP
+
+try:
+    import tracemalloc  # host.py traces allocations, it would be most of the time
+
+    tracemalloc.stop()
+except ImportError:
+    pass
+
+SPRITES = (1, 4, 16)
+SIZE = 32
+FRAMES = 4
+FRAME_MS = 50
+RUN_S = 3
+MPY = sys.implementation.name == "micropython"
+
+
+def sheet():
+    data = bytearray(FRAMES * SIZE * SIZE * 2)
+    for i in range(len(data)):
+        data[i] = (i * 7) & 0xFF
+    return bytes(data)
+
+
+async def clock(ssd, data, n, drawn):
+    frames = SpriteSheet(data, SIZE, SIZE)
+    animators = []
+    for s in range(n):
+        x = (s % 8) * 40
+        y = (s // 8) * 40
+
+        def on_frame(sheet, i, x=x, y=y):
+            sheet.blit(ssd, i, x, y)
+            drawn[0] += 1
+
+        a = Animator({"run": Animation(frames, ms=FRAME_MS, mode=LOOP)}, on_frame)
+        animators.append(a)
+    for a in animators:
+        a.play("run")
+    await asyncio.sleep(RUN_S)
+    for a in animators:
+        a.stop()
+    return 1
+
+
+async def loop(ssd, data, n, drawn):
+    size = SIZE * SIZE * 2
+
+    async def sprite(x, y):
+        i = 0
+        while True:
+            frame = data[i * size : (i + 1) * size]
+            ssd.blit(framebuf.FrameBuffer(bytearray(frame), SIZE, SIZE, framebuf.RGB565), x, y)
+            drawn[0] += 1
+            i = (i + 1) % FRAMES
+            await asyncio.sleep_ms(FRAME_MS)
+
+    tasks = [asyncio.create_task(sprite((s % 8) * 40, (s // 8) * 40)) for s in range(n)]
+    await asyncio.sleep(RUN_S)
+    for t in tasks:
+        t.cancel()
+    return n
+
+
+async def run(way, n):
+    data = sheet()
+    ssd = framebuf.FrameBuffer(bytearray(320 * 170 * 2), 320, 170, framebuf.RGB565)
+    drawn = [0]
+    gc.collect()
+    if MPY:
+        gc.disable()
+    heap = gc.mem_alloc()
+    tasks = await way(ssd, data, n, drawn)
+    heap = gc.mem_alloc() - heap
+    gc.enable()
+    await asyncio.sleep_ms(FRAME_MS * 2)  # let the tasks end
+    return tasks, drawn[0] / RUN_S, heap / max(1, drawn[0])
+
+
+async def main():
+    print(f"{'sprites':>7s} {'way':>6s} {'tasks':>5s} {'frames/s':>8s} {'B/frame':>7s}")
+    for n in SPRITES:
+        for name, way in (("loop", loop), ("clock", clock)):
+            tasks, fps, heap = await run(way, n)
+            b = f"{heap:7.0f}" if MPY else f"{'-':>7s}"
+            print(f"{n:7d} {name:>6s} {tasks:5d} {fps:8.1f} {b}")
+
+
+asyncio.run(main())
@@ -0,0 +1,119 @@
+"""
+Adaptive beacon interval at growing crowds on the virtual radio.
+
+For every density in DENSITIES that many badges in range of each other share a
+vradio Medium and only beacon, once with a fixed interval (the old
+behaviour) and once with the adaptive one. Badge 0 has the scanner open.
+Time runs SCALE times faster than on the badge: Beacon's timeout, min_s and
+max_s are divided by it, load_fps multiplied. After WARMUP_S the run counts
+for RUN_S:
+    interval    mean seconds between beacons of a badge, badge time
+    scan        the same for badge 0
+    heard/s     beacons a badge hears per second, badge time
+    busy        share of airtime the channel is busy
+    wait        longest wait of a frame for the channel, ms
+    known       share of the other badges in last_seen at the end
+    flaps       badges dropped by cleanup_stale while still beaconing
+A good run keeps heard/s and busy flat as the crowd grows, with known at 100%
+and no flaps.
+
+Run on the MicroPython unix port: make sim_exec CMD='import profile_beacon'
+CPython: make host_exec CMD='import profile_beacon'
+"""
+
+import asyncio
+import builtins
+import random
+
+import vradio
+
+vradio.install()  # before the badge stack imports aioespnow
+
+from bdg.msg import BeaconMsg
+from bdg.msg.connection import NowListener, Beacon
+
+DENSITIES = (5, 20, 60, 120)
+SCALE = 2
+WARMUP_S = 8
+RUN_S = 20
+
+_print = print
+
+
+def quiet(on):
+    builtins.print = (lambda *args, **kwargs: None) if on else _print
+
+
+class SimBadge:
+    def __init__(self, medium, i, adaptive):
+        self.mac = bytes((0xB0, 0, 0, 0, i >> 8, i & 0xFF))
+        self.e = medium.radio(self.mac)
+        self.nl = NowListener(self.e, shared=False)
+        b = self.beacon = Beacon(self.e, BeaconMsg(nick=f"Badge{i:04d}"), self.nl, timeout=Beacon.timeout / SCALE)
+        b.min_s = Beacon.min_s / SCALE if adaptive else b.timeout
+        b.max_s = Beacon.max_s / SCALE if adaptive else b.timeout
+        b.load_fps = Beacon.load_fps * SCALE
+        if not adaptive:
+            b.dense = b.load_fps = 1_000_000
+            b.jitter = 0
+        b._scan = adaptive and i == 0
+        self.flaps = 0
+        self._cleanup_stale = self.nl.last_seen.cleanup_stale
+        self.nl.last_seen.cleanup_stale = self.cleanup_stale
+
+    def cleanup_stale(self, beacon_timeout):
+        removed = self._cleanup_stale(beacon_timeout)
+        self.flaps += removed  # nobody leaves, every drop is a flap
+        return removed
+
+    async def boot(self):
+        await asyncio.sleep_ms(random.randint(0, int(Beacon.timeout * 1000 / SCALE)))
+        self.nl.run()
+        self.beacon.run()
+
+
+async def run(n, adaptive):
+    medium = vradio.Medium(latency_ms=2, seed=n)
+    badges = [SimBadge(medium, i, adaptive) for i in range(n)]
+    for b in badges:
+        asyncio.create_task(b.boot())
+    await asyncio.sleep(WARMUP_S)
+    medium.reset()
+    for b in badges:
+        b.e.sent = 0
+        b.flaps = 0
+    await asyncio.sleep(RUN_S)
+    sent = sum(b.e.sent for b in badges)
+    known = sum(len(b.nl.last_seen) for b in badges) / (n * (n - 1))
+    for b in badges:
+        for t in (b.beacon._task, b.nl._task, b.nl._cleanup_t, b.nl._sender_t, medium._task):
+            if t:
+                t.cancel()
+    badge_s = RUN_S * SCALE
+    return {
+        "interval": badge_s * n / max(1, sent),
+        "scan": badge_s / max(1, badges[0].e.sent),
+        "heard": medium.delivered / n / badge_s,
+        "busy": 100 * medium.airtime_us / 1_000_000 / RUN_S,
+        "wait": medium.max_delay_us / 1000,
+        "known": 100 * known,
+        "flaps": sum(b.flaps for b in badges),
+    }
+
+
+async def main():
+    print(f"{'badges':>6s} {'mode':>8s} {'interval':>8s} {'scan':>6s} {'heard/s':>8s} {'busy %':>7s} {'wait ms':>7s} {'known %':>7s} {'flaps':>5s}")
+    for n in DENSITIES:
+        for adaptive in (False, True):
+            quiet(True)
+            try:
+                r = await run(n, adaptive)
+            finally:
+                quiet(False)
+            print(
+                f"{n:6d} {'adaptive' if adaptive else 'fixed':>8s} {r['interval']:8.1f} {r['scan']:6.1f} "
+                f"{r['heard']:8.1f} {r['busy']:7.1f} {r['wait']:7.1f} {r['known']:7.0f} {r['flaps']:5d}"
+            )
+
+
+asyncio.run(main())
@@ -0,0 +1,95 @@
+"""
+Bulk transfer throughput over a simulated radio.
+
+A loopback AIOESPNow hands every frame sent to PEER back to the listener as
+received from PEER, after LATENCY_MS and with LOSS of the frames dropped. One
+Connection to PEER is therefore both sender and receiver of its own
+transfers: chunks come back as received chunks, its acks as acks.
+Checks that every payload arrives intact and prints bytes/s per loss rate.
+Run on badge before the badge stack is started (NowListener keeps the first
+espnow instance it gets): make dev_exec CMD='import profile_bulk'
+"""
+
+import asyncio
+import random
+import time
+from collections import deque
+
+from bdg.msg.connection import Connection, NowListener
+
+PEER = b"\xb0\x00\x00\x00\x00\x01"
+CON_ID = 9
+SIZES = (200, 1000, 4096, 16384)
+LATENCY_MS = 3
+
+
+class LoopbackEspNow:
+    def __init__(self):
+        self.peers_table = {PEER: [-50, 0]}
+        self.loss = 0.0
+        self.sent = 0
+        self.sent_bytes = 0
+        self._q = deque((), 64)
+        self._ev = asyncio.Event()
+        self._rx = [None, None]
+
+    def any(self):
+        return len(self._q) > 0
+
+    def add_peer(self, mac):
+        pass
+
+    async def _deliver(self, msg):
+        await asyncio.sleep_ms(LATENCY_MS)
+        self._q.append(msg)
+        self._ev.set()
+
+    async def asend(self, mac, msg, sync=True):
+        self.sent += 1
+        self.sent_bytes += len(msg)
+        if random.random() >= self.loss:
+            asyncio.create_task(self._deliver(bytes(msg)))
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while not self._q:
+            self._ev.clear()
+            await self._ev.wait()
+        self._rx[0] = PEER
+        self._rx[1] = self._q.popleft()
+        return self._rx
+
+
+async def transfer(e, conn, size):
+    data = bytes(random.getrandbits(8) for _ in range(size))
+    e.sent = e.sent_bytes = 0
+    bps, got = await asyncio.gather(
+        conn.send_bulk(data), asyncio.wait_for(conn.bulk_q.get(), 60)
+    )
+    assert bps > 0, "transfer failed"
+    assert got == data, "payload corrupted"
+    return bps
+
+
+async def main():
+    e = LoopbackEspNow()
+    NowListener.start(e)
+    conn = Connection(PEER, CON_ID, e)
+    conn.active = True
+
+    print(f"\n{'='*60}")
+    print(f"{'loss':>5s} {'bytes':>6s} {'B/s':>7s} {'frames':>7s} {'on air B':>9s}")
+    for loss in (0.0, 0.05, 0.2):
+        e.loss = loss
+        for size in SIZES:
+            bps = await transfer(e, conn, size)
+            print(f"{loss:5.2f} {size:6d} {bps:7d} {e.sent:7d} {e.sent_bytes:9d}")
+    print(f"{'='*60}")
+    NowListener.out_q.report()
+    await conn.terminate(send_out=False)
+    NowListener.stop()
+
+
+asyncio.run(main())
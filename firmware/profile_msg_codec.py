@@ -0,0 +1,110 @@
+"""
+Compare legacy dict and compact (codec v1) wire formats of all registered messages.
+
+Prints frame size in bytes, encode/decode time and heap allocated per decode
+for every message type. Decode columns are legacy desrlz / compact desrlz /
+in place BadgeMsg.decode as used by the NowListener receive path.
+Run on badge: make dev_exec CMD='import profile_msg_codec'
+"""
+
+import gc
+import time
+
+import umsgpack
+
+# import games so that their messages get registered
+import bdg.games.tictac
+import bdg.games.rps
+import bdg.games.reaction_multi_game
+from bdg.msg import AppMsg, BadgeMsg, AckMsg
+
+ROUNDS = 200
+
+# constructor arguments for message types, fields not listed here get 0
+SAMPLES = {
+    "BeaconMsg": ("NeonBlade1337",),
+    "OpenConn": (1, True, 123456789),
+    "ConTerm": (1,),
+    "PingMsg": (123456.5, False),
+    "RPSMsg": (2,),
+    "VictoryMsg": (3, 2, False, True),
+    "TttStart": ("x", 4, 0.5312, 2),
+    "TttMove": (7,),
+    "TttEnd": (True, 8),
+    "RpsMove": ("spock",),
+    "MatchOver": ("NeonBlade1337",),
+    "Nickname": ("NeonBlade1337",),
+    "ReactionStart": (2147483,),
+    "ReactionEnd": (42,),
+}
+
+
+def sample(cls):
+    args = SAMPLES.get(cls.__name__, tuple(0 for _ in cls._fields))
+    return cls(*args)
+
+
+def messages():
+    for tid, cls in sorted(BadgeMsg._tid_reg.items()):
+        if cls is AppMsg:
+            continue
+        if cls is AckMsg:
+            yield AckMsg(id=17)
+        else:
+            yield sample(cls)
+    for tid, cls in sorted(AppMsg._tid_reg.items()):
+        yield AppMsg(sample(cls), con_id=1, session_id=123456789)
+
+
+def timed_us(fn, arg):
+    start = time.ticks_us()
+    for _ in range(ROUNDS):
+        fn(arg)
+    return time.ticks_diff(time.ticks_us(), start) / ROUNDS
+
+
+def alloc_b(fn, arg):
+    gc.collect()
+    start = gc.mem_alloc()
+    for _ in range(ROUNDS):
+        fn(arg)
+    # gc may run inside the loop, then the delta is meaningless
+    return max(0, gc.mem_alloc() - start) // ROUNDS
+
+
+def profile_codec():
+    print(
+        f"{'message':16s} {'legacy B':>8s} {'v1 B':>5s} {'enc us':>13s} "
+        f"{'dec us':>20s} {'dec heap B':>17s}"
+    )
+    tot_l = tot_c = 0
+    for msg in messages():
+        name = type(msg.content if isinstance(msg, AppMsg) else msg).__name__
+
+        legacy = umsgpack.dumps(msg.to_dict())
+        compact = msg.srlz_compact()
+        tot_l += len(legacy)
+        tot_c += len(compact)
+
+        enc_l = timed_us(lambda m: umsgpack.dumps(m.to_dict()), msg)
+        enc_c = timed_us(lambda m: m.srlz_compact(), msg)
+        dec_l = timed_us(BadgeMsg.desrlz, legacy)
+        dec_c = timed_us(BadgeMsg.desrlz, compact)
+        heap_l = alloc_b(BadgeMsg.desrlz, legacy)
+        heap_c = alloc_b(BadgeMsg.desrlz, compact)
+        rx_buf = bytearray(compact)
+        dec_r = timed_us(BadgeMsg.decode, rx_buf)
+        heap_r = alloc_b(BadgeMsg.decode, rx_buf)
+
+        print(
+            f"{name:16s} {len(legacy):8d} {len(compact):5d} "
+            f"{enc_l:6.0f}/{enc_c:<6.0f} {dec_l:6.0f}/{dec_c:<6.0f}/{dec_r:<6.0f} "
+            f"{heap_l:5d}/{heap_c:<5d}/{heap_r:<5d}"
+        )
+
+    print(f"\n{'='*60}")
+    print(f"TOTAL BYTES legacy: {tot_l} compact: {tot_c} ({100 * tot_c // tot_l}%)")
+    print(f"{'='*60}")
+
+
+profile_codec()
@@ -0,0 +1,208 @@
+"""
+Measure how many frames per second NowListener.task sustains in a beacon storm.
+
+Feeds pre-encoded beacons of PEERS badges through a fake AIOESPNow and times
+the listener: legacy dict frames are fully decoded every time, compact frames
+are decoded the first time a peer is seen and take the header only fast path
+afterwards.
+
+The stress run mixes beacons, acks, malformed frames and AppMsgs (some of them
+bundled into one frame) with injected duplicates on an open connection. It checks that every AppMsg is delivered
+exactly once, that a UI task keeps getting scheduled while the radio queue is
+never empty and that the listener stays far above the old ~10 frames/s.
+The priority run queues beacons, AppMsgs and acks at once and checks they
+leave the out_q scheduler in ack, AppMsg, beacon order, the ones for the same
+badge coalesced into one frame.
+Run on badge before the badge stack is started (NowListener keeps the first
+espnow instance it gets): make dev_exec CMD='import profile_now_listener'
+"""
+
+import asyncio
+import random
+import time
+
+import umsgpack
+
+from bdg.msg import AckMsg, AppMsg, BeaconMsg, RPSMsg, WIRE_BUNDLE
+from bdg.msg.connection import Connection, NowListener, pack_frames, unpack_frames
+from bdg.msg.scheduler import PRIO_CTRL, PRIO_APP, PRIO_BULK
+
+PEERS = 128
+FRAMES = 2000
+STRESS_FRAMES = 5000
+APP_MSGS = 500
+CON_ID = 7
+MIN_FPS = 200  # required listener ceiling in the stress run
+
+
+class FakeEspNow:
+    # Stands in for aioespnow.AIOESPNow: async iterator of [mac, msg], any(),
+    # asend() and peers_table. All fed frames are queued at once, like a radio
+    # buffer that the listener never catches up with.
+    def __init__(self, peers):
+        self.macs = [bytes((0xB0, 0, 0, 0, i >> 8, i & 0xFF)) for i in range(peers)]
+        self.peers_table = {mac: [-50, 0] for mac in self.macs}
+        self.frames = []
+        self.left = 0
+        self._i = 0
+        self._rx = [None, None]  # irecv() style reused result list
+        self.sent = 0
+        self.sent_tids = []
+        self.min_gap = None
+        self._last = None
+
+    def feed(self, frames, count):
+        # frames is a list of msg or (mac, msg)
+        self.frames = frames
+        self.left = count
+        self._i = 0
+
+    def any(self):
+        return self.left > 0
+
+    async def asend(self, mac, msg, sync=True):
+        now = time.ticks_ms()
+        if self._last is not None:
+            gap = time.ticks_diff(now, self._last)
+            self.min_gap = gap if self.min_gap is None else min(gap, self.min_gap)
+        self._last = now
+        self.sent += 1
+        frames = unpack_frames(msg) if msg[2] == WIRE_BUNDLE else [msg]
+        self.sent_tids.extend(f[2] for f in frames)
+
+    def add_peer(self, mac):
+        pass
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.left <= 0:
+            raise StopAsyncIteration
+        self.left -= 1
+        i = self._i
+        self._i = (i + 1) % len(self.frames)
+        frame = self.frames[i]
+        if isinstance(frame, tuple):
+            self._rx[0], self._rx[1] = frame
+        else:
+            self._rx[0] = self.macs[i % len(self.macs)]
+            self._rx[1] = frame
+        return self._rx
+
+
+async def run(e, listener, frames, count, label, fresh=True):
+    if fresh:
+        NowListener.last_seen.clear()
+    NowListener.last_seen.max_size = PEERS + 1  # table size is not what we measure
+    e.feed(frames, count)
+    start = time.ticks_ms()
+    await listener.task()
+    ms = max(1, time.ticks_diff(time.ticks_ms(), start))
+    fps = count * 1000 // ms
+    print(f"{label:28s} {count} frames in {ms}ms: {fps} frames/s")
+    return fps
+
+
+def stress_frames(e, conn):
+    # beacons of all peers with AppMsgs, acks and garbage mixed in
+    peer = conn.c_mac
+    frames = []
+    apps = []
+    for n in range(APP_MSGS):
+        apps.append(AppMsg(RPSMsg(n % 3), con_id=CON_ID, session_id=conn.session_id).srlz_compact())
+    beacons = [BeaconMsg(nick=f"Peer{i:04d}").srlz_compact() for i in range(PEERS)]
+    junk = e.macs[-1]
+    a = 0
+    while len(frames) < STRESS_FRAMES:
+        r = random.random()
+        if a < APP_MSGS - 2 and r < 0.03:
+            frames.append((peer, pack_frames(apps[a : a + 3])))
+            a += 3
+        elif a < APP_MSGS and r < 0.2:
+            frames.append((peer, apps[a]))
+            if a and random.random() < 0.3:
+                frames.append((peer, apps[a - random.randint(0, min(a, 5))]))  # retry
+            a += 1
+        elif r < 0.25:
+            frames.append((peer, AckMsg(id=random.randint(0, 254)).srlz_compact()))
+        elif r < 0.255:
+            frames.append((junk, b"\xc1\x01\x05"))
+        else:
+            i = random.randint(1, PEERS - 2)
+            frames.append((e.macs[i], beacons[i]))
+    return frames[:STRESS_FRAMES], a
+
+
+async def stress(e, listener):
+    conn = Connection(e.macs[0], CON_ID, e)
+    conn.active = True
+    frames, app_msgs = stress_frames(e, conn)
+    received = []
+    lag = [0]
+
+    async def consumer():
+        while True:
+            received.append(await conn.in_q.get())
+
+    async def ui():
+        # a 10 ms GUI tick, lag is how late it gets to run
+        while True:
+            t = time.ticks_ms()
+            await asyncio.sleep_ms(10)
+            lag[0] = max(lag[0], time.ticks_diff(time.ticks_ms(), t) - 10)
+
+    tasks = [asyncio.create_task(consumer()), asyncio.create_task(ui())]
+    e.sent = 0
+    fps = await run(e, listener, frames, len(frames), "stress, mixed traffic")
+    await asyncio.sleep_ms(100)
+    for t in tasks:
+        t.cancel()
+    conn.nl.unregister_con(conn)
+
+    print(f"app msgs {app_msgs} delivered {len(received)}")
+    print(f"frames sent {e.sent} min gap {e.min_gap}ms, max ui lag {lag[0]}ms")
+    assert len(received) == app_msgs, "AppMsg lost or delivered twice"
+    assert fps >= MIN_FPS, f"listener ceiling {fps} frames/s < {MIN_FPS}"
+    assert lag[0] < 10 * NowListener.rx_slice_ms, "listener starves other tasks"
+
+
+async def priorities(e, listener):
+    peer = e.macs[1]
+    e.sent_tids = []
+    e.sent = 0
+    # no coalescing hold, frames queued a tick apart would leave in that order
+    listener.coalesce_ms = 0
+    for i in range(3):
+        listener.send_frame(BeaconMsg(nick="bulk").srlz_compact(), b"\xff" * 6, PRIO_BULK)
+    for i in range(5):
+        listener.send_frame(AppMsg(RPSMsg(i % 3), con_id=CON_ID).srlz_compact(), peer, PRIO_APP)
+    for i in range(3):
+        listener.send_frame(AckMsg(id=i).srlz_compact(), peer, PRIO_CTRL)
+    await asyncio.sleep_ms(200)
+    order = [AckMsg._tid] * 3 + [AppMsg._tid] * 5 + [BeaconMsg._tid] * 3
+    print(f"send order {e.sent_tids} in {e.sent} frames")
+    assert e.sent_tids == order, "out_q priority order"
+    NowListener.out_q.report()
+
+
+async def main():
+    e = FakeEspNow(PEERS)
+    NowListener.start(e)  # runs the sender task for acks
+    listener = NowListener(e)
+
+    beacons = [BeaconMsg(nick=f"Peer{i:04d}") for i in range(PEERS)]
+    compact = [b.srlz_compact() for b in beacons]
+    legacy = [umsgpack.dumps(b.to_dict()) for b in beacons]
+
+    print(f"\n{'='*60}")
+    print(f"{PEERS} beaconing peers")
+    await run(e, listener, legacy, FRAMES, "legacy (full decode)")
+    await run(e, listener, compact, PEERS, "compact, unknown peers")
+    await run(e, listener, compact, FRAMES, "compact, known (fast path)", fresh=False)
+    await stress(e, listener)
+    await priorities(e, listener)
+    print(f"{'='*60}")
+
+
+asyncio.run(main())
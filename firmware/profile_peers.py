@@ -0,0 +1,89 @@
+"""
+Cost of NowListener's peer table (bdg.msg.peers.PeerTable) at growing crowds.
+
+For every table size: heap of the empty table, then per operation the time of
+    insert   a beacon of a new badge, the table full evicts the least recent one
+    update   a known badge seen again (update_last_seen with rssi)
+    lookup   mac in table, half of the macs are unknown
+    expire   cleanup_stale() dropping the whole table, per dropped badge
+Time is faked for the table so that the expiry run does not wait on a clock.
+None of the per badge costs should grow with the table size.
+
+Unix port: make sim_exec CMD='import profile_peers'
+CPython: make host_exec CMD='import profile_peers'
+Badge: make dev_exec CMD='import profile_peers' (5000 peers need ~300KB of heap)
+"""
+
+import gc
+import time
+
+import bdg.msg.peers as peers
+from bdg.msg import BadgeAdr
+
+SIZES = (50, 500, 5000)
+BEACON_TIMEOUT = 5
+
+_now = [100_000]
+peers.time = lambda: _now[0]
+
+
+def macs(n, base):
+    return [bytes((0xB0, base, 0, i >> 16 & 255, i >> 8 & 255, i & 255)) for i in range(n)]
+
+
+def per_op_us(start, n):
+    return time.ticks_diff(time.ticks_us(), start) / n
+
+
+def profile(size):
+    gc.collect()
+    heap = gc.mem_alloc()
+    table = peers.PeerTable(max_size=size)
+    heap = gc.mem_alloc() - heap
+
+    known = macs(size, 1)
+    new = macs(size, 2)
+    badges = [BadgeAdr(mac, "NeonBlade1337", -60, 0) for mac in known + new]
+    for badge in badges[:size]:
+        table[badge.mac] = badge
+    gc.collect()
+
+    start = time.ticks_us()
+    for badge in badges[size:]:
+        table[badge.mac] = badge  # evicts one of known every time
+    insert = per_op_us(start, size)
+    assert len(table) == size and known[-1] not in table
+
+    start = time.ticks_us()
+    for mac in new:
+        table.update_last_seen(mac, _now[0], -55)
+    update = per_op_us(start, size)
+
+    start = time.ticks_us()
+    for i in range(size):
+        _ = known[i] in table
+        _ = new[i] in table
+    lookup = per_op_us(start, 2 * size)
+
+    _now[0] += 2 * int(table.stale_multiplier * BEACON_TIMEOUT) + 2
+    start = time.ticks_us()
+    removed = table.cleanup_stale(BEACON_TIMEOUT)
+    expire = per_op_us(start, max(1, removed))
+    assert removed == size and not len(table)
+
+    print(
+        f"{size:6d} {heap:8d} {heap // size:6d} {insert:9.1f} {update:9.1f} "
+        f"{lookup:9.1f} {expire:9.1f}"
+    )
+
+
+def run(sizes=SIZES):
+    print(f"{'peers':>6s} {'heap B':>8s} {'B/peer':>6s} {'insert us':>9s} {'update us':>9s} {'lookup us':>9s} {'expire us':>9s}")
+    for size in sizes:
+        try:
+            profile(size)
+        except MemoryError:
+            print(f"{size:6d} does not fit in the heap")
+
+
+run()
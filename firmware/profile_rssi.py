@@ -0,0 +1,134 @@
+"""
+Badges around the RSSI cutoff on the virtual radio, raw against smoothed RSSI.
+
+Badge 0 hears PEERS badges at fixed levels from well above to below
+NowListener.rssi_min, every frame fades by up to FADING_DB (vradio).
+The peers don't hear each other. Once with the old behaviour (last rssi, hard
+cutoff) and once with the smoothed rssi and hysteresis, both ranked by
+last_seen.ranked(). Beacon's timeout is divided by SCALE to get more beacons
+in. Sampling badge 0 every second for
+RUN_S after WARMUP_S:
+    changes     badges added to or dropped from last_seen
+    reorders    samples where the order of last_seen.ranked() changed
+    rebuilds    samples where a scanner row text (nick and dBm) changed
+    known       badges in last_seen at the end, of the ones at or above the cutoff
+    jitter      mean spread of a badge's rssi over the run, dB
+A good run has few changes and reorders with all near badges known.
+
+Unix port: make sim_exec CMD='import profile_rssi'
+CPython: make host_exec CMD='import profile_rssi'
+"""
+
+import asyncio
+import builtins
+
+import vradio
+
+vradio.install()  # before the badge stack imports aioespnow
+
+from bdg.msg import BeaconMsg
+from bdg.msg.connection import NowListener, Beacon
+from bdg.msg.peers import PeerTable
+
+PEERS = 12
+FADING_DB = 6
+SCALE = 2
+WARMUP_S = 10
+RUN_S = 60
+
+_print = print
+
+
+def quiet(on):
+    builtins.print = (lambda *args, **kwargs: None) if on else _print
+
+
+def mac(i):
+    return bytes((0xB0, 0, 0, 0, 0, i))
+
+
+def level(i):
+    # peer i's rssi at badge 0, from rssi_min + 10 down to rssi_min - 6
+    return NowListener.rssi_min + 10 - 16 * (i - 1) // (PEERS - 1)
+
+
+def rssi(src, dst):
+    if dst[5] == 0:
+        return level(src[5])
+    if src[5] == 0:
+        return level(dst[5])
+    return -100  # peers are out of range of each other
+
+
+async def run(smooth):
+    medium = vradio.Medium(latency_ms=2, rssi=rssi, fading_db=FADING_DB, seed=1)
+    nls = []
+    beacons = []
+    for i in range(PEERS + 1):
+        e = medium.radio(mac(i))
+        nl = NowListener(e, shared=False)
+        nl.last_seen.rssi_shift = PeerTable.rssi_shift if smooth else 0
+        nl.rssi_hyst = NowListener.rssi_hyst if smooth else 0
+        b = Beacon(e, BeaconMsg(nick=f"Badge{i:02d}"), nl, timeout=Beacon.timeout / SCALE)
+        b.min_s = b.max_s = b.timeout
+        nls.append(nl)
+        beacons.append(b)
+        nl.run()
+        b.run()
+    nl = nls[0]
+    await asyncio.sleep(WARMUP_S)
+
+    changes = reorders = rebuilds = 0
+    known = set(nl.last_seen.keys())
+    order = [b.mac for b in nl.last_seen.ranked()]
+    rows = {b.mac: b.rssi for b in nl.last_seen.values()}
+    lo, hi = {}, {}
+    for _ in range(RUN_S):
+        await asyncio.sleep(1)
+        badges = nl.last_seen.ranked()
+        now = set(b.mac for b in badges)
+        changes += len(now ^ known)
+        known = now
+        macs = [b.mac for b in badges]
+        reorders += macs != order
+        order = macs
+        texts = {b.mac: b.rssi for b in badges}
+        rebuilds += texts != rows
+        rows = texts
+        for b in badges:
+            lo[b.mac] = min(lo.get(b.mac, 0), b.rssi)
+            hi[b.mac] = max(hi.get(b.mac, -128), b.rssi)
+
+    for t in [b._task for b in beacons] + [medium._task]:
+        if t:
+            t.cancel()
+    for n in nls:
+        for t in (n._task, n._cleanup_t, n._sender_t):
+            if t:
+                t.cancel()
+    near = sum(1 for i in range(1, PEERS + 1) if level(i) >= NowListener.rssi_min)
+    return {
+        "changes": changes,
+        "reorders": reorders,
+        "rebuilds": rebuilds,
+        "known": f"{sum(1 for m in known if level(m[5]) >= NowListener.rssi_min)}/{near}",
+        "jitter": sum(hi[m] - lo[m] for m in hi) / max(1, len(hi)),
+    }
+
+
+async def main():
+    print(f"{PEERS} badges from {level(1)} to {level(PEERS)} dBm, fading +-{FADING_DB} dB, cutoff {NowListener.rssi_min} dBm")
+    print(f"{'rssi':>8s} {'changes':>8s} {'reorders':>8s} {'rebuilds':>8s} {'known':>6s} {'jitter':>6s}")
+    for smooth in (False, True):
+        quiet(True)
+        try:
+            r = await run(smooth)
+        finally:
+            quiet(False)
+        print(
+            f"{'smoothed' if smooth else 'raw':>8s} {r['changes']:8d} {r['reorders']:8d} "
+            f"{r['rebuilds']:8d} {r['known']:>6s} {r['jitter']:6.1f}"
+        )
+
+
+asyncio.run(main())
@@ -0,0 +1,138 @@
+"""
+Scanner list updates at growing crowds on the virtual radio.
+
+Badge 0 has the scanner open and hears every other badge, at levels spread
+from -50 to -74 dBm with FADING_DB of fading per frame. The list is kept the
+way ScannerScreen did it (rebuild: all badges formatted and sorted again and
+a redraw per update event) and with bdg.widgets.badge_rows.BadgeRows
+(refresh: the touched badges applied, a redraw only when a row changed, at
+most every REDRAW_MS). The list code runs here without a display, a redraw
+is counted where the screen calls listbox.update(). Beacon's timeout is
+divided by SCALE. Over RUN_S after WARMUP_S:
+    updates/s   list updates, rebuilds or refreshes, per second badge time
+    redraws/s   of them the ones that redraw the list
+    ms/s        time spent in the list code per second badge time
+Redraws should stay at or below 1000 / REDRAW_MS per second however many
+badges there are.
+
+Unix port: make sim_exec CMD='import profile_scanner'
+CPython: make host_exec CMD='import profile_scanner'
+"""
+
+import asyncio
+import builtins
+import time
+
+import vradio
+
+vradio.install()  # before the badge stack imports aioespnow
+
+from bdg.msg import BeaconMsg, null_badge_adr
+from bdg.msg.connection import NowListener, Beacon
+from bdg.widgets.badge_rows import BadgeRows
+
+DENSITIES = (10, 40, 100)
+FADING_DB = 6
+REDRAW_MS = 500
+SCALE = 2
+WARMUP_S = 8
+RUN_S = 20
+
+_print = print
+
+
+def quiet(on):
+    builtins.print = (lambda *args, **kwargs: None) if on else _print
+
+
+def mac(i):
+    return bytes((0xB0, 0, 0, 0, i >> 8, i & 0xFF))
+
+
+def cb(*args):
+    pass
+
+
+def rebuild(elements, table):
+    # ScannerScreen.rebuild_list() before BadgeRows
+    badges = [b for b in table.values() if not b.busy]
+    elements.clear()
+    if not badges:
+        elements.append(("No badges found, looking..", cb, (null_badge_adr,)))
+        return True
+    rows = [(f"{b.nick} [{b.rssi}dBm]", cb, (b,)) for b in badges]
+    rows.sort(key=lambda a: a[2][0].nick.lower())
+    elements.extend(rows)
+    return True
+
+
+async def run(n, incremental):
+    def rssi(src, dst):
+        i = src[5] if dst[5] == 0 and dst[4] == 0 else dst[5] if src[5] == 0 and src[4] == 0 else None
+        return -100 if i is None else -50 - 24 * i // n
+
+    medium = vradio.Medium(latency_ms=2, rssi=rssi, fading_db=FADING_DB, seed=n)
+    nls = []
+    beacons = []
+    for i in range(n + 1):
+        e = medium.radio(mac(i))
+        nl = NowListener(e, shared=False)
+        b = Beacon(e, BeaconMsg(nick=f"Badge{i:03d}"), nl, timeout=Beacon.timeout / SCALE)
+        b.min_s = b.max_s = b.timeout
+        nls.append(nl)
+        beacons.append(b)
+        nl.run()
+        b.run()
+    nl = nls[0]
+    await asyncio.sleep(WARMUP_S)
+
+    elements = []
+    rows = BadgeRows(elements, cb, ("No badges found, looking..", cb, (null_badge_adr,)), show=lambda b: not b.busy)
+    rows.refresh(nl.last_seen)
+    counts = [0, 0, 0]  # updates, redraws, us
+
+    async def scanner():
+        async for _ in nl.get_updates():
+            t = time.ticks_us()
+            changed = rows.refresh(nl.last_seen) if incremental else rebuild(elements, nl.last_seen)
+            counts[2] += time.ticks_diff(time.ticks_us(), t)
+            counts[0] += 1
+            counts[1] += changed
+            if incremental:
+                await asyncio.sleep_ms(REDRAW_MS // SCALE)
+
+    task = asyncio.create_task(scanner())
+    await asyncio.sleep(RUN_S)
+    task.cancel()
+    for t in [b._task for b in beacons] + [medium._task]:
+        if t:
+            t.cancel()
+    for x in nls:
+        for t in (x._task, x._cleanup_t, x._sender_t):
+            if t:
+                t.cancel()
+    badge_s = RUN_S * SCALE
+    return {
+        "updates": counts[0] / badge_s,
+        "redraws": counts[1] / badge_s,
+        "ms": counts[2] / 1000 / badge_s,
+        "rows": len(rows) if incremental else len(elements),
+    }
+
+
+async def main():
+    print(f"{'badges':>6s} {'list':>8s} {'updates/s':>9s} {'redraws/s':>9s} {'ms/s':>6s} {'rows':>5s}")
+    for n in DENSITIES:
+        for incremental in (False, True):
+            quiet(True)
+            try:
+                r = await run(n, incremental)
+            finally:
+                quiet(False)
+            print(
+                f"{n:6d} {'refresh' if incremental else 'rebuild':>8s} {r['updates']:9.1f} {r['redraws']:9.1f} "
+                f"{r['ms']:6.1f} {r['rows']:5d}"
+            )
+
+
+asyncio.run(main())
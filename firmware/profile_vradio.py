@@ -0,0 +1,184 @@
+"""
+Many badges on one virtual radio: discovery and game sessions at scale.
+
+BADGES badge stacks (NowListener, Beacon, Connection) share a vradio
+Medium. Badges stand on a grid SPACING m apart and RSSI falls with distance,
+so each one hears only part of the hall. They boot at random times within one
+beacon period and beacon until every badge has found its neighbours (or
+DISCOVERY_S passed), then every other badge plays ROUNDS message round trips
+with its neighbour: open a connection, RPSMsg there and back, terminate.
+Prints discovery times, session results, round trip times and air counters.
+Output of the stacks is muted, only this script prints.
+
+Run on the MicroPython unix port: make sim_exec CMD='import profile_vradio'
+A bigger hall: make sim_exec CMD='import profile_vradio; profile_vradio.simulate(1000)'
+"""
+
+import asyncio
+import builtins
+import math
+import random
+import time
+
+import vradio
+
+vradio.install()  # before the badge stack imports aioespnow
+
+from bdg.msg import BeaconMsg, RPSMsg
+from bdg.msg.connection import NowListener, Beacon
+
+BADGES = 100
+SPACING = 3  # m between badges on the grid
+RSSI_1M = -45  # dBm at 1 m
+PATH_LOSS = 3.0  # log-distance exponent, a hall full of people
+RX_MIN_RSSI = NowListener.rssi_min  # weaker frames are ignored
+BEACON_S = 5
+DISCOVERY_S = int(3 * BEACON_S * (1 + Beacon.jitter))  # three of the longest beacon gaps
+ROUNDS = 10
+CON_ID = 2
+REPLY_MS = 5000
+
+_print = print
+
+
+def quiet(on):
+    # the stack prints every frame, too slow with hundreds of badges
+    builtins.print = (lambda *args, **kwargs: None) if on else _print
+
+
+def pct(values, p):
+    if not values:
+        return 0
+    values = sorted(values)
+    return values[min(len(values) - 1, len(values) * p // 100)]
+
+
+class SimBadge:
+    def __init__(self, medium, i):
+        self.mac = bytes((0xB0, 0, 0, 0, i >> 8, i & 0xFF))
+        self.e = medium.radio(self.mac)
+        self.nl = NowListener(self.e, con_cb=self.con_cb, shared=False)
+        self.beacon = Beacon(self.e, BeaconMsg(nick=f"Badge{i:04d}"), self.nl, timeout=BEACON_S)
+        self.neighbours = 0  # badges the listener does not filter out by RSSI
+        self.found_ms = None
+        self.rtts = []
+
+    async def boot(self):
+        await asyncio.sleep_ms(random.randint(0, BEACON_S * 1000))
+        self.nl.run()
+        self.beacon.run()
+
+    async def con_cb(self, conn, req=False):
+        if not req:
+            asyncio.create_task(self.serve(conn))
+        return True
+
+    async def serve(self, conn):
+        async for msg in conn.get_msg_aiter():
+            conn.send_app_msg(RPSMsg(msg.choice))
+
+    async def play(self, peer):
+        if not await self.nl.request_con(peer.mac, CON_ID):
+            return False
+        conn = self.nl.connections[CON_ID]
+        try:
+            for i in range(ROUNDS):
+                t = time.ticks_ms()
+                conn.send_app_msg(RPSMsg(i % 3))
+                await asyncio.wait_for_ms(conn.in_q.get(), REPLY_MS)
+                self.rtts.append(time.ticks_diff(time.ticks_ms(), t))
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            await conn.terminate()
+        return True
+
+
+def place(badges):
+    # grid positions and the RSSI they give
+    cols = math.ceil(math.sqrt(len(badges)))
+    pos = {}
+    for i, b in enumerate(badges):
+        pos[b.mac] = (i % cols * SPACING, i // cols * SPACING)
+
+    def rssi(a, b):
+        (xa, ya), (xb, yb) = pos[a], pos[b]
+        d = max(1.0, math.sqrt((xa - xb) ** 2 + (ya - yb) ** 2))
+        return int(RSSI_1M - 10 * PATH_LOSS * math.log10(d))
+
+    for b in badges:
+        n = sum(1 for o in badges if o is not b and rssi(o.mac, b.mac) >= RX_MIN_RSSI)
+        b.neighbours = min(n, b.nl.last_seen.max_size)
+    return cols, rssi
+
+
+async def discovery(badges, start):
+    left = len(badges)
+    while left and time.ticks_diff(time.ticks_ms(), start) < DISCOVERY_S * 1000:
+        await asyncio.sleep_ms(100)
+        now = time.ticks_diff(time.ticks_ms(), start)
+        for b in badges:
+            if b.found_ms is None and len(b.nl.last_seen) >= b.neighbours:
+                b.found_ms = now
+                left -= 1
+    return left
+
+
+async def sessions(badges, cols):
+    pairs = [(badges[i], badges[i + 1]) for i in range(0, len(badges) - 1, 2) if (i + 1) % cols]
+    start = time.ticks_ms()
+    results = await asyncio.gather(*[a.play(b) for a, b in pairs])
+    return sum(1 for ok in results if ok), len(pairs), time.ticks_diff(time.ticks_ms(), start)
+
+
+async def main(n):
+    medium = vradio.Medium(loss=0.02, latency_ms=2, jitter_ms=3, dup=0.005, seed=n)
+    badges = [SimBadge(medium, i) for i in range(n)]
+    cols, medium.rssi = place(badges)
+    lag = [0]
+
+    async def ui():
+        # a 10 ms GUI tick, lag is how far the host falls behind real time
+        while True:
+            t = time.ticks_ms()
+            await asyncio.sleep_ms(10)
+            lag[0] = max(lag[0], time.ticks_diff(time.ticks_ms(), t) - 10)
+
+    ui_t = asyncio.create_task(ui())
+    quiet(True)
+    try:
+        start = time.ticks_ms()
+        for b in badges:
+            asyncio.create_task(b.boot())
+        missing = await discovery(badges, start)
+        found = [b.found_ms for b in badges if b.found_ms is not None]
+        ok, total, ms = await sessions(badges, cols)
+        await asyncio.sleep_ms(500)  # ConTerms and their acks
+    finally:
+        quiet(False)
+        ui_t.cancel()
+
+    rtts = [t for b in badges for t in b.rtts]
+    sent = sum(b.nl.ack_stats.sent for b in badges)
+    retries = sum(b.nl.ack_stats.retries for b in badges)
+    timeouts = sum(b.nl.ack_stats.timeouts for b in badges)
+    print(f"\n{'='*60}")
+    print(f"{n} badges, {cols} per row {SPACING}m apart, {sum(b.neighbours for b in badges) / n:.1f} neighbours each")
+    print(
+        f"discovery: {len(found)}/{n} found all neighbours in {DISCOVERY_S}s, "
+        f"p50 {pct(found, 50)}ms p95 {pct(found, 95)}ms, {missing} incomplete"
+    )
+    print(f"sessions: {ok}/{total} completed in {ms}ms, {ROUNDS} round trips each")
+    print(f"round trip ms p50 {pct(rtts, 50)} p95 {pct(rtts, 95)} p99 {pct(rtts, 99)}")
+    print(f"acked msgs sent {sent} retries {retries} timeouts {timeouts}")
+    medium.report()
+    print(f"max loop lag {lag[0]}ms")
+    print(f"{'='*60}")
+    return ok == total
+
+
+def simulate(n=BADGES):
+    return asyncio.run(main(n))
+
+
+simulate()
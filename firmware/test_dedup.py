@@ -0,0 +1,135 @@
+"""
+Push thousands of messages with injected duplicates through NowListener dedup.
+
+Simulated senders number messages like BadgeMsg does: one id counter (% 255)
+shared with beacons and messages to other badges, so ids from one peer have
+gaps. Every message is retried a random number of times, retries arrive a few
+messages late and interleaved with other peers. Each message must be
+delivered exactly once.
+Run on badge: make dev_exec CMD='import test_dedup'
+"""
+
+import random
+import time
+
+from bdg.msg.dedup import DedupTable, RecvWindow, SEQ_MOD, WINDOW, IDLE_MS
+
+PEERS = 4
+MESSAGES = 5000  # per peer, wraps the 255 id space ~40 times
+MAX_SKIP = 2  # ids used by the sender for others between two messages to us
+MAX_LATE = 8  # a retry arrives at most this many messages after the original
+
+
+def sender_frames(mac, count):
+    # (mac, wire id, message number) for every frame, retries included
+    msg_id = random.randint(0, 254)
+    pending = []
+    for n in range(count):
+        msg_id = (msg_id + 1 + random.randint(0, MAX_SKIP)) % 255
+        pending.append((mac, msg_id, n, random.randint(0, MAX_LATE)))
+        keep = []
+        for frame in pending:
+            yield frame[:3]
+            # retried until its lateness runs out, at random
+            if frame[3] > 0 and random.random() < 0.5:
+                keep.append((frame[0], frame[1], frame[2], frame[3] - 1))
+        pending = keep
+    for frame in pending:
+        yield frame[:3]
+
+
+def test_stress():
+    table = DedupTable(max_peers=PEERS)
+    macs = [bytes((0xB0, 0, 0, 0, 0, i)) for i in range(PEERS)]
+    senders = [sender_frames(mac, MESSAGES) for mac in macs]
+    delivered = {mac: [0] * MESSAGES for mac in macs}
+    frames = dups = 0
+
+    start = time.ticks_us()
+    while senders:
+        s = random.choice(senders)
+        try:
+            mac, msg_id, n = next(s)
+        except StopIteration:
+            senders.remove(s)
+            continue
+        frames += 1
+        if delivered[mac][n]:
+            dups += 1
+        if table.add(mac, msg_id):
+            delivered[mac][n] += 1
+    us = time.ticks_diff(time.ticks_us(), start)
+
+    for mac in macs:
+        assert min(delivered[mac]) == 1, "message lost"
+        assert max(delivered[mac]) == 1, "duplicate delivered"
+    assert table.hits == dups, f"{table.hits=} {dups=}"
+    print(f"{frames} frames, {dups} duplicates filtered, {us // frames}us/frame")
+
+
+def test_wraparound():
+    # 16 bit seq wraps with the wire id, window keeps working across it
+    w = RecvWindow()
+    now = time.ticks_ms()
+    w.add(SEQ_MOD - 3, now)
+    assert w.seq == SEQ_MOD - 3 and w.seq % 255 == 252
+    for i in range(1, 7):
+        assert w.add((252 + i) % 255, now)
+    assert w.seq == 3, f"{w.seq=}"
+    for i in range(7):
+        assert not w.add((252 + i) % 255, now), "dup across wraparound"
+        assert w.seen((252 + i) % 255, now)
+
+
+def test_window_edges():
+    w = RecvWindow()
+    now = time.ticks_ms()
+    w.add(100, now)
+    assert w.add(100 + WINDOW, now)
+    assert not w.seen(101, now)
+    assert not w.add(100 + WINDOW, now)
+    # a jump of less than half the ring is ahead
+    assert w.add((100 + WINDOW + 127) % 255, now) and w.seq == 100 + WINDOW + 127
+    # behind the window is taken as new, the window starts over from it
+    assert w.add(100, now) and w.seq % 255 == 100 and w.bits == 1
+    assert not w.add(100, now)
+    # quiet peer (or rebooted) starts over
+    later = time.ticks_add(now, IDLE_MS + 1)
+    assert not w.seen(w.seq, later)
+    assert w.add(w.seq, later) and w.bits == 1
+
+
+def test_large_gaps():
+    # the sender used 128 or more ids for others, its retries must still be caught
+    w = RecvWindow()
+    now = time.ticks_ms()
+    w.add(10, now)
+    assert w.add(150, now)
+    assert not w.add(150, now) and not w.add(150, now), "retry after a gap delivered"
+    assert w.seq % 255 == 150
+    # gaps of 255 - WINDOW or more look like a retry from within the window
+    msg_id = 150
+    for gap in range(128, 255 - WINDOW + 1):
+        msg_id = (msg_id + gap) % 255
+        assert w.add(msg_id, now), f"{gap=} lost"
+        assert not w.add(msg_id, now), f"{gap=} retry delivered"
+        assert w.seen(msg_id, now) and w.seq % 255 == msg_id
+
+
+def test_eviction():
+    table = DedupTable(max_peers=2)
+    table.add(b"a", 1)
+    time.sleep_ms(2)
+    table.add(b"b", 1)
+    time.sleep_ms(2)
+    table.add(b"a", 2)  # b is now heard from longest ago
+    table.add(b"c", 1)
+    assert len(table) == 2 and b"b" not in table and b"a" in table
+
+
+test_wraparound()
+test_window_edges()
+test_large_gaps()
+test_eviction()
+test_stress()
+print("dedup OK")
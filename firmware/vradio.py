@@ -0,0 +1,354 @@
+"""
+Virtual ESP-NOW medium for running many badge stacks in one process.
+
+VirtualEspNow is a drop-in stand-in for aioespnow.AIOESPNow with the parts the
+badge stack uses: peers_table, add_peer, asend, any, active and the async
+iterator. All radios of a Medium share the air: a sent frame reaches every
+radio in range of the sender (group addresses like the beacon peer) or only
+the addressed one, after the frame's airtime on the shared channel, latency
+and jitter. Loss, duplication and RSSI are set for the whole medium or per
+link. Frames that do not fit in the receiver's rx buffer are dropped like on
+the badge.
+
+On a Linux host, with the MicroPython unix port:
+    import vradio  # firmware/, on the path of make sim_exec and host_exec
+    vradio.install()  # import aioespnow gives this module
+    from bdg.msg.connection import NowListener
+    m = vradio.Medium(loss=0.05, latency_ms=3, jitter_ms=4)
+    e = m.radio(b"\\xb0\\x00\\x00\\x00\\x00\\x01")
+    nl = NowListener(e, shared=False)
+    nl.run()
+See firmware/profile_vradio.py for a swarm of badges.
+"""
+
+import asyncio
+import heapq
+import random
+import sys
+from collections import deque
+from time import ticks_ms, ticks_us, ticks_diff
+
+RX_HDR = 13  # bytes the rx buffer keeps per frame besides its data
+RXBUF = 526  # default rx buffer, two full frames: 2 * (RX_HDR + 250)
+PHY_OVERHEAD = 60  # bytes on air per frame besides its data (802.11 action frame)
+
+# OSError args raised like the esp-now driver does, bdg.msg.send_message handles these
+ESP_ERR_ESPNOW_NOT_INIT = 0x3067
+ESP_ERR_ESPNOW_NOT_FOUND = 0x306B
+ESP_ERR_ESPNOW_EXIST = 0x306D
+
+
+def is_group(mac):
+    # broadcast and multicast addresses, e.g. the beacon peer bb:bb:bb:bb:bb:bb
+    return mac[0] & 1
+
+
+class Medium:
+    """
+    Shared air of a set of VirtualEspNow radios.
+
+    loss and dup are probabilities per frame and receiver, latency_ms plus up to
+    jitter_ms is added after the frame has been on air. rssi is the received
+    signal strength in dBm, or a function (src mac, dst mac) -> dBm for
+    placing badges, frames below min_rssi are not heard at all. fading_db
+    varies the rssi of every frame and receiver by up to +-fading_db. link() sets
+    rssi and loss for one pair of radios. With bitrate (bits/s) frames take
+    turns on one channel, so a busy channel delays every frame; 0 disables.
+
+    Which radios hear a sender is worked out once per sender and kept, call
+    moved() after changing what the rssi function returns.
+    """
+
+    def __init__(
+        self,
+        loss=0.0,
+        latency_ms=2,
+        jitter_ms=0,
+        dup=0.0,
+        rssi=-50,
+        min_rssi=-95,
+        fading_db=0,
+        bitrate=1_000_000,
+        seed=None,
+    ):
+        self.loss = loss
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.dup = dup
+        self.rssi = rssi
+        self.min_rssi = min_rssi
+        self.fading_db = fading_db
+        self.bitrate = bitrate
+        if seed is not None:
+            random.seed(seed)
+        self.radios = {}  # mac: VirtualEspNow
+        self.links = {}  # (mac, mac): [rssi or None, loss or None], both directions
+        self._reach = {}  # sender mac: [(radio, rssi), ...] radios in range
+        self._air = []  # heap of (due us, seq, radio, sender mac, frame, rssi)
+        self._seq = 0
+        self._ev = asyncio.Event()
+        self._task = None
+        self._t = ticks_us()
+        self._now = 0  # us since the medium was created, does not wrap
+        self._busy = 0  # us when the channel is free again
+        self.reset()
+
+    def reset(self):
+        self.frames = 0  # frames sent
+        self.bytes = 0  # payload bytes sent
+        self.airtime_us = 0
+        self.delivered = 0  # frames handed to receivers, duplicates included
+        self.lost = 0
+        self.dups = 0
+        self.overflows = 0  # dropped because a receiver's rx buffer was full
+        self.max_delay_us = 0  # longest wait for the channel
+
+    def radio(self, mac, rxbuf=RXBUF):
+        """Returns a new VirtualEspNow with mac on this medium."""
+        return VirtualEspNow(self, mac, rxbuf)
+
+    def attach(self, radio):
+        self.radios[radio.mac] = radio
+        self._reach.clear()
+
+    def link(self, a, b, rssi=None, loss=None):
+        # per link settings, None keeps the medium's
+        self.links[(a, b)] = self.links[(b, a)] = [rssi, loss]
+        self._reach.clear()
+
+    def moved(self):
+        self._reach.clear()
+
+    def rssi_of(self, src, dst):
+        link = self.links.get((src, dst))
+        if link and link[0] is not None:
+            return link[0]
+        return self.rssi(src, dst) if callable(self.rssi) else self.rssi
+
+    def _loss_of(self, src, dst):
+        link = self.links.get((src, dst))
+        if link and link[1] is not None:
+            return link[1]
+        return self.loss
+
+    def _in_range(self, src):
+        reach = self._reach.get(src)
+        if reach is None:
+            reach = []
+            for mac, r in self.radios.items():
+                if mac != src:
+                    rssi = self.rssi_of(src, mac)
+                    if rssi >= self.min_rssi:
+                        reach.append((r, rssi))
+            self._reach[src] = reach
+        return reach
+
+    def clock(self):
+        # us since the medium was created, ticks_us alone wraps in minutes
+        t = ticks_us()
+        self._now += ticks_diff(t, self._t)
+        self._t = t
+        return self._now
+
+    def transmit(self, src, dst, msg):
+        """Puts msg on air, returns True if it reaches dst (always for group addresses)."""
+        now = self.clock()
+        self.frames += 1
+        self.bytes += len(msg)
+        end = now
+        if self.bitrate:
+            start = self._busy if self._busy > now else now
+            air = (len(msg) + PHY_OVERHEAD) * 8_000_000 // self.bitrate
+            end = self._busy = start + air
+            self.airtime_us += air
+            if start - now > self.max_delay_us:
+                self.max_delay_us = start - now
+        if is_group(dst):
+            targets = self._in_range(src)
+        else:
+            r = self.radios.get(dst)
+            rssi = self.rssi_of(src, dst) if r else self.min_rssi - 1
+            targets = ((r, rssi),) if rssi >= self.min_rssi else ()
+        heard = False
+        for r, rssi in targets:
+            loss = self._loss_of(src, r.mac) if self.links else self.loss
+            if loss and random.random() < loss:
+                self.lost += 1
+                continue
+            heard = True
+            if self.fading_db:
+                rssi += random.randint(-self.fading_db, self.fading_db)
+            self._put(end, r, src, msg, rssi)
+            if self.dup and random.random() < self.dup:
+                self.dups += 1
+                self._put(end, r, src, msg, rssi)
+        if self._task is None:
+            self._task = asyncio.create_task(self._deliver())
+        return heard or is_group(dst)
+
+    def _put(self, end, r, src, msg, rssi):
+        due = end + self.latency_ms * 1000
+        if self.jitter_ms:
+            due += random.randint(0, self.jitter_ms * 1000)
+        self._seq += 1
+        if not self._air or due < self._air[0][0]:
+            self._ev.set()  # deliver task sleeps until the earliest frame
+        heapq.heappush(self._air, (due, self._seq, r, src, msg, rssi))
+
+    async def _deliver(self):
+        # hands frames to receivers when they are due, one task for the medium
+        air = self._air
+        while True:
+            if not air:
+                self._ev.clear()
+                await self._ev.wait()
+                continue
+            wait = (air[0][0] - self.clock()) // 1000
+            if wait > 0:
+                self._ev.clear()
+                try:
+                    await asyncio.wait_for_ms(self._ev.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            _, _, r, src, msg, rssi = heapq.heappop(air)
+            if r.rx(src, msg, rssi):
+                self.delivered += 1
+            else:
+                self.overflows += 1
+            if not air or air[0][0] > self.clock():
+                await asyncio.sleep_ms(0)
+
+    def report(self):
+        secs = max(1, self.clock()) / 1_000_000
+        print(
+            f"air {self.frames} frames {self.bytes}B {self.frames / secs:.0f} frames/s "
+            f"channel busy {100 * self.airtime_us / 1_000_000 / secs:.1f}% "
+            f"max wait {self.max_delay_us // 1000}ms"
+        )
+        print(
+            f"rx {self.delivered} lost {self.lost} dups {self.dups} "
+            f"rx buffer full {self.overflows}"
+        )
+
+
+class VirtualEspNow:
+    """
+    Radio of one badge on a Medium, used like aioespnow.AIOESPNow.
+
+    Frames to a mac that was not add_peer()'d raise OSError like the driver,
+    group addresses too. rx() is called by the medium, received frames wait
+    in a buffer of rxbuf bytes.
+    """
+
+    def __init__(self, medium, mac, rxbuf=RXBUF):
+        self.medium = medium
+        self.mac = bytes(mac)
+        self.rxbuf = rxbuf
+        self.peers_table = {}  # mac: [rssi, ticks_ms], of every sender heard
+        self._peers = set()
+        self._active = True
+        self._q = deque((), rxbuf // (RX_HDR + 1) + 1)
+        self._q_bytes = 0
+        self._ev = asyncio.Event()
+        self._msg = [None, None]  # reused like the irecv result
+        self.sent = 0
+        self.received = 0
+        self.dropped = 0  # rx buffer full
+        medium.attach(self)
+
+    def active(self, flag=None):
+        if flag is None:
+            return self._active
+        self._active = bool(flag)
+        while not self._active and self._q:
+            self._pop()  # switched off radio loses what it had received
+
+    def add_peer(self, mac, *args, **kwargs):
+        mac = bytes(mac)
+        if mac in self._peers:
+            raise OSError(ESP_ERR_ESPNOW_EXIST, "ESP_ERR_ESPNOW_EXIST")
+        self._peers.add(mac)
+
+    def del_peer(self, mac):
+        mac = bytes(mac)
+        if mac not in self._peers:
+            raise OSError(ESP_ERR_ESPNOW_NOT_FOUND, "ESP_ERR_ESPNOW_NOT_FOUND")
+        self._peers.discard(mac)
+
+    def get_peers(self):
+        return tuple((mac,) for mac in self._peers)
+
+    def send(self, mac, msg=None, sync=True):
+        if msg is None:
+            mac, msg = None, mac
+        if not self._active:
+            raise OSError(ESP_ERR_ESPNOW_NOT_INIT, "ESP_ERR_ESPNOW_NOT_INIT")
+        if mac is None:
+            # to all peers, like the driver
+            return all([self.send(p, msg, sync) for p in self._peers])
+        mac = bytes(mac)
+        if mac not in self._peers:
+            raise OSError(ESP_ERR_ESPNOW_NOT_FOUND, "ESP_ERR_ESPNOW_NOT_FOUND")
+        self.sent += 1
+        return self.medium.transmit(self.mac, mac, bytes(msg))
+
+    async def asend(self, mac, msg=None, sync=True):
+        return self.send(mac, msg, sync)
+
+    def rx(self, src, msg, rssi):
+        # from the medium, False if the frame did not fit in the rx buffer
+        n = RX_HDR + len(msg)
+        if not self._active or self._q_bytes + n > self.rxbuf:
+            self.dropped += 1
+            return False
+        self._q.append((src, msg))
+        self._q_bytes += n
+        self.received += 1
+        p = self.peers_table.get(src)
+        if p is None:
+            self.peers_table[src] = [rssi, ticks_ms()]
+        else:
+            p[0] = rssi
+            p[1] = ticks_ms()
+        self._ev.set()
+        return True
+
+    def any(self):
+        return len(self._q) > 0
+
+    def _pop(self):
+        src, msg = self._q.popleft()
+        self._q_bytes -= RX_HDR + len(msg)
+        self._msg[0] = src
+        self._msg[1] = msg
+        return self._msg
+
+    async def airecv(self, timeout_ms=None):
+        if not self._q:
+            self._ev.clear()
+            try:
+                await asyncio.wait_for_ms(self._ev.wait(), timeout_ms)
+            except asyncio.TimeoutError:
+                return None, None
+        if not self._q:
+            return None, None
+        return self._pop()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while not self._q:
+            self._ev.clear()
+            await self._ev.wait()
+        return self._pop()
+
+
+# esp-now module level names used by the badge stack
+AIOESPNow = VirtualEspNow
+
+
+def install():
+    """Makes `import aioespnow` give this module, for hosts without the driver."""
+    sys.modules["aioespnow"] = sys.modules[__name__]
@@ -16,6 +16,8 @@ module("bdg/__init__.py", base_path="modules")
 module("bdg/config.py", base_path="modules")
 module("bdg/version.py", base_path="modules")
 module("bdg/buttons.py", base_path="modules")
+module("bdg/log.py", base_path="modules")
+module("bdg/display.py", base_path="modules")
 module("bdg/utils.py", base_path="modules")
 module("bdg/bleds.py", base_path="modules")
 module("bdg/screens/ota.py", base_path="modules")
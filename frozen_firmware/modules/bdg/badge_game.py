@@ -11,6 +11,7 @@ from bdg.widgets.hidden_active_widget import HiddenActiveWidget
 from bdg.screens.scan_screen import ScannerScreen
 from bdg.screens.solo_games_screen import SoloGamesScreen
 from bdg.game_registry import get_registry
+from bdg.log import get_log
 from gui.core.colors import GREEN, BLACK, D_PINK, WHITE, D_GREEN, D_RED
 from gui.core.ugui import Screen, ssd
 from gui.core.writer import CWriter
@@ -19,6 +20,11 @@ from gui.primitives import launch
 from gui.widgets.buttons import Button, RECTANGLE
 from gui.widgets.label import Label
 
+log = get_log(__name__)
+
+
+OPPONENT_PICK = 3  # nearest badges an opponent is picked from
+
 
 class BadgeCooldown(Exception):
     def __init__(self, message="Badge in cooldown"):
@@ -48,8 +54,10 @@ class BadgeGame:
         opponent timer if successful. The method checks two conditions before selecting
         an opponent: whether the opponent timer is still active and whether the cooldown
         timer for the badge is active. If either condition is true, it raises a
-        BadgeCooldown exception. If no opponents are available in the list, a null
-        badge address is returned.
+        BadgeCooldown exception. The opponent is picked at random among the
+        OPPONENT_PICK nearest badges that are not busy and share a multiplayer game,
+        any game if this badge has none, ranked by smoothed RSSI. If no opponents
+        are available in the list, a null badge address is returned.
 
         :raises BadgeCooldown: If the opponent timer is still active with remaining time
             or if the badge cooldown timer is active.
@@ -64,8 +72,13 @@ class BadgeGame:
                     "Badge in cooldown {opponent_cooldown_t.time_left()}s "
                 )
 
-        if len(NowListener.last_seen):
-            self.opponent = random.choice(NowListener.last_seen.keys())
+        caps = get_registry().multiplayer_caps()
+        nearest = [
+            badge for badge in NowListener.last_seen.ranked()
+            if not badge.busy and badge.plays(caps)
+        ]
+        if nearest:
+            self.opponent = random.choice(nearest[:OPPONENT_PICK])
             self.opponent_timer.start()
             return self.opponent
 
@@ -100,7 +113,7 @@ class GameLobbyScr(Screen):
         solo_games = [g for g in registry.get_all_games() if not g.get("multiplayer", False)]
         has_solo = len(solo_games) > 0
         
-        print(f"GameLobbyScr: {len(multiplayer_games)} multiplayer games, {len(solo_games)} solo games")
+        log.info("GameLobbyScr: %s multiplayer games, %s solo games", len(multiplayer_games), len(solo_games))
 
         # Multi button (left side) - opens ScannerScreen for multiplayer
         def multi_cb(button):
@@ -125,7 +138,7 @@ class GameLobbyScr(Screen):
 
         # Solo button (right side) - will open SoloGamesScreen
         def solo_cb(button):
-            print("Solo button pressed - opening SoloGamesScreen")
+            log.debug("Solo button pressed - opening SoloGamesScreen")
             Screen.change(SoloGamesScreen)
 
         self.solo_btn = Button(
@@ -197,13 +210,13 @@ class ActiveGameScr(Screen):
         )
 
     def track_cb(self, button):
-        print("track_cb")
+        log.debug("track_cb")
         self.mode = self.MODE_SEARCHING
         self.update_ui()
 
     async def listen_handler(self):
         async for opponent in NowListener.updates(filer_mac=self.opponent.mac):
-            print(f"listen_handler: {opponent}")
+            log.debug("listen_handler: %s", opponent)
             self.opponent = opponent
             self.update_ui()
 
@@ -212,19 +225,19 @@ class ActiveGameScr(Screen):
         # TODO:
 
         if not self.game.has_opponent():
-            print("Acquiring opponent...")
+            log.debug("Acquiring opponent...")
             try:
                 self.opponent = self.game.acquire_opponent()
-                print("Acquired opponent:", self.opponent)
+                log.debug("Acquired opponent: %s", self.opponent)
                 if self.opponent is null_badge_adr:
                     self.mode = self.MODE_NO_OPPONENT
-                    print("No opponents available")
+                    log.info("No opponents available")
                 else:
                     self.mode = self.MODE_READY
-                    print("Opponent ready:", self.opponent)
+                    log.info("Opponent ready: %s", self.opponent)
             except BadgeCooldown as e:
                 # FIXME: jump to cooldown screen
-                print("Badge in cooldown:", e)
+                log.info("Badge in cooldown: %s", e)
                 Screen.change("CooldownScr", args=[str(e)])
         self.update_ui()
 
@@ -259,5 +272,5 @@ class ActiveGameScr(Screen):
 
 
 async def start_game():
-    print("start_game")
+    log.debug("start_game")
     Screen.change(GameLobbyScr, mode=Screen.REPLACE)
@@ -70,7 +70,7 @@ class Config:
             },
             "espnow": {
                 "ch": 1,
-                "beacon": 20,
+                "beacon": 5,  # s, base of Beacon's adaptive interval
                 "nick": clean_user_nick(config),
                 "b_needed": 10,
             },
@@ -0,0 +1,336 @@
+"""
+Dirty rectangle refresh for the ST7789 of the badge.
+
+The GUI's refresh loop refreshes the display over and over, the driver sends
+the whole 320x170 RGB565 frame (108 KB) over SPI every time in one blocking
+transfer. DirtyDisplay is a mixin for the driver class that keeps track of
+what was drawn since the last refresh and sends only that, through the
+controller's column/row address window, in slices that let the event loop run
+in between. Nothing drawn, nothing sent. See hardware_setup.py:
+    class SSD(DirtyDisplay, ST7789):
+        pass
+
+framebuf drawing methods mark what they draw. Code that writes ssd.mvb
+directly marks it with mark(ssd, x, y, w, h), bdg.utils.blit() does.
+"""
+
+import asyncio
+import time
+from struct import pack_into
+
+RAMWR = b"\x2c"
+CASET = b"\x2a"
+RASET = b"\x2b"
+
+
+def mark(ssd, x, y, w, h):
+    # for code that writes ssd.mvb, does nothing on a display without tracking
+    dirty = getattr(ssd, "dirty", None)
+    if dirty is not None:
+        dirty.mark(x, y, w, h)
+
+
+class DirtyRects:
+    """
+    Changed rectangles of a width x height frame.
+
+    mark() clips a rectangle and adds it. A rectangle that overlaps or comes
+    within gap pixels of a kept one is merged into it, beyond max_rects the two
+    whose union wastes the least area are merged. take() returns the kept ones
+    as [x0, y0, x1, y1] (end exclusive) and clears them. Once more than
+    full_share of the frame is marked the whole frame is taken as one.
+    """
+
+    def __init__(self, width, height, max_rects=6, gap=8, full_share=0.8):
+        self.width = width
+        self.height = height
+        self.max_rects = max_rects
+        self.gap = gap
+        self.full_area = int(width * height * full_share)
+        self.rects = []
+        self.all = False
+
+    def full(self):
+        self.all = True
+        self.rects.clear()
+
+    def mark(self, x, y, w, h):
+        if self.all:
+            return
+        x0 = x if x > 0 else 0
+        y0 = y if y > 0 else 0
+        x1 = x + w if x + w < self.width else self.width
+        y1 = y + h if y + h < self.height else self.height
+        if x1 <= x0 or y1 <= y0:
+            return
+        rects = self.rects
+        gap = self.gap
+        i = 0
+        while i < len(rects):
+            r = rects[i]
+            if x0 <= r[2] + gap and r[0] <= x1 + gap and y0 <= r[3] + gap and r[1] <= y1 + gap:
+                # the union may now reach others, take it out and go again
+                x0 = min(x0, r[0])
+                y0 = min(y0, r[1])
+                x1 = max(x1, r[2])
+                y1 = max(y1, r[3])
+                rects.pop(i)
+                i = 0
+                continue
+            i += 1
+        rects.append([x0, y0, x1, y1])
+        if len(rects) > self.max_rects:
+            self._merge_cheapest()
+        if sum((r[2] - r[0]) * (r[3] - r[1]) for r in rects) > self.full_area:
+            self.full()
+
+    def _merge_cheapest(self):
+        rects = self.rects
+        best = None
+        for i in range(len(rects)):
+            a = rects[i]
+            for j in range(i + 1, len(rects)):
+                b = rects[j]
+                area = (max(a[2], b[2]) - min(a[0], b[0])) * (max(a[3], b[3]) - min(a[1], b[1]))
+                waste = area - (a[2] - a[0]) * (a[3] - a[1]) - (b[2] - b[0]) * (b[3] - b[1])
+                if best is None or waste < best[0]:
+                    best = (waste, i, j)
+        _, i, j = best
+        b = rects.pop(j)
+        a = rects.pop(i)
+        self.mark(min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]) - min(a[0], b[0]), max(a[3], b[3]) - min(a[1], b[1]))
+
+    def take(self):
+        # [] nothing changed, None the whole frame
+        if self.all:
+            self.all = False
+            return None
+        rects = self.rects
+        self.rects = []
+        return rects
+
+
+class _Untracked:
+    # the tracker until the driver is set up, everything is a full frame
+    def mark(self, x, y, w, h):
+        pass
+
+    def full(self):
+        pass
+
+    def take(self):
+        return None
+
+
+class DirtyDisplay:
+    """
+    Mixin for an RGB565 ST7789 driver class that sends only changed areas.
+
+    Goes before the driver class. The driver has to be one of Peter Hinch's
+    ST7789 drivers or alike: an RGB565 framebuf with mvb, SPI in _spi, _dc
+    and _cs pins and _wcd(command, data). The column/row window the driver
+    sets up is picked up from its _wcd() calls, writes are placed relative to
+    it. A driver that does not set one the same way gets its own full frames,
+    unchanged frames are still skipped.
+
+    show() sends nothing if nothing was marked, the marked rectangles through
+    their windows otherwise, or the whole frame once most of it changed, in
+    one blocking go. dirty.full() forces the next one to be a full frame.
+
+    do_refresh() is the GUI's refresh, it is used for displays with
+    short_lock(). It sends the same in slices of at most slice_bytes and
+    yields to the event loop once budget_ms of sending went by, so the radio,
+    buttons and timers run during a full frame. A slice is never interrupted.
+    Slices are read from the framebuffer as it is when they are sent, not
+    from a copy: what is drawn while the refresh yields is marked for the next
+    refresh, but parts of it that fall in slices not sent yet go out with this
+    one, so a frame can show torn until the next refresh. lock is held while a
+    frame is sent, code that draws under it never has a frame shown half
+    drawn. With short_lock(True) it is held only while a slice is sent, and
+    only a slice is safe from tearing. With nothing to send do_refresh()
+    waits idle_ms.
+
+    stats() returns full frames, skipped frames, partial frames and bytes sent
+    since the last call.
+    """
+
+    dirty = _Untracked()
+    _col = None  # CASET and RASET data of the driver's full window
+    _row = None
+    slice_bytes = 8192  # 0.8 ms at 80 MHz
+    budget_ms = 4
+    idle_ms = 10
+
+    def __init__(self, *args, **kwargs):
+        self._wbuf = bytearray(4)
+        self._counts = [0, 0, 0, 0]  # full, skipped, partial frames, bytes
+        self._short = False
+        self.lock = asyncio.Lock()
+        super().__init__(*args, **kwargs)
+        self.dirty = DirtyRects(self.width, self.height)
+        self.dirty.full()
+
+    def _wcd(self, c, d):
+        # only the driver's own calls come here, _window() goes past
+        if c == CASET:
+            self._col = bytes(d)
+        elif c == RASET:
+            self._row = bytes(d)
+        super()._wcd(c, d)
+
+    def stats(self):
+        c = self._counts
+        self._counts = [0, 0, 0, 0]
+        return c
+
+    def short_lock(self, v=None):
+        if v is not None:
+            self._short = v
+        return self._short
+
+    def _take(self):
+        # the rectangles to send, None for a full frame the driver's way
+        rects = self.dirty.take()
+        c = self._counts
+        if rects is not None and not rects:
+            c[1] += 1
+        elif self._col is None or self._row is None:
+            c[0] += 1
+            c[3] += len(self.mvb)
+            return None
+        elif rects is None:
+            c[0] += 1
+            return [[0, 0, self.width, self.height]]
+        else:
+            c[2] += 1
+        return rects
+
+    def show(self):
+        rects = self._take()
+        if rects is None:
+            return super().show()
+        for x0, y0, x1, y1 in rects:
+            self._send(x0, y0, x1, y1)
+
+    def _slices(self, rects):
+        for x0, y0, x1, y1 in rects:
+            n = max(1, self.slice_bytes // ((x1 - x0) * 2))
+            for y in range(y0, y1, n):
+                yield x0, y, x1, min(y + n, y1)
+
+    async def do_refresh(self, split=4):
+        # split is the driver's, the slices here are sized by slice_bytes
+        lock = self.lock
+        await lock.acquire()
+        try:
+            rects = self._take()
+            if rects is None:
+                super().show()
+            elif not rects:
+                lock.release()
+                await asyncio.sleep_ms(self.idle_ms)
+                await lock.acquire()
+            budget = self.budget_ms * 1000
+            t = time.ticks_us()
+            for x0, y0, x1, y1 in self._slices(rects or ()):
+                if time.ticks_diff(time.ticks_us(), t) >= budget:
+                    if self._short:
+                        lock.release()
+                        await asyncio.sleep_ms(0)
+                        await lock.acquire()
+                    else:
+                        await asyncio.sleep_ms(0)
+                    t = time.ticks_us()
+                self._send(x0, y0, x1, y1)
+        finally:
+            lock.release()
+        await asyncio.sleep_ms(0)
+
+    def _window(self, cmd, start, a, b):
+        start = start[0] << 8 | start[1]
+        pack_into(">HH", self._wbuf, 0, start + a, start + b - 1)
+        super()._wcd(cmd, self._wbuf)
+
+    def _send(self, x0, y0, x1, y1):
+        self._window(CASET, self._col, x0, x1)
+        self._window(RASET, self._row, y0, y1)
+        mvb = self.mvb
+        stride = self.width * 2
+        self._dc(0)
+        self._cs(0)
+        self._spi.write(RAMWR)
+        self._dc(1)
+        if x1 - x0 == self.width:
+            # whole rows are one run of the buffer
+            self._spi.write(mvb[y0 * stride : y1 * stride])
+        else:
+            n = (x1 - x0) * 2
+            a = y0 * stride + x0 * 2
+            for _ in range(y1 - y0):
+                self._spi.write(mvb[a : a + n])
+                a += stride
+        self._cs(1)
+        self._counts[3] += (x1 - x0) * (y1 - y0) * 2
+
+    # framebuf drawing, marks what it draws
+
+    def fill(self, c):
+        self.dirty.full()
+        super().fill(c)
+
+    def fill_rect(self, x, y, w, h, c):
+        self.dirty.mark(x, y, w, h)
+        super().fill_rect(x, y, w, h, c)
+
+    def rect(self, x, y, w, h, c, f=False):
+        self.dirty.mark(x, y, w, h)
+        super().rect(x, y, w, h, c, f)
+
+    def hline(self, x, y, w, c):
+        self.dirty.mark(x, y, w, 1)
+        super().hline(x, y, w, c)
+
+    def vline(self, x, y, h, c):
+        self.dirty.mark(x, y, 1, h)
+        super().vline(x, y, h, c)
+
+    def line(self, x0, y0, x1, y1, c):
+        self.dirty.mark(min(x0, x1), min(y0, y1), abs(x1 - x0) + 1, abs(y1 - y0) + 1)
+        super().line(x0, y0, x1, y1, c)
+
+    def pixel(self, x, y, c=None):
+        if c is None:
+            return super().pixel(x, y)
+        self.dirty.mark(x, y, 1, 1)
+        super().pixel(x, y, c)
+
+    def ellipse(self, x, y, xr, yr, c, f=False, m=15):
+        self.dirty.mark(x - xr, y - yr, 2 * xr + 1, 2 * yr + 1)
+        super().ellipse(x, y, xr, yr, c, f, m)
+
+    def poly(self, x, y, coords, c, f=False):
+        xs = coords[0::2]
+        ys = coords[1::2]
+        self.dirty.mark(x + min(xs), y + min(ys), max(xs) - min(xs) + 1, max(ys) - min(ys) + 1)
+        super().poly(x, y, coords, c, f)
+
+    def text(self, s, x, y, c=1):
+        self.dirty.mark(x, y, 8 * len(s), 8)
+        super().text(s, x, y, c)
+
+    # Glyphs of Writer are FrameBuffers without a size, they are taken as
+    # at most blit_w x blit_h, the largest font of the badge fits
+    blit_w = 40
+    blit_h = 40
+
+    def blit(self, fbuf, x, y, key=-1, palette=None):
+        if isinstance(fbuf, tuple):
+            # (buffer, width, height, format[, stride])
+            self.dirty.mark(x, y, fbuf[1], fbuf[2])
+        else:
+            self.dirty.mark(x, y, getattr(fbuf, "width", self.blit_w), getattr(fbuf, "height", self.blit_h))
+        super().blit(fbuf, x, y, key, palette)
+
+    def scroll(self, xstep, ystep):
+        self.dirty.full()
+        super().scroll(xstep, ystep)
@@ -199,6 +199,20 @@ class GameRegistry:
         """
         return [g for g in self.get_all_games() if g.get("multiplayer", False)]
 
+    def multiplayer_caps(self):
+        """
+        Get the multiplayer games as a bitmap for BeaconMsg.caps.
+
+        Returns:
+            Int with bit n set for multiplayer con_id n, con_ids past 29 are left out
+        """
+        caps = 0
+        for g in self.get_multiplayer_games():
+            con_id = g.get("con_id")
+            if isinstance(con_id, int) and 0 <= con_id < 30:
+                caps |= 1 << con_id
+        return caps
+
     def get_solo_games(self):
         """
         Get all solo games (can be played without connection).
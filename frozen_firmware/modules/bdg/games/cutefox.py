@@ -2,7 +2,6 @@
 Cute Fox Demo - Animated fox sprite with LED effects
 Features 9-frame animation loop
 """
-import asyncio
 from hardware_setup import ssd
 from gui.core.colors import BLACK
 from gui.core.ugui import Screen, quiet
@@ -12,6 +11,7 @@ from gui.fonts import font10
 import neopixel
 from machine import Pin
 from bdg.config import Config
+from bdg.widgets.sprite import ScaledFrames, Animation, Animator, LOOP, BOUNCE, RANDOM
 
 # Fox sprite data embedded directly
 # Idle: 5 frames, Sleep: 4 frames (RGB565_I with black clamping)
@@ -1184,10 +1184,8 @@ class CuteFoxDemo(Screen):
         # Animation state
         self.current_animation = "idle"  # idle or sleep
         self.current_frame = 0
-        self.total_frames = 5  # idle has 5 frames
         self.frame_delay = 300  # ms between frames (slowed down)
         self.animation_mode = "sequential"  # sequential, bounce, random
-        self.bounce_direction = 1  # 1 = forward, -1 = backward
         
         # Automatic animation switching
         self.animation_start_time = 0  # Time when current animation started
@@ -1222,14 +1220,11 @@ class CuteFoxDemo(Screen):
         self.scanner_speed = 0.8  # Speed of scanner movement (faster)
         self.scanner_direction = 1  # 1 for forward (0->4), -1 for backward (4->0)
         
-        # Tasks list
-        self.demo_tasks = []
-        
         # Create writer for UI (required for button widget)
         from gui.core.colors import WHITE
         self.wri = CWriter(ssd, font10, WHITE, BLACK, verbose=False)
         
-        # Create Exit button (won't be visible due to constant screen clearing)
+        # Create Exit button
         Button(
             self.wri,
             row=150,
@@ -1240,55 +1235,33 @@ class CuteFoxDemo(Screen):
             callback=self.exit_demo,
         )
         
-        # Load sprite sheet data
-        self.idle_sprites = FOX_IDLE_DATA
-        self.sleep_sprites = FOX_SLEEP_DATA
-    
-    def _get_sprite_data(self, sprite_index):
-        """Extract a single 32x32 sprite from current animation.
-        
-        Args:
-            sprite_index: Sprite number within current animation
-            
-        Returns:
-            bytes: 2048 bytes of RGB565 data (32x32 pixels × 2 bytes)
-        """
-        # Select sprite sheet based on current animation
-        if self.current_animation == "idle":
-            sprite_sheet = self.idle_sprites
-            max_frames = 5
-        else:  # sleep
-            sprite_sheet = self.sleep_sprites
-            max_frames = 4
+        # Sprite sheets, frames are scaled when first drawn and kept
+        # RGB565 pixels are stored big-endian
+        self.idle_sprites = ScaledFrames(FOX_IDLE_DATA, 32, 32, self.sprite_scale, swap=True)
+        self.sleep_sprites = ScaledFrames(FOX_SLEEP_DATA, 32, 32, self.sprite_scale, swap=True)
         
-        if not 0 <= sprite_index < max_frames:
-            sprite_index = 0
-            
-        # Each sprite is 32×32 pixels × 2 bytes = 2048 bytes
-        sprite_size = 32 * 32 * 2
-        start = sprite_index * sprite_size
-        end = start + sprite_size
-        
-        return sprite_sheet[start:end]
+        # Idle: 5 frames, sleep: 4 frames, advanced by the shared animation clock
+        mode = {"sequential": LOOP, "bounce": BOUNCE, "random": RANDOM}[self.animation_mode]
+        self.animator = Animator(
+            {
+                "idle": Animation(self.idle_sprites, ms=self.frame_delay, mode=mode),
+                "sleep": Animation(self.sleep_sprites, ms=self.frame_delay, mode=mode),
+            },
+            self._on_frame,
+        )
     
-    def _draw_sprite(self, sprite_data, x, y):
-        """Draw a 32x32 sprite scaled 4x (128x128) at the specified position.
+    def _draw_sprite(self, frames, index, x, y):
+        """Draw frame index of frames at the specified position.
         
         Args:
-            sprite_data: 2048 bytes of RGB565 pixel data
+            frames: ScaledFrames of the animation, scaled by sprite_scale
+            index: Sprite number within the animation
             x, y: Top-left corner position
         """
-        # Convert bytes to framebuffer format and draw scaled
-        # Each pixel is 2 bytes (RGB565) - big-endian byte order
-        scale = self.sprite_scale
-        for row in range(32):
-            for col in range(32):
-                pixel_offset = (row * 32 + col) * 2
-                # RGB565 is stored as 2 bytes - big-endian
-                pixel = (sprite_data[pixel_offset] << 8) | sprite_data[pixel_offset + 1]
-                
-                # Draw scaled pixel as scale x scale block using fill_rect for speed
-                ssd.fill_rect(x + col * scale, y + row * scale, scale, scale, pixel)
+        # Scaled once into a cached framebuffer, drawn with one blit
+        if not 0 <= index < len(frames):
+            index = 0
+        frames.blit(ssd, index, x, y)
     
     def _update_leds(self):
         """Update LEDs with smooth dual scanner fade effect from both ends"""
@@ -1348,72 +1321,46 @@ class CuteFoxDemo(Screen):
         
         self.neo.write()
     
-    async def _animation_loop(self):
-        """Main animation loop with automatic idle/sleep switching"""
+    def _on_frame(self, frames, index):
+        """Draw a frame of the playing animation, called by the animation clock"""
         import time
         
-        # Cache positions to ensure they don't change
-        draw_x = self.sprite_x
-        draw_y = self.sprite_y
+        # Check if we need to switch animations based on time
+        current_time = time.ticks_ms()
+        elapsed = time.ticks_diff(current_time, self.animation_start_time)
         
-        # Initialize animation start time
-        self.animation_start_time = time.ticks_ms()
+        if self.current_animation == "idle" and elapsed >= self.idle_duration:
+            # Switch to sleep animation, its first frame is drawn from play()
+            self._play("sleep")
+            return
+        elif self.current_animation == "sleep" and elapsed >= self.sleep_duration:
+            # Switch back to idle animation
+            self._play("idle")
+            return
+        self.current_frame = index
         
-        while True:
-            # Check if we need to switch animations based on time
-            current_time = time.ticks_ms()
-            elapsed = time.ticks_diff(current_time, self.animation_start_time)
-            
-            if self.current_animation == "idle" and elapsed >= self.idle_duration:
-                # Switch to sleep animation
-                self.current_animation = "sleep"
-                self.current_frame = 0
-                self.animation_start_time = current_time
-            elif self.current_animation == "sleep" and elapsed >= self.sleep_duration:
-                # Switch back to idle animation
-                self.current_animation = "idle"
-                self.current_frame = 0
-                self.animation_start_time = current_time
-            
-            # Get frame count for current animation
-            frame_count = 5 if self.current_animation == "idle" else 4
-            
-            # Advance to next frame FIRST (before drawing)
-            if self.animation_mode == "sequential":
-                self.current_frame = (self.current_frame + 1) % frame_count
-                
-            elif self.animation_mode == "bounce":
-                self.current_frame += self.bounce_direction
-                if self.current_frame >= frame_count - 1:
-                    self.bounce_direction = -1
-                elif self.current_frame <= 0:
-                    self.bounce_direction = 1
-                    
-            elif self.animation_mode == "random":
-                import random
-                self.current_frame = random.randint(0, frame_count - 1)
-            
-            # Wait BEFORE drawing (this helps with timing)
-            await asyncio.sleep_ms(self.frame_delay)
-            
-            # Now draw the frame all at once
-            # Clear entire screen with dark green (grassy field)
-            ssd.fill(self.bg_color)
-            
-            # Get and draw current frame using cached position
-            sprite_data = self._get_sprite_data(self.current_frame)
-            self._draw_sprite(sprite_data, draw_x, draw_y)
-            
-            # Draw badge name in upper right corner
-            badge_name = Config.config.get('espnow', {}).get('nick', 'Badge')
-            self.wri.set_textpos(ssd, 15, 220)  # Upper right corner with padding
-            self.wri.printstring(badge_name)
-            
-            # Update LEDs with breathing effect
-            self._update_leds()
-            
-            # Let Screen framework handle display refresh automatically
-            # Do NOT call ssd.show() manually
+        # Now draw the frame all at once
+        # The sprite is opaque, it covers the previous frame
+        self._draw_sprite(frames, index, self.sprite_x, self.sprite_y)
+        
+        # Draw badge name in upper right corner
+        badge_name = Config.config.get('espnow', {}).get('nick', 'Badge')
+        self.wri.set_textpos(ssd, 15, 220)  # Upper right corner with padding
+        self.wri.printstring(badge_name)
+        
+        # Update LEDs with breathing effect
+        self._update_leds()
+        
+        # Let Screen framework handle display refresh automatically
+        # Do NOT call ssd.show() manually
+    
+    def _play(self, name):
+        """Start the idle or sleep animation"""
+        import time
+        
+        self.current_animation = name
+        self.animation_start_time = time.ticks_ms()
+        self.animator.play(name, restart=True)
     
     def on_open(self):
         """Called when screen is opened"""
@@ -1430,15 +1377,16 @@ class CuteFoxDemo(Screen):
         ssd.show()
         
         # Start animation
-        task = asyncio.create_task(self._animation_loop())
-        self.demo_tasks.append(task)
+        self._play("idle")
     
     def on_close(self):
         """Called when screen is closed"""
-        # Cancel all tasks
-        for task in self.demo_tasks:
-            task.cancel()
-        self.demo_tasks.clear()
+        # Stop the animation
+        self.animator.stop()
+        
+        # Let go of the scaled frames
+        self.idle_sprites.clear()
+        self.sleep_sprites.clear()
         
         # Turn off LEDs
         if self.has_leds:
@@ -9,12 +9,18 @@ from bdg.widgets.hidden_active_widget import HiddenActiveWidget
 import random
 from bdg.msg.connection import Connection, Beacon
 from bdg.asyncbutton import ButtonEvents, ButAct
-from bdg.msg import AppMsg, BadgeMsg, CancelActivityMsg
+from bdg.msg import AppMsg, BadgeMsg
+from bdg.log import get_log
+
+log = get_log(__name__)
 
 
 @AppMsg.register
 class ReactionStart(BadgeMsg):
     """Exchange random seeds between badges"""
+    _tid = 32
+    _fields = (("my_seed", int),)
+
     def __init__(self, my_seed: int):
         super().__init__()
         self.my_seed = my_seed
@@ -23,6 +29,9 @@ class ReactionStart(BadgeMsg):
 @AppMsg.register
 class ReactionEnd(BadgeMsg):
     """Send final score when game over"""
+    _tid = 33
+    _fields = (("final_score", int),)
+
     def __init__(self, final_score: int):
         super().__init__()
         self.final_score = final_score
@@ -101,7 +110,7 @@ class ReactionGameMultiplayerEndScr(Screen):
     def __init__(self, points: int, conn: Connection, opponent_score: int = None,
                  result: str = None, waiting: bool = False):
         super().__init__()
-        print(f"EndScr init: {points=}, {opponent_score=}, {result=}, {waiting=}")
+        log.debug("EndScr init: points=%r, opponent_score=%r, result=%r, waiting=%r", points, opponent_score, result, waiting)
         
         self.conn = conn
         self.my_score = points
@@ -119,12 +128,12 @@ class ReactionGameMultiplayerEndScr(Screen):
         HiddenActiveWidget(wri_score)
         
         if waiting:
-            print("Setting waiting text")
+            log.debug("Setting waiting text")
             self.title_label.value(text="Waiting...")
             self.score_label.value(text=f"Your score: {points}")
         else:
             # Show result
-            print(f"Setting result text: {result}")
+            log.debug("Setting result text: %s", result)
             if result == "won":
                 self.title_label.value(text="You Won!")
             elif result == "lost":
@@ -134,26 +143,26 @@ class ReactionGameMultiplayerEndScr(Screen):
             
             self.score_label.value(text=f"You: {points} | Opp: {opponent_score}")
         
-        print("EndScr init complete")
+        log.debug("EndScr init complete")
     
     def after_open(self):
         # If waiting for opponent, keep reading messages
         if self.waiting:
-            print("Registering message reader for waiting screen")
+            log.debug("Registering message reader for waiting screen")
             self.reg_task(self.wait_for_opponent(), True)
     
     async def wait_for_opponent(self):
         """Continue reading messages while waiting for opponent to finish"""
         if not self.conn or not self.conn.active:
-            print("wait_for_opponent: conn not active")
+            log.warning("wait_for_opponent: conn not active")
             return
         
         async for msg in self.conn.get_msg_aiter():
-            print(f"EndScr received message: {msg.msg_type}")
+            log.debug("EndScr received message: %s", msg.msg_type)
             
             if msg.msg_type == "ReactionEnd":
                 opponent_score = msg.final_score
-                print(f"Opponent finished with score: {opponent_score}")
+                log.info("Opponent finished with score: %s", opponent_score)
                 
                 # Determine result
                 if self.my_score > opponent_score:
@@ -163,7 +172,7 @@ class ReactionGameMultiplayerEndScr(Screen):
                 else:
                     result = "draw"
                 
-                print(f"Final result: {result} (Me: {self.my_score}, Opp: {opponent_score})")
+                log.info("Final result: %s (Me: %s, Opp: %s)", result, self.my_score, opponent_score)
                 
                 # Update current screen instead of replacing it
                 self.opponent_score = opponent_score
@@ -182,8 +191,8 @@ class ReactionGameMultiplayerEndScr(Screen):
                 break
 
     def on_hide(self):
-        # Resume beacon and cleanup
-        Beacon.suspend(False)
+        # Not busy anymore and cleanup
+        Beacon.busy(False)
         if self.conn:
             asyncio.create_task(self.conn.terminate(send_out=True))
 
@@ -257,14 +266,14 @@ class ReactionGameScr(Screen):
             if ev == ButAct.ACT_LONG and btn == "btn_b":
                 self.go_back()
             elif self.gs == self.STATE_GAME_ONGOING:
-                print(f"btn: {btn}, ev: {ev}")
+                log.debug("btn: %s, ev: %s", btn, ev)
                 if ev == ButAct.ACT_PRESS and btn in self.btn_idx:
                     await self.btn_cb(self.btn_idx[btn])
 
     def go_back(self):
         # TODO: Should we show popup to confirm leaving game?
         if self.gs == self.STATE_GAME_ONGOING:
-            print("game ongoing, can't exit!")
+            log.warning("game ongoing, can't exit!")
         else:
             # Allow back when game is over or paused (after ending)
             Screen.back()
@@ -274,8 +283,8 @@ class ReactionGameScr(Screen):
         if not self.bt or self.bt.done():
             self.bt = self.reg_task(self.btn_handler(), True)
         
-        # Suspend beacon during multiplayer game
-        Beacon.suspend(True)
+        # Busy beacons during multiplayer game, others can still see us
+        Beacon.busy(True)
         
         # Register message reading task
         self.reg_task(self.read_messages(), True)
@@ -283,12 +292,12 @@ class ReactionGameScr(Screen):
         # Generate and send our seed immediately
         my_seed = random.randint(10_000, 100_000)
         self.my_seed = my_seed
-        print(f"Connection active: {self.conn.active}")
-        print(f"Sending my seed: {my_seed}")
+        log.debug("Connection active: %s", self.conn.active)
+        log.debug("Sending my seed: %s", my_seed)
         self.conn.send_app_msg(ReactionStart(my_seed), sync=False)
 
     def on_hide(self):
-        print("screen hidden")
+        log.debug("screen hidden")
         
         # Send cancellation message if leaving early (not already cancelled by other badge)
         # Check state BEFORE modifying it
@@ -303,36 +312,35 @@ class ReactionGameScr(Screen):
         
         if should_send_cancel:
             try:
-                msg = CancelActivityMsg()
-                self.conn.send_app_msg(msg, sync=False)
-                print("ReactionGame: Sent cancel to other badge")
+                self.conn.send_cancel()
+                log.info("ReactionGame: Sent cancel to other badge")
             except Exception as e:
-                print(f"ReactionGame: Failed to send cancel: {e}")
+                log.error("ReactionGame: Failed to send cancel: %s", e)
         # Don't cleanup here - let the end screen handle it
 
     async def cont_sqnc(self):
         await asyncio.sleep(1.5)
         self.gs = self.STATE_GAME_ONGOING
-        print("cont_sqnc")
+        log.debug("cont_sqnc")
         try:
             while self.game.has_next_step():
-                print("cont_sqnc: has next step")
+                log.debug("cont_sqnc: has next step")
                 if self.gs == self.STATE_GAME_OVER:
-                    print("state is game over")
+                    log.debug("state is game over")
                     break
 
                 btn_idx = self.game.next_step()
-                print(f"Button index: {btn_idx}")
+                log.debug("Button index: %s", btn_idx)
                 await self.hl_button(btn_idx, self.game.cur_idx)
         except GameOver as go:
-            print(f"GameOver exception caught: {go.points}")
+            log.info("GameOver exception caught: %s", go.points)
             self.gs = self.STATE_GAME_OVER
             # Schedule stop_game as separate task to avoid blocking
             asyncio.create_task(self.stop_game())
         
 
     async def btn_cb(self, btn_idx):
-        print(f"game state: {self.gs} {btn_idx=}")
+        log.debug("game state: %s btn_idx=%r", self.gs, btn_idx)
         if self.gs == self.STATE_GAME_ONGOING:
             self.higlight_btn(btn_idx)
             try:
@@ -361,29 +369,29 @@ class ReactionGameScr(Screen):
         self.btns[btn_idx].set_hl(True)
         hl_time = 0.2 * (0.99**step)
         await asyncio.sleep(hl_time)
-        print(f"hl_time {hl_time}")
+        log.debug("hl_time %s", hl_time)
         self.btns[btn_idx].set_hl(False)
 
         base_sleep_time = max(0.2, 1.0 * (0.9**step))
         random_factor = 1  # random.uniform(0.8, 1.2)
         sleep_time = base_sleep_time * random_factor
-        print(f"sleep_time {sleep_time}")
+        log.debug("sleep_time %s", sleep_time)
         await asyncio.sleep(sleep_time)
 
     async def read_messages(self):
         """Read incoming messages from opponent"""
         # Check if connection is active (like tictac does)
         if not self.conn or not self.conn.active:
-            print("read_messages() stopped, conn not active")
+            log.warning("read_messages() stopped, conn not active")
             return
         
-        print("Starting message reading loop")
+        log.debug("Starting message reading loop")
         async for msg in self.conn.get_msg_aiter():
-            print(f"Received message: {msg.msg_type}")
+            log.debug("Received message: %s", msg.msg_type)
             
             # Handle cancellation from other badge
             if msg.msg_type == "CancelActivityMsg":
-                print("ReactionGame: Received cancel from other badge - opponent forfeited")
+                log.info("ReactionGame: Received cancel from other badge - opponent forfeited")
                 self.cancelled = True
                 self.gs = self.STATE_GAME_OVER
                 # Opponent forfeited, we win!
@@ -402,14 +410,14 @@ class ReactionGameScr(Screen):
                         }
                     )
                 except Exception as e:
-                    print(f"Error changing screen: {e}")
+                    log.error("Error changing screen: %s", e)
                 return
             
             if msg.msg_type == "ReactionStart":
                 # Received opponent's seed
                 self.opponent_seed = msg.my_seed
                 combined_seed = self.my_seed + self.opponent_seed
-                print(f"Seeds combined: {self.my_seed} + {self.opponent_seed} = {combined_seed}")
+                log.info("Seeds combined: %s + %s = %s", self.my_seed, self.opponent_seed, combined_seed)
                 
                 # Start the game with synchronized seed
                 if not self.game:
@@ -422,11 +430,11 @@ class ReactionGameScr(Screen):
                 # Opponent finished their game
                 self.opponent_finished = True
                 self.opponent_score = msg.final_score
-                print(f"Opponent finished with score: {msg.final_score}, my waiting: {self.waiting_for_opponent}")
+                log.info("Opponent finished with score: %s, my waiting: %s", msg.final_score, self.waiting_for_opponent)
                 
                 # If we already finished, compare scores and show result
                 if self.waiting_for_opponent:
-                    print("Both finished, showing result now")
+                    log.info("Both finished, showing result now")
                     
                     # Determine result
                     if self.my_final_score > self.opponent_score:
@@ -436,7 +444,7 @@ class ReactionGameScr(Screen):
                     else:
                         result = "draw"
                     
-                    print(f"Game result: {result} (Me: {self.my_final_score}, Opponent: {self.opponent_score})")
+                    log.info("Game result: %s (Me: %s, Opponent: %s)", result, self.my_final_score, self.opponent_score)
                     try:
                         Screen.change(
                             ReactionGameMultiplayerEndScr,
@@ -450,25 +458,25 @@ class ReactionGameScr(Screen):
                             }
                         )
                     except ValueError as e:
-                        print(f"Screen.change failed in read_messages: {e}")
+                        log.error("Screen.change failed in read_messages: %s", e)
                     return  # Exit message loop after showing result
                 else:
-                    print("Opponent finished first, we're still playing")
+                    log.info("Opponent finished first, we're still playing")
                 # Otherwise, just save the score and continue playing silently
 
     async def stop_game(self):
         self.gs = self.STATE_GAME_OVER
         points = self.game.points()
-        print(f"Game Over. {points=}")
+        log.info("Game Over. points=%r", points)
         
         self.my_final_score = points
         
         # Send our score to opponent
         try:
-            print(f"Sending ReactionEnd with points={points}")
+            log.debug("Sending ReactionEnd with points=%s", points)
             self.conn.send_app_msg(ReactionEnd(points), sync=False)
         except Exception as e:
-            print(f"Failed to send ReactionEnd: {e}")
+            log.error("Failed to send ReactionEnd: %s", e)
         
         # Small delay to ensure message is sent before screen change
         await asyncio.sleep_ms(100)
@@ -476,7 +484,7 @@ class ReactionGameScr(Screen):
         # Check if opponent already finished
         if self.opponent_finished:
             # Both finished, show result immediately
-            print("Opponent already finished, showing results")
+            log.info("Opponent already finished, showing results")
             
             # Determine result
             if self.my_final_score > self.opponent_score:
@@ -486,7 +494,7 @@ class ReactionGameScr(Screen):
             else:
                 result = "draw"
             
-            print(f"Game result: {result} (Me: {self.my_final_score}, Opponent: {self.opponent_score})")
+            log.info("Game result: %s (Me: %s, Opponent: %s)", result, self.my_final_score, self.opponent_score)
             try:
                 Screen.change(
                     ReactionGameMultiplayerEndScr,
@@ -500,10 +508,10 @@ class ReactionGameScr(Screen):
                     }
                 )
             except ValueError as e:
-                print(f"Screen.change failed in stop_game: {e}")
+                log.error("Screen.change failed in stop_game: %s", e)
         else:
             # Wait for opponent to finish
-            print("Waiting for opponent to finish")
+            log.info("Waiting for opponent to finish")
             self.waiting_for_opponent = True
             await asyncio.sleep_ms(100)
             try:
@@ -519,7 +527,7 @@ class ReactionGameScr(Screen):
                     }
                 )
             except ValueError as e:
-                print(f"Screen.change failed in stop_game: {e}")
+                log.error("Screen.change failed in stop_game: %s", e)
 
 
 class RGame:
@@ -533,7 +541,7 @@ class RGame:
 
     def has_next_step(self) -> bool:
         if self.cur_idx - self.btn_seq_idx > 5:
-            print("Too much behind {self.cur_idx - self.btn_seq_idx=}")
+            log.warning("Too much behind %s", self.cur_idx - self.btn_seq_idx)
             raise GameOver(points=self.points(), reason="You are too far behind!")
 
         return self.cur_idx <= self.size
@@ -544,9 +552,11 @@ class RGame:
         return step
 
     def btn_press(self, btn_idx: int):
-        print(
-            f"btn_press - {btn_idx=} - { self.sqnc[self.btn_seq_idx]=}"
-            f" - {self.btn_seq_idx=}"
+        log.debug(
+            "btn_press - btn_idx=%r - sqnc=%r - btn_seq_idx=%r",
+            btn_idx,
+            self.sqnc[self.btn_seq_idx],
+            self.btn_seq_idx,
         )
         if btn_idx != self.sqnc[self.btn_seq_idx]:
             raise GameOver(points=self.points())
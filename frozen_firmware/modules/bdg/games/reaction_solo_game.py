@@ -9,6 +9,9 @@ from bdg.widgets.hidden_active_widget import HiddenActiveWidget
 import random
 from bdg.msg.connection import Connection
 from bdg.asyncbutton import ButtonEvents, ButAct
+from bdg.log import get_log
+
+log = get_log(__name__)
 
 DARKYELLOW = create_color(12, 104, 114, 45)
 DIS_RED = create_color(13, 210, 0, 0)
@@ -164,14 +167,14 @@ class ReactionSoloGameScr(Screen):
             if ev == ButAct.ACT_LONG and btn == "btn_b":
                 self.go_back()
             elif self.gs == self.STATE_GAME_ONGOING:
-                print(f"btn: {btn}, ev: {ev}")
+                log.debug("btn: %s, ev: %s", btn, ev)
                 if ev == ButAct.ACT_PRESS:
                     await self.btn_cb(self.btn_idx[btn])
 
     def go_back(self):
         # TODO: Should we show popup to confirm leaving game?
         if self.gs == self.STATE_GAME_ONGOING:
-            print("game ongoing, can't exit!")
+            log.warning("game ongoing, can't exit!")
         elif self.gs == self.STATE_GAME_OVER:
             Screen.back()
 
@@ -189,28 +192,28 @@ class ReactionSoloGameScr(Screen):
 
     def on_hide(self):
         self.gs = self.STATE_GAME_PAUSED
-        print("screen hidden")
+        log.debug("screen hidden")
 
     async def cont_sqnc(self):
         await asyncio.sleep(1.5)
         self.gs = self.STATE_GAME_ONGOING
-        print("cont_sqnc")
+        log.debug("cont_sqnc")
         try:
             while self.game.has_next_step():
-                print("cont_sqnc: has next step")
+                log.debug("cont_sqnc: has next step")
                 if self.gs == self.STATE_GAME_OVER:
-                    print("state is game over")
+                    log.debug("state is game over")
                     break
 
                 btn_idx = self.game.next_step()
-                print(f"Button index: {btn_idx}")
+                log.debug("Button index: %s", btn_idx)
                 await self.hl_button(btn_idx, self.game.cur_idx)
         except GameOver as go:
-            print("game over")
+            log.info("game over")
             self.gs = self.STATE_GAME_OVER
 
     async def btn_cb(self, btn_idx):
-        print(f"game state: {self.gs} {btn_idx=}")
+        log.debug("game state: %s btn_idx=%r", self.gs, btn_idx)
         if self.gs == self.STATE_GAME_ONGOING:
             self.higlight_btn(btn_idx)
             try:
@@ -237,18 +240,18 @@ class ReactionSoloGameScr(Screen):
         self.btns[btn_idx].set_hl(True)
         hl_time = 0.2 * (0.99**step)
         await asyncio.sleep(hl_time)
-        print(f"hl_time {hl_time}")
+        log.debug("hl_time %s", hl_time)
         self.btns[btn_idx].set_hl(False)
 
         base_sleep_time = max(0.2, 1.0 * (0.9**step))
         random_factor = 1  # random.uniform(0.8, 1.2)
         sleep_time = base_sleep_time * random_factor
-        print(f"sleep_time {sleep_time}")
+        log.debug("sleep_time %s", sleep_time)
         await asyncio.sleep(sleep_time)
 
     async def stop_game(self):
         self.gs = self.STATE_GAME_OVER
-        print("STOP GAME")
+        log.info("STOP GAME")
 
         # Little wait so that btn_b doesn't trigger anything on next screen
         await asyncio.sleep_ms(200)
@@ -270,7 +273,7 @@ class RSoloGame:
 
     def has_next_step(self) -> bool:
         if self.cur_idx - self.btn_seq_idx > 5:
-            print("Too much behind {self.cur_idx - self.btn_seq_idx=}")
+            log.warning("Too much behind %s", self.cur_idx - self.btn_seq_idx)
             raise GameOver(points=self.points(), reason="You are too far behind!")
 
         return self.cur_idx <= self.size
@@ -281,9 +284,11 @@ class RSoloGame:
         return step
 
     def btn_press(self, btn_idx: int):
-        print(
-            f"btn_press - {btn_idx=} - { self.sqnc[self.btn_seq_idx]=}"
-            f" - {self.btn_seq_idx=}"
+        log.debug(
+            "btn_press - btn_idx=%r - sqnc=%r - btn_seq_idx=%r",
+            btn_idx,
+            self.sqnc[self.btn_seq_idx],
+            self.btn_seq_idx,
         )
         if btn_idx != self.sqnc[self.btn_seq_idx]:
             raise GameOver(points=self.points())
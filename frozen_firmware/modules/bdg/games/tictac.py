@@ -2,7 +2,7 @@ import asyncio
 import random
 import time
 
-from bdg.msg import AppMsg, BadgeMsg, CancelActivityMsg
+from bdg.msg import AppMsg, BadgeMsg
 from bdg.msg.connection import Connection, Beacon
 from bdg.widgets.meter import Meter
 from gui.core.colors import GREEN, BLACK, RED, YELLOW, MAGENTA, BLUE, DARKBLUE
@@ -14,6 +14,9 @@ from gui.widgets import Label
 from gui.widgets.buttons import Button
 from gui.widgets.region import Region
 from hardware_setup import ssd
+from bdg.log import get_log
+
+log = get_log(__name__)
 
 dolittle = lambda *_: None
 
@@ -25,6 +28,9 @@ NEW_ROUND = 3
 
 @AppMsg.register
 class TttStart(BadgeMsg):
+    _tid = 16
+    _fields = (("iam", str), ("move", int), ("init", (int, float)), ("round_num", int))
+
     def __init__(self, iam: str, move: int, init: float, round_num: int):
         super().__init__()
         self.iam: str = iam  # Player character: "x" or "o"
@@ -35,6 +41,9 @@ class TttStart(BadgeMsg):
 
 @AppMsg.register
 class TttMove(BadgeMsg):
+    _tid = 17
+    _fields = (("move", int),)
+
     def __init__(self, move: int):
         super().__init__()
         self.move: int = move
@@ -42,6 +51,9 @@ class TttMove(BadgeMsg):
 
 @AppMsg.register
 class TttEnd(BadgeMsg):
+    _tid = 18
+    _fields = (("iam_winner", bool), ("move", int))
+
     def __init__(self, iam_winner: bool, move: int):
         super().__init__()
         # if player does not claim win, it must be tie
@@ -108,7 +120,7 @@ class TTTbox(Widget):
         self.callback(self)  # callback is place_cb
 
     def do_adj(self, button, value):
-        print(f"adj: {value=}, {button=}")
+        log.debug("adj: value=%r, button=%r", value, button)
         self.adj_cb(self, value)
 
 
@@ -203,7 +215,7 @@ class TicTacToe(Screen):
         # TODO: README This is the only way to add workers to app!!
         # if reg_task() is called in init task will not be restarted when coming
         # back from dialog of dropdown
-        Beacon.suspend(True)
+        Beacon.busy(True)
         if not self.rd_msg or self.rd_msg.done():
             self.rd_msg = self.reg_task(self.read_messages(), True)
 
@@ -215,21 +227,20 @@ class TicTacToe(Screen):
             # Send cancellation message if leaving early (not already cancelled by other badge)
             if not self.cancelled:
                 try:
-                    msg = CancelActivityMsg()
-                    self.conn.send_app_msg(msg, sync=False)
-                    print("TicTacToe: Sent cancel to other badge")
+                    self.conn.send_cancel()
+                    log.info("TicTacToe: Sent cancel to other badge")
                 except Exception as e:
-                    print(f"TicTacToe: Failed to send cancel: {e}")
+                    log.error("TicTacToe: Failed to send cancel: %s", e)
             
             # Also send TttEnd to handle older versions gracefully
             try:
                 self.conn.send_app_msg(TttEnd(False, -1), sync=False)
             except Exception as e:
-                print(f"Failed to send TttEnd: {e}")
+                log.error("Failed to send TttEnd: %s", e)
             
             asyncio.create_task(self.conn.terminate(send_out=True))
 
-        Beacon.suspend(False)
+        Beacon.busy(False)
 
     async def _conn_error(self):
         # opponent did not reply in time
@@ -260,15 +271,15 @@ class TicTacToe(Screen):
         # * read_messages - modifies state with opponents moves
         # * place_cb - modifies state with players moves
         if not self.conn or not self.conn.active:
-            print("read_messages() stopped, conn closed")
+            log.warning("read_messages() stopped, conn closed")
             return
 
         async for msg in self.conn.get_msg_aiter():
-            print(f"ttt -> {msg}")
+            log.debug("ttt -> %s", msg)
             
             # Handle cancellation from other badge
             if msg.msg_type == "CancelActivityMsg":
-                print("TicTacToe: Received cancel from other badge")
+                log.info("TicTacToe: Received cancel from other badge")
                 self.cancelled = True
                 self.cancel_turn_timer()
                 self.ui_state = GAME_OVER
@@ -303,7 +314,7 @@ class TicTacToe(Screen):
                 self.start_turn_timer(5000, fail_coro=self._player_empty_move())
 
             elif self.ui_state is WAITING_PLAYER:
-                print(f"Error: Received {msg.msg_type} while waiting Player!!!")
+                log.error("Received %s while waiting Player!!!", msg.msg_type)
                 continue
 
             if msg.msg_type == "TttMove":
@@ -382,7 +393,7 @@ class TicTacToe(Screen):
             try:
                 self.conn.send_app_msg(TttEnd(winner, move), sync=False)
             except Exception as e:
-                print(f"Failed to send TttEnd: {e}")
+                log.error("Failed to send TttEnd: %s", e)
 
             self.set_info_label("You Won!!" if winner else "It's A DRAW!")
             self.ui_state = GAME_OVER
@@ -407,7 +418,7 @@ class TicTacToe(Screen):
         self.update_board(self.g_state.to_dict(), upd_btn=ended)
 
     def start_cb(self, *args):
-        print(f"start_cb: {args}")
+        log.debug("start_cb: %s", args)
         # Prevent starting new rounds when match is over (best-of) or max rounds reached
         if self.wins >= self.needed_wins or self.opponent_wins >= self.needed_wins or self.round >= self.max_round:
             self.set_info_label("Match finished", err=True)
@@ -478,7 +489,7 @@ class TicTacToe(Screen):
             dest = self.mov_mat[0][i]
         else:
             dest = self.mov_mat[1][i]
-        print(f"move={i}, to={dest}")
+        log.debug("move=%s, to=%s", i, dest)
         self.move_to(self.leds[dest])
 
     def set_player_label(self, player):
@@ -511,7 +522,7 @@ class TicTacToe(Screen):
         )
 
     def cancel_turn_timer(self):
-        print("turn timer cancelled")
+        log.debug("turn timer cancelled")
         if self.turn_timer and not self.turn_timer.done():
             self.turn_timer.cancel()
 
@@ -536,7 +547,7 @@ class TTTGException(Exception):
 class TTTGame:
     def __init__(self, state=None):
 
-        print(f"TTTGame: {state=}")
+        log.debug("TTTGame: state=%r", state)
         if state:
             self.board = state["board"]
             self.cp = state["cp"]
@@ -592,7 +603,7 @@ class TTTGame:
     def make_move(self, row, col):
         if not self._act:
             raise Exception("Game has ended")
-        print(f"make move {row=} {col=} with {self.cp}")
+        log.debug("make move row=%r col=%r with %s", row, col, self.cp)
         if self.board[row][col] != "":
             raise Exception(
                 f"Invalid move: {row=} {col=} already taken by {self.board[row][col]}"
@@ -600,13 +611,13 @@ class TTTGame:
 
         self.board[row][col] = self.cp
         if self.is_winner(self.cp):
-            print(f"Player {self.cp} wins!")
+            log.info("Player %s wins!", self.cp)
             self._act = False
             self.champ = self.cp
             return True
         if self.is_draw():
             self._act = False
-            print("It's a draw!")
+            log.info("It's a draw!")
             return True
 
         return False
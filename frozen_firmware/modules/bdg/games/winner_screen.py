@@ -4,6 +4,9 @@ from gui.core.writer import CWriter
 from gui.fonts import arial35, font10
 from gui.widgets import Label, Button
 import asyncio
+from bdg.log import get_log
+
+log = get_log(__name__)
 
 
 class WinScr(Screen):
@@ -51,7 +54,7 @@ class WinScr(Screen):
             try:
                 asyncio.create_task(self.conn.terminate(send_out=True))
             except Exception as e:
-                print("Failed to terminate connection:", e)
+                log.error("Failed to terminate connection: %s", e)
 
         # Correct import: ScannerScreen, not BadgeScreen
         from bdg.screens.scan_screen import ScannerScreen
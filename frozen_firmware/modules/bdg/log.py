@@ -0,0 +1,151 @@
+"""
+Leveled logging with a ring buffer in RAM.
+
+print() over the UART REPL costs milliseconds per line, so the radio stack and
+the games log through here instead. A module gets a logger named after it:
+
+    from bdg.log import get_log
+    log = get_log(__name__)
+    log.debug("recv %s from %s", msg, mac)
+
+Arguments are formatted with % only when the logger's level lets the record
+through, a disabled level costs a call and a compare. For arguments that are
+expensive to compute guard the call with log.on(DEBUG).
+
+Records at the logger's level or above are kept in a ring buffer of the last
+RING records, those at the console level or above are printed too. From the
+REPL:
+    import bdg.log as L
+    L.dump()                         # ring buffer, oldest first
+    L.dump("bdg.msg", L.WARNING)     # only bdg.msg.* warnings and errors
+    L.set_level(L.DEBUG, "bdg.msg.connection")
+    L.set_console(L.DEBUG)           # print everything that is logged
+"""
+
+from time import ticks_ms
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+OFF = 100
+
+_TAGS = {DEBUG: "D", INFO: "I", WARNING: "W", ERROR: "E"}
+
+RING = 64  # records kept
+
+_level = INFO  # of loggers without a level of their own
+_console = WARNING
+_levels = {}  # logger name or package prefix: level
+_loggers = {}  # name: Log
+_ring = [None] * RING
+_pos = 0  # next slot to write
+_count = 0  # records written since reset
+
+
+class Log:
+    # created by get_log(), level is kept up to date by set_level()
+    def __init__(self, name):
+        self.name = name
+        self.level = _level_of(name)
+
+    def on(self, level):
+        return level >= self.level
+
+    def debug(self, fmt, *args):
+        if DEBUG >= self.level:
+            _record(DEBUG, self.name, fmt, args)
+
+    def info(self, fmt, *args):
+        if INFO >= self.level:
+            _record(INFO, self.name, fmt, args)
+
+    def warning(self, fmt, *args):
+        if WARNING >= self.level:
+            _record(WARNING, self.name, fmt, args)
+
+    def error(self, fmt, *args):
+        if ERROR >= self.level:
+            _record(ERROR, self.name, fmt, args)
+
+
+def _level_of(name):
+    # the longest matching prefix wins, "bdg.msg" covers "bdg.msg.connection"
+    best = None
+    for prefix, level in _levels.items():
+        if (name == prefix or name.startswith(prefix + ".")) and (
+            best is None or len(prefix) > len(best)
+        ):
+            best = prefix
+    return _level if best is None else _levels[best]
+
+
+def _record(level, name, fmt, args):
+    global _pos, _count
+    if args:
+        try:
+            fmt = fmt % args
+        except Exception as e:
+            fmt = f"{fmt} {args} ({e})"
+    _ring[_pos] = (ticks_ms(), level, name, fmt)
+    _pos = (_pos + 1) % RING
+    _count += 1
+    if level >= _console:
+        print(f"{_TAGS[level]} {name}: {fmt}")
+
+
+def get_log(name):
+    """Returns the logger of name, one per name."""
+    log = _loggers.get(name)
+    if log is None:
+        log = _loggers[name] = Log(name)
+    return log
+
+
+def set_level(level, name=None):
+    """
+    Sets the level of the loggers of name and below it, of all loggers
+    without a level of their own if name is None.
+    """
+    global _level
+    if name is None:
+        _level = level
+    else:
+        _levels[name] = level
+    for log in _loggers.values():
+        log.level = _level_of(log.name)
+
+
+def set_console(level):
+    """Records at level or above are printed as well, OFF prints nothing."""
+    global _console
+    _console = level
+
+
+def records(name=None, level=DEBUG):
+    # ring buffer contents oldest first, filtered like dump()
+    n = min(_count, RING)
+    out = []
+    for i in range(_pos - n, _pos):
+        r = _ring[i % RING]
+        if r[1] >= level and (
+            name is None or r[2] == name or r[2].startswith(name + ".")
+        ):
+            out.append(r)
+    return out
+
+
+def dump(name=None, level=DEBUG):
+    """Prints the kept records of logger name (and below it) at level or above."""
+    for t, lvl, n, msg in records(name, level):
+        print(f"{t:10d} {_TAGS[lvl]} {n}: {msg}")
+    if _count > RING:
+        print(f"({_count - RING} older records dropped)")
+
+
+def reset():
+    global _pos, _count
+    for i in range(RING):
+        _ring[i] = None
+    _pos = 0
+    _count = 0
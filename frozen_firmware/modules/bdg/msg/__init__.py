@@ -3,10 +3,47 @@ import asyncio
 import gc
 import random
 
-from time import time
+from binascii import crc32
+
+from time import time, ticks_ms, ticks_diff
 
 import umsgpack
 
+from bdg.msg.unpacker import Unpacker
+from bdg.log import get_log
+
+log = get_log(__name__)
+
+
+# Compact wire format (codec v1). A frame is a fixed 4 byte header followed by
+# a msgpack array of the message fields in constructor order:
+#
+#   [WIRE_MAGIC][WIRE_VER][type id][msg id] + umsgpack.dumps([field, ...])
+#
+# 0xC1 is the only byte msgpack never emits, so a compact frame can't be
+# mistaken for a legacy dict frame and both formats can be received side by side.
+WIRE_MAGIC = 0xC1
+WIRE_VER = 1
+WIRE_HDR_LEN = 4
+
+# Type id 6 in the header marks a bundle of several frames for one badge, the
+# msg id byte holds their count. Not a message type, see bdg.msg.connection.
+# Link level type ids: 1-5 messages, 6 bundle, 7-8 bulk transfer.
+WIRE_BUNDLE = 6
+
+# values for BadgeMsg.wire_format
+WIRE_LEGACY = 0  # msgpack dict with class and field names, understood by all firmwares
+WIRE_COMPACT = 1
+
+
+def beacon_key(frame):
+    # crc32 of the fields of a compact beacon frame, the header with its msg id
+    # left out, in 30 bits to stay a small int. Every field is covered.
+    return crc32(memoryview(frame)[WIRE_HDR_LEN:]) & 0x3FFFFFFF
+
+
+NoneType = type(None)
+
 
 # Low level messages that handle connection link
 class BadgeMsg(object):
@@ -14,92 +51,308 @@ class BadgeMsg(object):
 
     # store all known message types trough .register decorator
     __msg_type_reg = {}
-    __core_types = ()
+
+    # Compact codec: a message type opts in by declaring a stable type id and
+    # its constructor arguments in order. An argument is a name or a
+    # (name, type(s)) pair, received values are type checked against the latter.
+    # Ids are part of the protocol, never reuse or renumber them. Types without
+    # an id are always sent in the legacy dict format.
+    _tid: int = None
+    _fields: tuple = ()
+    _tid_reg = {}  # type id -> class, filled by .register
+
+    # Field plan computed once by .register for types with an id. Messages
+    # with a plan are encoded and decoded without reflection or **kwargs, so
+    # their __init__ must only store its arguments under the same names.
+    _names: tuple = None
+    _types: tuple = None
+    _core = False  # link level message, carries its own msg id
+    msg_type: str = None
+
+    # Types consumed by the radio stack itself and never handed to apps are
+    # decoded by BadgeMsg.decode into one reused instance instead of a new one.
+    _pooled = False
+    __pool = {}  # type id -> reused instance
+    __unpacker = Unpacker()
+
+    # format of frames to badges that have not shown to understand codec v1,
+    # NowListener sends compact frames to a badge once it heard a compact
+    # beacon of it. WIRE_COMPACT sends compact frames to every badge, for
+    # fleets without firmware 1.0.4 and older.
+    wire_format = WIRE_LEGACY
 
     @property
     def id(self):
         return  self.__id % 255
 
     def __init__(self):
-        if type(self) in BadgeMsg.__core_types:
+        if self._core:
             BadgeMsg.__message_id += 1
             self.__id = BadgeMsg.__message_id
-        self.msg_type: str = type(self).__name__
 
-    def to_dict(self):
-        d = {"_id": self.id} if type(self) in BadgeMsg.__core_types else dict()
-        for k, v in self.__dict__.items():
-            if k.startswith("__") or callable(v):
-                continue
-            if isinstance(v, BadgeMsg):
-                d.update({k: v.to_dict()})
-            else:
-                d.update({k: v})
+    def set_id(self, msg_id):
+        # for replies that carry the id of the message they answer
+        self.__id = msg_id
+
+    @staticmethod
+    def new_id():
+        # next id of the shared counter, for frames sent without a message object
+        BadgeMsg.__message_id += 1
+        return BadgeMsg.__message_id % 255
 
+    def to_dict(self):
+        d = {"_id": self.id, "msg_type": self.msg_type} if self._core else {"msg_type": self.msg_type}
+        names = self._names
+        if names is None:
+            # no plan, unregistered type or one without type id
+            for k, v in self.__dict__.items():
+                if k.startswith("__") or callable(v):
+                    continue
+                d[k] = v.to_dict() if isinstance(v, BadgeMsg) else v
+            return d
+
+        for k in names:
+            v = getattr(self, k)
+            d[k] = v.to_dict() if isinstance(v, BadgeMsg) else v
         return d
 
     def __str__(self):
         return str(self.to_dict())
 
-    def srlz(self):
+    def srlz(self, compact=None):
+        # compact None: by wire_format
+        if compact is None:
+            compact = BadgeMsg.wire_format == WIRE_COMPACT
+        if compact and self._is_compact():
+            return self.srlz_compact()
         return umsgpack.dumps(self.to_dict())
 
+    def srlz_compact(self):
+        hdr = bytes((WIRE_MAGIC, WIRE_VER, self._tid, self.id))
+        if not self._names:
+            return hdr  # header only message like AckMsg
+        return hdr + umsgpack.dumps(self._wire_args())
+
+    def _is_compact(self):
+        return self._tid is not None
+
+    def _wire_args(self):
+        # field values in constructor order
+        return [getattr(self, k) for k in self._names]
+
+    @classmethod
+    def _build(cls, values):
+        # Create message from values in plan order without calling __init__,
+        # does not advance the message id counter.
+        names, types = cls._names, cls._types
+        msg = object.__new__(cls)
+        for i in range(len(names)):
+            v = values[i]
+            t = types[i]
+            if t is not None and not isinstance(v, t):
+                raise TypeError(f"{cls.msg_type}.{names[i]}: {type(v).__name__}")
+            setattr(msg, names[i], v)
+        return msg
+
+    @classmethod
+    def _from_wire(cls, args):
+        if len(args) == len(cls._names):
+            return cls._build(args)
+        # sender with different field count, let ctor apply defaults
+        return cls(*args)
+
+    @classmethod
+    def _read(cls, up, n, msg=None):
+        # Read n array items from Unpacker straight into msg or a new instance
+        names, types = cls._names, cls._types
+        if n != len(names):
+            # sender with different field count, let ctor apply defaults
+            return cls(*[up.value() for _ in range(n)])
+        if msg is None:
+            msg = object.__new__(cls)
+        for i in range(n):
+            v = up.value()
+            t = types[i]
+            if t is not None and not isinstance(v, t):
+                raise TypeError(f"{cls.msg_type}.{names[i]}: {type(v).__name__}")
+            setattr(msg, names[i], v)
+        return msg
+
+    @classmethod
+    def _from_dict(cls, d):
+        names = cls._names
+        if names is not None:
+            for k in names:
+                if k not in d:
+                    break
+            else:
+                return cls._build([d[k] for k in names])
+        return cls(**{k: v for k, v in d.items() if k != "msg_type" and k != "_id"})
+
     @classmethod
     def register(cls, subclass):
         def decorator(subclz):
             # print(f"{cls=} ad {subclz=}")
             cls.__msg_type_reg[subclz.__name__] = subclz
             cls.__registered_messages = cls.__msg_type_reg.keys()
-            cls.__core_types = tuple(cls.__msg_type_reg.values())
+            subclz.msg_type = subclz.__name__
+            subclz._core = cls is BadgeMsg
+
+            tid = subclz._tid
+            if tid is not None:
+                if not 0 < tid < 256:
+                    raise ValueError(f"{subclz.__name__}: type id {tid} out of range")
+                known = cls._tid_reg.get(tid)
+                # same name may register again, e.g. dev version of a frozen game
+                if known is not None and known.__name__ != subclz.__name__:
+                    raise ValueError(
+                        f"{subclz.__name__}: type id {tid} already used by {known.__name__}"
+                    )
+                cls._tid_reg[tid] = subclz
+
+                names, types = [], []
+                for f in subclz._fields:
+                    if isinstance(f, tuple):
+                        names.append(f[0])
+                        types.append(f[1])
+                    else:
+                        names.append(f)
+                        types.append(None)
+                subclz._names = tuple(names)
+                subclz._types = tuple(types)
             return subclz
 
         return decorator(subclass)
 
+    @staticmethod
+    def _desrlz_compact(dump) -> "BadgeMsg":
+        if dump[1] != WIRE_VER:
+            log.warning("desrlz: unsupported wire version %s", dump[1])
+            return None
+        tid, mid = dump[2], dump[3]
+        ctor = BadgeMsg._tid_reg.get(tid)
+        if ctor is None:
+            log.warning("desrlz: unknown type id %s", tid)
+            return None
+
+        args = umsgpack.loads(dump[WIRE_HDR_LEN:]) if len(dump) > WIRE_HDR_LEN else ()
+        if not isinstance(args, (list, tuple)):
+            log.warning("desrlz: compact body is not an array")
+            return None
+
+        try:
+            msg = ctor._from_wire(args)
+        except Exception as e:
+            log.error("desrlz: ctor raised for type id %s: %s", tid, e)
+            return None
+        if msg is None:
+            return None
+
+        msg.__id = mid
+        return msg
+
+    @staticmethod
+    def decode(buf, pool=None) -> "BadgeMsg":
+        """
+        Decode a received frame without copying it, for the radio receive path.
+
+        Compact frames are read in place from buf (bytes, bytearray or
+        memoryview, e.g. the reused aioespnow receive buffer). Pooled types
+        (BeaconMsg, AckMsg, the AppMsg envelope) are decoded into one reused
+        instance per type, the result is valid only until the next decode()
+        with the same pool. pool is a dict of its own for a decoder whose
+        results have to outlive other decoders' calls, a NowListener's.
+        Legacy frames go through desrlz. Returns None for malformed frames.
+        """
+        if len(buf) < WIRE_HDR_LEN or buf[0] != WIRE_MAGIC:
+            return BadgeMsg.desrlz(buf if isinstance(buf, (bytes, bytearray)) else bytes(buf))
+        if buf[1] != WIRE_VER:
+            log.warning("decode: unsupported wire version %s", buf[1])
+            return None
+        tid = buf[2]
+        ctor = BadgeMsg._tid_reg.get(tid)
+        if ctor is None:
+            log.warning("decode: unknown type id %s", tid)
+            return None
+
+        msg = None
+        if ctor._pooled:
+            if pool is None:
+                pool = BadgeMsg.__pool
+            msg = pool.get(tid)
+            if msg is None:
+                msg = pool[tid] = object.__new__(ctor)
+
+        up = BadgeMsg.__unpacker
+        try:
+            if len(buf) == WIRE_HDR_LEN:
+                if ctor._names:
+                    raise ValueError("missing body")
+                msg = msg or object.__new__(ctor)
+            else:
+                up.reset(buf, WIRE_HDR_LEN)
+                msg = ctor._read(up, up.array_len(), msg)
+        except Exception as e:
+            log.warning("decode: type id %s: %s", tid, e)
+            return None
+        finally:
+            up.release()
+        if msg is None:
+            return None
+
+        msg.__id = buf[3]
+        return msg
+
     @staticmethod
     def desrlz(dump) -> "BadgeMsg":
         # Lightweight guards to avoid crashes and OOM from malformed or oversized payloads
         MAX_MSG_BYTES = 4096
         try:
             if not isinstance(dump, (bytes, bytearray)):
-                print("desrlz: non-bytes payload")
+                log.warning("desrlz: non-bytes payload")
                 return None
             if len(dump) > MAX_MSG_BYTES:
-                print("desrlz: oversized payload", len(dump))
+                log.warning("desrlz: oversized payload %s", len(dump))
                 return None
 
+            if dump and dump[0] == WIRE_MAGIC:
+                if len(dump) < WIRE_HDR_LEN:
+                    log.warning("desrlz: truncated header")
+                    return None
+                return BadgeMsg._desrlz_compact(dump)
+
+            # legacy dict format
             d = umsgpack.loads(dump)
 
             if not isinstance(d, dict):
-                print("desrlz: unpacked payload is not a dict")
+                log.warning("desrlz: unpacked payload is not a dict")
                 return None
 
             ctype = d.get("msg_type")
             mid = d.get("_id")
             if not isinstance(ctype, str) or not isinstance(mid, int):
-                print("desrlz: invalid header types", ctype, mid)
+                log.warning("desrlz: invalid header types %s %s", ctype, mid)
                 return None
 
-            rest = {k: v for k, v in d.items() if k not in ["msg_type", "_id"]}
-
             ctor = BadgeMsg.__msg_type_reg.get(ctype)
             if ctor is None:
-                print(f"desrlz: unknown msg_type {ctype}")
+                log.warning("desrlz: unknown msg_type %s", ctype)
                 return None
 
             try:
-                msg = ctor(**rest)
+                msg = ctor._from_dict(d)
             except TypeError as e:
-                print(f"desrlz: ctor TypeError for {ctype}: {e}")
+                log.error("desrlz: ctor TypeError for %s: %s", ctype, e)
                 return None
             except Exception as e:
-                print(f"desrlz: ctor raised for {ctype}: {e}")
+                log.error("desrlz: ctor raised for %s: %s", ctype, e)
                 return None
 
             msg.__id = mid
             return msg
         except Exception as e:
             h = dump[:32] if isinstance(dump, (bytes, bytearray)) else b""
-            print(f"Error deserializing msg: {e}, head={h.hex()}")
+            log.error("Error deserializing msg: %s, head=%s", e, h.hex())
             return None
 
 
@@ -109,18 +362,38 @@ class BadgeMsg(object):
 # Low level message that handle connection link
 @BadgeMsg.register
 class BeaconMsg(BadgeMsg):
-    def __init__(self, nick: str):
+    _tid = 1
+    # NowListener tells a changed beacon of a known badge by its beacon_key(),
+    # which covers every field, a change of caps, fw or busy is never missed
+    _fields = (("nick", str), ("caps", int), ("fw", int), ("busy", bool))
+    _pooled = True
+
+    # caps: bitmap of multiplayer con_ids, bit n for con_id n, see
+    # GameRegistry.multiplayer_caps(). -1 is a beacon of firmware without
+    # capabilities. fw: Version.code(). busy: in a game or connecting.
+    # Fields added by newer firmware end up in more.
+    def __init__(self, nick: str, caps: int = -1, fw: int = 0, busy: bool = False, *more):
         super().__init__()
         self.nick: str = nick
+        # a beacon with more fields than ours is decoded without type checks
+        self.caps: int = caps if isinstance(caps, int) else -1
+        self.fw: int = fw if isinstance(fw, int) else 0
+        self.busy: bool = bool(busy)
+
+    def to_dict(self):
+        # the legacy format is for firmware 1.0.4 and older, their BeaconMsg takes only a nick
+        return {"_id": self.id, "msg_type": self.msg_type, "nick": self.nick}
 
 
 # Low level message that handle connection link
 @BadgeMsg.register
 class AckMsg(BadgeMsg):
+    _tid = 2  # no fields, acked msg id travels in the header
+    _pooled = True
+
     def __init__(self, id: int=None):
         # super().__init__() no super init as this would advance msg_id
-        self.msg_type: str = type(self).__name__
-        self.__id = id
+        self.set_id(id)
 
 
 # ask for connection
@@ -129,6 +402,9 @@ class AckMsg(BadgeMsg):
 # Low level message that handle connection link
 @BadgeMsg.register
 class OpenConn(BadgeMsg):
+    _tid = 3
+    _fields = (("con_id", int), ("accept", bool), ("session_id", (int, NoneType)))
+
     def __init__(self, con_id: int, accept: bool = True, session_id: int = None):
         super().__init__()
         self.con_id: int = con_id  # if True  request, if False response
@@ -139,11 +415,45 @@ class OpenConn(BadgeMsg):
 # Low level message that handle connection link
 @BadgeMsg.register
 class ConTerm(BadgeMsg):
+    _tid = 4
+    _fields = (("con_id", int),)
+
     def __init__(self, con_id: int):
         super().__init__()
         self.con_id: int = con_id
 
 
+# Bulk transfer chunk and its selective ack, see bdg.msg.bulk.
+# Consumed by the connection layer, the app gets the reassembled payload.
+@BadgeMsg.register
+class BulkChunk(BadgeMsg):
+    _tid = 7
+    _fields = (("con_id", int), ("xfer", int), ("seq", int), ("total", int), ("data", bytes))
+    _pooled = True
+
+    def __init__(self, con_id: int, xfer: int, seq: int, total: int, data: bytes):
+        super().__init__()
+        self.con_id: int = con_id
+        self.xfer: int = xfer  # transfer id, wraps at 256
+        self.seq: int = seq  # chunk index
+        self.total: int = total  # payload length in bytes
+        self.data: bytes = data
+
+
+@BadgeMsg.register
+class BulkAck(BadgeMsg):
+    _tid = 8
+    _fields = (("con_id", int), ("xfer", int), ("base", int), ("bits", int))
+    _pooled = True
+
+    def __init__(self, con_id: int, xfer: int, base: int, bits: int):
+        super().__init__()
+        self.con_id: int = con_id
+        self.xfer: int = xfer
+        self.base: int = base  # chunks below base all received
+        self.bits: int = bits  # bit i set: chunk base + i received
+
+
 # Application to application message header AppMsg contains a msg instance
 # and application ID Application is talking to device B to same App id,
 # a bit like content type.
@@ -154,8 +464,13 @@ class ConTerm(BadgeMsg):
 
 @BadgeMsg.register
 class AppMsg(BadgeMsg):
+    _tid = 5
+    _fields = (("content", BadgeMsg), ("con_id", int), ("session_id", (int, NoneType)))
+    _pooled = True  # stack passes only .content to the app
 
     __msg_type_reg = {}
+    # content type ids, separate id space from the link level messages
+    _tid_reg = {}
 
     def __init__(self, content: object, con_id: int = 0, session_id: int = None):
         super().__init__()
@@ -172,10 +487,56 @@ class AppMsg(BadgeMsg):
             }
             self.content: BadgeMsg = self.__msg_type_reg.get(ctype)(**rest)
 
+    def _is_compact(self):
+        return self.content._tid is not None
+
+    def _wire_args(self):
+        # flattened envelope: [con_id, session_id, content type id, *content fields]
+        c = self.content
+        return [self.con_id, self.session_id, c._tid] + c._wire_args()
+
+    @classmethod
+    def _from_wire(cls, args):
+        ctor = cls._tid_reg.get(args[2])
+        if ctor is None:
+            log.warning("desrlz: unknown app type id %s", args[2])
+            return None
+        return cls._build((ctor._from_wire(args[3:]), args[0], args[1]))
+
+    @classmethod
+    def _read(cls, up, n, msg=None):
+        if n < 3:
+            raise ValueError("short AppMsg")
+        con_id, session_id, ctid = up.value(), up.value(), up.value()
+        ctor = cls._tid_reg.get(ctid)
+        if ctor is None:
+            raise ValueError(f"unknown app type id {ctid}")
+        if not isinstance(con_id, int) or not isinstance(session_id, (int, NoneType)):
+            raise TypeError("AppMsg: bad envelope")
+        if msg is None:
+            msg = object.__new__(cls)
+        msg.content = ctor._read(up, n - 3)  # app keeps content, never pooled
+        msg.con_id = con_id
+        msg.session_id = session_id
+        return msg
+
+    @classmethod
+    def _from_dict(cls, d):
+        c = d.get("content")
+        if not isinstance(c, dict):
+            raise TypeError("AppMsg.content: not a dict")
+        ctor = cls.__msg_type_reg.get(c.get("msg_type"))
+        if ctor is None:
+            raise TypeError(f"AppMsg.content: unknown msg_type {c.get('msg_type')}")
+        return cls._build((ctor._from_dict(c), d.get("con_id", 0), d.get("session_id")))
+
 
 # most basic App msg that is handled by the connection stack
 @AppMsg.register
 class PingMsg(BadgeMsg):
+    _tid = 1
+    _fields = (("mark", (int, float)), ("reply", bool))
+
     def __init__(self, mark: float, reply):
         super().__init__()
         self.mark: float = mark
@@ -184,11 +545,19 @@ class PingMsg(BadgeMsg):
 
 # Now messages does not have to be defined in this file, it is enough to import
 # BadgeMsg and decorate all messages with @BadgeMsg.register.
+# App message type ids in use (keep this list up to date when adding types):
+#   1-15   bdg.msg             PingMsg, RPSMsg, CancelActivityMsg, VictoryMsg
+#   16-23  bdg.games.tictac    TttStart, TttMove, TttEnd
+#   24-31  bdg.games.rps       RpsMove, MatchOver, Nickname
+#   32-39  bdg.games.reaction_multi_game  ReactionStart, ReactionEnd
 
 
 # Example of AppMsg
 @AppMsg.register
 class RPSMsg(BadgeMsg):
+    _tid = 2
+    _fields = (("choice", int),)
+
     def __init__(self, choice: int):
         super().__init__()
         self.choice: int = choice
@@ -197,12 +566,17 @@ class RPSMsg(BadgeMsg):
 @AppMsg.register
 class CancelActivityMsg(BadgeMsg):
     """Message sent when a badge exits from LoadingScreen or multiplayer game"""
+    _tid = 3
+
     def __init__(self):
         super().__init__()
 
 
 @AppMsg.register
 class VictoryMsg(BadgeMsg):
+    _tid = 4
+    _fields = (("your", int), ("mine", int), ("tie", bool), ("me_win", bool))
+
     def __init__(self, your: int, mine: int, tie: bool = False, me_win: bool = False):
         super().__init__()
         self.your: int = your
@@ -211,19 +585,65 @@ class VictoryMsg(BadgeMsg):
         self.me_win: bool = me_win
 
 
+class FrameTemplate:
+    """
+    Frame of msg encoded once, for frames that are sent again and again with
+    only the msg id in the header changing: beacons, acks, ConTerm.
+
+    frame(msg_id) patches the id into one of ring reused bytearrays, handed out
+    in turn, so a frame must have left out_q (sent or copied into a bundle)
+    before ring more frames are taken from the same template. ring=0 copies
+    the encoded frame every time, for frames kept in waiting_ack for retries,
+    still without a message object, dict or msgpack on the way. A frame in
+    the legacy wire format, frame(msg_id, False), is encoded anew every time.
+    """
+
+    def __init__(self, msg: BadgeMsg, ring=1):
+        self.msg = msg
+        self.encoded = msg.srlz_compact()
+        self.bufs = [bytearray(self.encoded) for _ in range(ring)]
+        self._i = 0
+
+    def frame(self, msg_id, compact=None):
+        # compact None: by BadgeMsg.wire_format
+        if compact is None:
+            compact = BadgeMsg.wire_format == WIRE_COMPACT
+        if not compact:
+            self.msg.set_id(msg_id)
+            return umsgpack.dumps(self.msg.to_dict())
+        if self.bufs:
+            buf = self.bufs[self._i]
+            self._i = (self._i + 1) % len(self.bufs)
+        else:
+            buf = bytearray(self.encoded)
+        buf[3] = msg_id % 255  # [WIRE_MAGIC][WIRE_VER][tid][msg id]
+        return buf
+
+
+SEND_GAP_MS = 2  # pacing, minimum time between frames handed to the radio
+_last_send = {}  # id(espnow): ticks_ms, one radio on a badge, many on firmware/vradio.py
+
+
 async def send_message(espnow, mac: bytes, msg: bytes, sync=False, retries=3):
+    wait = SEND_GAP_MS - ticks_diff(ticks_ms(), _last_send.get(id(espnow), 0))
+    if wait > 0:
+        await asyncio.sleep_ms(wait)
     for _ in range(retries):  # tree retries on sending
         try:
             await espnow.asend(mac, msg, sync=sync)
-            print(f"<<<{mac}:{msg}")
+            _last_send[id(espnow)] = ticks_ms()
+            log.debug("<<<%s:%s", mac, msg)
             return
         except OSError as err:
-            print(f"send retry: {err}")
+            log.warning("send retry: %s", err)
             if len(err.args) < 2:
                 raise err
             if err.args[1] == "ESP_ERR_ESPNOW_NOT_INIT":
                 espnow.active(True)
                 gc.collect()
+            elif err.args[1] == "ESP_ERR_ESPNOW_NO_MEM":
+                # radio tx queue is full, back off instead of flooding it
+                await asyncio.sleep_ms(SEND_GAP_MS * 10)
             elif err.args[1] == "ESP_ERR_ESPNOW_NOT_FOUND":
                 espnow.add_peer(mac)
                 gc.collect()
@@ -235,14 +655,21 @@ async def send_message(espnow, mac: bytes, msg: bytes, sync=False, retries=3):
             else:
                 raise err
         except Exception as e:
-            print(f"send message Exeption {e}")
+            log.error("send message Exeption %s", e)
             raise e
 
-    print("msg-send out")
+    log.warning("msg-send out")
 
 
 class BadgeAdr(object):
     # BadgeAdr is result in receivers end of receiving BeaconMsg
+    frame_key = -1  # beacon_key() of the last decoded beacon frame, -1 none, see NowListener.task
+    caps = -1  # BeaconMsg capabilities
+    fw = 0
+    busy = False
+    band = 0  # rssi band of PeerTable.ranked()
+    compact = False  # beacons in the compact format, the badge understands codec v1
+
     def __init__(self, mac: bytes, nick: str, rssi: int, last_seen: float):
         self.mac: bytes = mac
         self.nick: bytes = nick
@@ -260,111 +687,14 @@ class BadgeAdr(object):
             return self.mac == other.mac
         return False
 
+    def plays(self, caps):
+        # True if the badge has one of the games of caps, a badge that
+        # does not beacon its capabilities may have any. caps 0, no games
+        # known to ask for, does not filter.
+        return not caps or self.caps < 0 or bool(self.caps & caps)
 
-null_badge_adr = BadgeAdr(b"\x00\x00\x00\x00\x00\x00", b"[none]", -1, 0)
-
-
-class BadgeAdrDict:
-    # Dict like class for having fixed number of BadgeAdr instances with mac as key
-    def __init__(self, max_size, stale_multiplier=2.6):
-        self.max_size = max_size
-        self.stale_multiplier = stale_multiplier  # Multiplier for beacon timeout (e.g., 2.6 * beacon_timeout)
-        self.store = {}
-        self.last_index = None
-
-    def _evict_if_necessary(self):
-        if len(self.store) >= self.max_size:
-            # Find the key with the oldest last_seen value
-            oldest_key = min(self.store, key=lambda k: self.store[k].last_seen)
-            # Remove that key from the store
-            del self.store[oldest_key]
-    
-    def cleanup_stale(self, beacon_timeout):
-        """Remove badges that haven't been seen within stale_multiplier * beacon_timeout seconds.
-        
-        Args:
-            beacon_timeout: The beacon transmission interval in seconds
-        
-        Returns:
-            Number of stale badges removed
-        """
-        stale_timeout = self.stale_multiplier * beacon_timeout
-        current_time = time()
-        stale_keys = []
-        for key, badge in self.store.items():
-            if current_time - badge.last_seen > stale_timeout:
-                stale_keys.append(key)
-        
-        for key in stale_keys:
-            del self.store[key]
-        
-        # Update last_index if it was removed
-        if self.last_index not in self.store and self.store:
-            self.last_index = next(iter(self.store))
-        
-        return len(stale_keys)  # Return number of stale badges removed
-
-    def __setitem__(self, key, value):
-        if not isinstance(value, BadgeAdr):
-            raise ValueError("Value must be an instance of BadgeAdr.")
-
-        if key != value.mac:
-            raise ValueError("Key must match the 'mac' attribute of the value.")
-
-        self._evict_if_necessary()
-        self.store[key] = value
-        self.store[key].last_seen = time()
-        self.last_index = key
-
-    def __getitem__(self, key):
-        if key in self.store:
-            return self.store[key]
-        raise KeyError(f"Key {key} not found in store.")
-
-    def __delitem__(self, key):
-        if key in self.store:
-            del self.store[key]
-        else:
-            raise KeyError(f"Key {key} not found in store.")
-
-    def __contains__(self, key):
-        return key in self.store
-
-    def __len__(self):
-        return len(self.store)
-
-    def __iter__(self):
-        # for casting a simple dict(badge_addr_dict)
-        for key in self.store:
-            yield key, self.store[key]
-
-    def items(self):
-        return self.store.items()
-
-    def values(self):
-        return self.store.values()
-
-    def keys(self):
-        return self.store.keys()
-
-    def latest(self):
-        # Handle case where last_index badge was removed (e.g., by cleanup_stale)
-        if self.last_index and self.last_index in self.store:
-            return self.store[self.last_index]
-        # Fallback: return any badge if store is not empty
-        if self.store:
-            self.last_index = next(iter(self.store))
-            return self.store[self.last_index]
-        # No badges available
-        return None
-
-    def update_last_seen(self, key, last_seen):
-        if key in self.store:
-            self.store[key].last_seen = last_seen
-            self.last_index = key
-            return True
-        return False
 
+null_badge_adr = BadgeAdr(b"\x00\x00\x00\x00\x00\x00", b"[none]", -1, 0)
 
 
 def test():
@@ -381,7 +711,15 @@ def test():
         content=VictoryMsg(your=aa.content.choice, mine=2, tie=False, me_win=True)
     )
     print(f"{b.to_dict()=}")
-    print(f"{b.srlz()=}")
-    bb: VictoryMsg = BadgeMsg.desrlz(b.srlz())
+    print(f"{b.srlz(True)=}")
+    bb: VictoryMsg = BadgeMsg.desrlz(b.srlz(True))
     print(f"{bb.to_dict()=}")
+
+    # legacy dict frames must still decode, mixed firmware fleets send them
+    legacy = umsgpack.dumps(b.to_dict())
+    print(f"{len(legacy)=} {len(b.srlz(True))=}")
+    bl: AppMsg = BadgeMsg.desrlz(legacy)
+    assert bl.to_dict() == bb.to_dict(), "legacy and compact decode differ"
+    ack = BadgeMsg.desrlz(AckMsg(id=b.id).srlz())
+    assert isinstance(ack, AckMsg) and ack.id == b.id
     print(f"{AppMsg.__registered_messages =} \n" f"{BadgeMsg.__registered_messages=} ")
@@ -0,0 +1,146 @@
+import asyncio
+from time import ticks_ms, ticks_diff, ticks_add
+
+CHUNK = 200  # payload bytes per BulkChunk, the frame stays under 250 bytes
+WINDOW = 16  # chunks in flight, also the width of the BulkAck bitmap
+MAX_BULK = 16384  # largest accepted payload, receive buffer is allocated up front
+MAX_TRIES = 8  # sends of one chunk before the transfer is given up
+ACK_EVERY = 4  # receiver acks every 4th new chunk, gaps and duplicates at once
+
+
+def chunks(total):
+    return (total + CHUNK - 1) // CHUNK or 1  # empty payload is one empty chunk
+
+
+class BulkTx:
+    """
+    Sending side of one transfer.
+
+    Chunks base .. base + WINDOW - 1 are in flight. Each has its own deadline
+    and send count in a slot indexed by seq % WINDOW. acked has bit i set when
+    the receiver has chunk base + i, only the missing chunks are resent.
+    """
+
+    def __init__(self, xfer, data):
+        self.xfer = xfer
+        self.data = memoryview(data)
+        self.total = len(data)
+        self.n = chunks(self.total)
+        self.base = 0
+        self.acked = 0
+        self.deadline = [0] * WINDOW
+        self.tries = bytearray(WINDOW)
+        self.retries = 0
+        self.failed = False
+        self._ev = asyncio.Event()
+
+    @property
+    def done(self):
+        return self.base >= self.n
+
+    def chunk(self, seq):
+        return bytes(self.data[seq * CHUNK : (seq + 1) * CHUNK])
+
+    def due(self, now):
+        """
+        Returns chunks to send now (not sent yet or past their deadline) and
+        ms until the next deadline, None if the transfer has to be given up.
+        """
+        send = []
+        wait = None
+        for i in range(WINDOW):
+            seq = self.base + i
+            if seq >= self.n:
+                break
+            if self.acked >> i & 1:
+                continue
+            slot = seq % WINDOW
+            tries = self.tries[slot]
+            left = ticks_diff(self.deadline[slot], now)
+            if tries and left > 0:
+                if wait is None or left < wait:
+                    wait = left
+                continue
+            if tries >= MAX_TRIES:
+                self.failed = True
+                return None, 0
+            send.append(seq)
+        return send, wait
+
+    def sent(self, seq, now, timeout):
+        # chunk seq was queued, resend it if not acked in timeout ms
+        slot = seq % WINDOW
+        if self.tries[slot]:
+            self.retries += 1
+        self.tries[slot] += 1
+        self.deadline[slot] = ticks_add(now, timeout)
+
+    def tries_of(self, seq):
+        return self.tries[seq % WINDOW]
+
+    def ack(self, base, bits):
+        if base < self.base:
+            return  # older than what we know
+        if base > self.base:
+            for seq in range(self.base + WINDOW, min(base + WINDOW, self.n)):
+                self.tries[seq % WINDOW] = 0  # slot gets a new chunk
+            self.base = base
+            self.acked = bits  # a newer ack knows everything an older one did
+        else:
+            self.acked |= bits
+        self._ev.set()
+
+    async def wait(self, ms):
+        self._ev.clear()
+        try:
+            await asyncio.wait_for_ms(self._ev.wait(), ms)
+        except asyncio.TimeoutError:
+            pass
+
+
+class BulkRx:
+    """
+    Receiving side of one transfer, reassembles into a buffer allocated once.
+
+    got is a bitmap of received chunks, base the first missing one.
+    """
+
+    def __init__(self, xfer, total):
+        self.xfer = xfer
+        self.total = total
+        self.n = chunks(total)
+        self.buf = bytearray(total)
+        self.got = bytearray((self.n + 7) // 8)
+        self.base = 0
+        self.count = 0
+        self.start = ticks_ms()
+
+    @property
+    def done(self):
+        return self.count == self.n
+
+    def has(self, seq):
+        return self.got[seq >> 3] >> (seq & 7) & 1
+
+    def put(self, seq, data):
+        """Stores a chunk, returns True if it should be acked right away."""
+        if seq >= self.n or len(data) != min(CHUNK, self.total - seq * CHUNK):
+            return False
+        if self.has(seq):
+            return True  # our ack was lost
+        self.got[seq >> 3] |= 1 << (seq & 7)
+        self.buf[seq * CHUNK : seq * CHUNK + len(data)] = data
+        self.count += 1
+        while self.base < self.n and self.has(self.base):
+            self.base += 1
+        return self.done or self.base <= seq or self.count % ACK_EVERY == 0
+
+    def bits(self):
+        b = 0
+        for i in range(1, WINDOW):
+            seq = self.base + i
+            if seq >= self.n:
+                break
+            if self.has(seq):
+                b |= 1 << i
+        return b
@@ -1,8 +1,9 @@
 import asyncio
-from time import ticks_ms, ticks_diff, time
+import random
+from time import ticks_ms, ticks_diff, ticks_add, time
 
 import aioespnow
-from collections import namedtuple, deque
+from collections import namedtuple
 
 from bdg.msg import (
     OpenConn,
@@ -13,16 +14,44 @@ from bdg.msg import (
     BadgeMsg,
     BeaconMsg,
     BadgeAdr,
-    BadgeAdrDict,
+    beacon_key,
     AckMsg,
+    BulkChunk,
+    BulkAck,
+    CancelActivityMsg,
+    FrameTemplate,
+    WIRE_MAGIC,
+    WIRE_VER,
+    WIRE_HDR_LEN,
+    WIRE_BUNDLE,
+    WIRE_COMPACT,
 )
+from bdg.msg.bulk import BulkTx, BulkRx, MAX_BULK, chunks
+from bdg.msg.dedup import DedupTable
+from bdg.msg.peers import PeerTable
+from bdg.msg.rtt import AckStats, Deadlines, RttTable, RTO_MAX_MS
+from bdg.msg.scheduler import OutScheduler, PRIO_CTRL, PRIO_APP, PRIO_BULK, PRIO_NAMES
+from bdg.msg.stats import RadioStats, IN, OUT, BEACONS, RETRIES, TIMEOUTS, DEDUP, MALFORMED, BLOCKED, WEAK, QFULL
 
 from bdg.utils import AProc
 from primitives import Queue
+from bdg.log import get_log
+
+log = get_log(__name__)
 
 
 OutQueMsg = namedtuple("OutQueMsg", ["msg", "mac", "id", "retry"])
-OutQueAck = namedtuple("OutQueMsg", ["mac", "id"])
+
+
+class _Pending:
+    # OutQueMsg waiting for an ack in NowListener._sender
+    def __init__(self, out_q_t, now, deadline):
+        self.msg = out_q_t.msg
+        self.mac = out_q_t.mac
+        self.retry = out_q_t.retry
+        self.tries = 1
+        self.sent = now
+        self.deadline = deadline
 
 
 class Connection(object):
@@ -61,11 +90,20 @@ class Connection(object):
 
         get_msg_aiter(self):
             Returns an asynchronous iterator to iterate over incoming messages.
+
+        async send_bulk(self, data, timeout=30.0):
+            Sends a payload larger than one frame in chunks. Returns bytes/s, 0 if it failed.
+
+        get_bulk_aiter(self):
+            Returns an asynchronous iterator over received bulk payloads.
+
+        send_cancel(self):
+            Sends CancelActivityMsg, from a frame template kept for the session.
     """
 
     # Connection is a bidirectional communication channel between two badges
-    #
-    def __init__(self, mac: bytes, con_id, espnow):
+    # nl is the NowListener of the badge, the badge's own one by default
+    def __init__(self, mac: bytes, con_id, espnow, nl: "NowListener" = None):
         self._sender_t: asyncio.Task = None
         self.espnow: espnow = espnow
         self.c_mac: bytes = mac
@@ -78,21 +116,29 @@ class Connection(object):
         self.session_id = ticks_ms()  # unique session ID to prevent cross-session messages
         self.in_q = Queue(maxsize=5)
         self.out_q = Queue(maxsize=3)
+        self.bulk_q = Queue(maxsize=2)  # reassembled bulk payloads
+        self._xfer = 0
+        self._bulk_tx: BulkTx = None
+        self._bulk_rx: BulkRx = None
+        self._bulk_done = None  # xfer id of the last completed incoming transfer
+        self._cancel_t: FrameTemplate = None
+        self.nl = nl or NowListener.default(espnow)
 
-        NowListener.register_con(self)
+        self.nl.register_con(self)
 
     def __del__(self):
-        print("conn closed")
+        log.debug("conn closed")
 
     async def terminate(self, send_out=True, reply_to_id=None):
         # send connection terminated to local listeners
         ct = ConTerm(con_id=self.con_id)
         self.in_q.put_nowait(ct)
+        if not self.bulk_q.full():
+            self.bulk_q.put_nowait(None)  # ends get_bulk_aiter
         if send_out:
-            if reply_to_id:
-                ct.__id = reply_to_id
-            self.send_msg(ct)
-            NowListener.unregister_con(self)
+            if not self.closed:
+                self.nl.send_template(con_term(self.con_id), self.c_mac, reply_to=reply_to_id)
+            self.nl.unregister_con(self)
         self.active = False
         self.closed = True
 
@@ -122,15 +168,15 @@ class Connection(object):
             await self.terminate()
             return False
         except Exception as err:
-            print(f"conn err {err}")
+            log.error("conn err %s", err)
             return False
 
     async def ping(self):
-        print(f"ping: ")
+        log.debug("ping: ")
         mark = ticks_ms()
         self.send_app_msg(PingMsg(mark, False), sync=False)
         reply = await asyncio.wait_for(self.in_q.get(), 5)
-        print(f"ping reply: {ticks_diff(ticks_ms(), mark)}ms {reply=}")
+        log.info("ping reply: %sms reply=%r", ticks_diff(ticks_ms(), mark), reply)
         return reply
 
     async def _sender(self):
@@ -138,20 +184,20 @@ class Connection(object):
         # micro gui callbacks are sync so this is needed
         # if in async context self.send_app_msg can be called directly
         if not self.active:
-            print(f"cannot send con {self.con_id} terminated")
+            log.warning("cannot send con %s terminated", self.con_id)
             return  # cannot send on closed connection
         while self.out_q.qsize() > 0 or self.active:
             msg = await asyncio.wait_for(self.out_q.get(), 5000)
-            print(f"_s:  {msg}")
+            log.debug("_s:  %s", msg)
             self.send_app_msg(msg, sync=False)
 
     async def recv_msg(self, msg: BadgeMsg):
         # internal recv_msg that is called from NowListener
-        print(f"recv-msg {msg=}")
+        log.debug("recv-msg msg=%r", msg)
         if isinstance(msg, ConTerm):
             if self.active:
                 await self.terminate(send_out=False)
-                print(f"connection {self.con_id} terminated")
+                log.info("connection %s terminated", self.con_id)
         elif isinstance(msg, OpenConn):
             if not self.active:
                 # Store peer's session_id from their OpenConn
@@ -159,7 +205,7 @@ class Connection(object):
                     self.session_id = msg.session_id
                 self.in_q.put_nowait(msg)
                 self.active = True
-                print(f"connection {self.con_id} activated, session_id={self.session_id}")
+                log.info("connection %s activated, session_id=%s", self.con_id, self.session_id)
             # self.send_msg(AckMsg(id=msg.id), retry=0)
         elif isinstance(msg, PingMsg):
             if msg.reply:
@@ -168,23 +214,38 @@ class Connection(object):
             msg.reply = True
             self.send_app_msg(msg)
         elif not self.active:
-            print("connection not active")
+            log.warning("connection not active")
+        elif self.in_q.full():
+            # app is behind, hold the listener for a while before dropping
+            try:
+                await asyncio.wait_for_ms(self.in_q.put(msg), 500)
+            except asyncio.TimeoutError:
+                log.warning("in_q full, dropped %s", msg)
         else:
-            # this can block, should check quefull and return something to client B
             self.in_q.put_nowait(msg)
 
     def send_app_msg(self, msg: BadgeMsg, sync=False):
         amsg = AppMsg(con_id=self.con_id, content=msg, session_id=self.session_id)
         if self.closed:
-            print(f"cannot send {self.con_id=} is terminated")
+            log.warning("cannot send self.con_id=%r is terminated", self.con_id)
             return  # cannot send on closed connection
-        NowListener.send_msg(amsg, self.c_mac, sync=sync)
+        self.nl.send_msg(amsg, self.c_mac, sync=sync)
 
-    def send_msg(self, msg: BadgeMsg, sync=False, retry=3):
+    def send_msg(self, msg: BadgeMsg, sync=False, retry=3, reply_to=None):
         if self.closed:
-            print(f"cannot send {self.con_id=} is terminated")
+            log.warning("cannot send self.con_id=%r is terminated", self.con_id)
             return  # cannot send on closed connection # TODO :raise
-        NowListener.send_msg(msg, self.c_mac, sync=sync, retry=retry)
+        self.nl.send_msg(msg, self.c_mac, sync=sync, retry=retry, reply_to=reply_to)
+
+    def send_cancel(self):
+        if self.closed:
+            log.warning("cannot send self.con_id=%r is terminated", self.con_id)
+            return
+        t = self._cancel_t
+        if t is None or t.msg.session_id != self.session_id:
+            msg = AppMsg(CancelActivityMsg(), con_id=self.con_id, session_id=self.session_id)
+            t = self._cancel_t = FrameTemplate(msg, ring=0)
+        self.nl.send_template(t, self.c_mac)
 
     async def send_wait_reply(self, msg: BadgeMsg, sync=False, timeout=5.0):
         # raises TimeoutError if timeout exceeded
@@ -201,7 +262,7 @@ class Connection(object):
 
             async def __anext__(self):
                 msg: AppMsg = await self.conn.in_q.get()
-                print(f"__anext__ ")
+                log.debug("__anext__ ")
                 if isinstance(msg, ConTerm):
                     raise StopAsyncIteration
                 self.conn.last_msg = time()
@@ -209,6 +270,101 @@ class Connection(object):
 
         return Aiter(self)
 
+    async def send_bulk(self, data, timeout=30.0):
+        """
+        Sends data of up to bulk.MAX_BULK bytes, the peer gets it in one piece
+        from get_bulk_aiter(). Chunks are sent in a window and only the ones the
+        peer reports missing are resent. data must not change until this returns.
+
+        Returns:
+            int: throughput in bytes/s, 0 if the transfer failed.
+        """
+        if self.closed or self._bulk_tx or len(data) > MAX_BULK:
+            log.warning("cannot send bulk self.con_id=%r len(data)=%r", self.con_id, len(data))
+            return 0
+        self._xfer = (self._xfer + 1) % 256
+        tx = self._bulk_tx = BulkTx(self._xfer, data)
+        rtt = self.nl.rtt[self.c_mac]
+        out_q = self.nl.out_q
+        start = ticks_ms()
+        try:
+            while not tx.done:
+                if self.closed or ticks_diff(ticks_ms(), start) > timeout * 1000:
+                    log.warning("bulk %s timeout", tx.xfer)
+                    return 0
+                send, wait = tx.due(ticks_ms())
+                if send is None:
+                    log.warning("bulk %s chunk %s out of retries", tx.xfer, tx.base)
+                    return 0
+                for seq in send:
+                    await out_q.room(PRIO_BULK)
+                    frame = BulkChunk(self.con_id, tx.xfer, seq, tx.total, tx.chunk(seq))
+                    # bulk transfers are codec v1 only, compact whatever wire_format
+                    if not self.nl.send_frame(frame.srlz_compact(), self.c_mac, PRIO_BULK):
+                        return 0
+                    # the deadline includes the paced frames queued before it
+                    ahead = out_q.depth(PRIO_BULK) * 1000 // out_q.rate
+                    tx.sent(seq, ticks_ms(), rtt.retry_ms(tx.tries_of(seq) + 1) + ahead)
+                if not send:
+                    await tx.wait(wait if wait is not None else 100)
+        finally:
+            self._bulk_tx = None
+        ms = max(1, ticks_diff(ticks_ms(), start))
+        bps = tx.total * 1000 // ms
+        log.info("bulk %sB in %sms: %sB/s %s chunks %s resent", tx.total, ms, bps, tx.n, tx.retries)
+        return bps
+
+    async def _recv_bulk(self, chunk: BulkChunk):
+        # called from NowListener for BulkChunks of this connection
+        if chunk.xfer == self._bulk_done:
+            # sender missed our last ack
+            await self._send_bulk_ack(chunk.xfer, chunks(chunk.total), 0)
+            return
+        rx = self._bulk_rx
+        if rx is None or rx.xfer != chunk.xfer:
+            if chunk.total > MAX_BULK:
+                log.warning("bulk %s too large chunk.total=%r", chunk.xfer, chunk.total)
+                return
+            # a new transfer replaces an unfinished one, its sender gave up
+            rx = self._bulk_rx = BulkRx(chunk.xfer, chunk.total)
+        if rx.put(chunk.seq, chunk.data):
+            await self._send_bulk_ack(rx.xfer, rx.base, rx.bits())
+        if rx.done:
+            self._bulk_rx = None
+            self._bulk_done = rx.xfer
+            try:
+                await asyncio.wait_for_ms(self.bulk_q.put(rx.buf), 500)
+            except asyncio.TimeoutError:
+                log.warning("bulk_q full, dropped %sB", rx.total)
+
+    async def _send_bulk_ack(self, xfer, base, bits):
+        await self.nl.out_q.room(PRIO_CTRL)
+        ack = BulkAck(self.con_id, xfer, base, bits)
+        self.nl.send_frame(ack.srlz_compact(), self.c_mac, PRIO_CTRL)
+
+    def _recv_bulk_ack(self, ack: BulkAck):
+        tx = self._bulk_tx
+        if tx and ack.xfer == tx.xfer:
+            tx.ack(ack.base, ack.bits)
+
+    def get_bulk_aiter(self):
+        # received payloads as bytearrays, ends when the connection is terminated
+        class Aiter:
+            def __init__(self, conn: Connection):
+                self.conn = conn
+
+            def __aiter__(self):
+                return self
+
+            async def __anext__(self):
+                data = await self.conn.bulk_q.get()
+                if data is None:
+                    raise StopAsyncIteration
+                self.conn.last_msg = time()
+                return data
+
+        return Aiter(self)
+
 
 async def def_con_cb(con: Connection, req=False):
     """
@@ -219,12 +375,63 @@ async def def_con_cb(con: Connection, req=False):
         :param req: Incoming conn or self made request
     """
     if not req:
-        print(f"Incoming connection {con.con_id}")
+        log.info("Incoming connection %s", con.con_id)
     else:
-        print(f"Connect request {con.con_id}")
+        log.info("Connect request %s", con.con_id)
     return True
 
 
+# Framing: small frames waiting in out_q for the same badge leave in one
+# bundle frame, which is what most of the airtime of an exchange costs.
+# [WIRE_MAGIC][WIRE_VER][WIRE_BUNDLE][count] + ([len][frame]) * count
+MAX_FRAME = 250  # ESP-NOW payload limit
+MAX_PEERS = 256  # badges kept in last_seen, 15 KB at about 60 bytes each
+
+
+def pack_frames(frames):
+    buf = bytearray(WIRE_HDR_LEN + sum(len(f) + 1 for f in frames))
+    buf[0] = WIRE_MAGIC
+    buf[1] = WIRE_VER
+    buf[2] = WIRE_BUNDLE
+    buf[3] = len(frames)
+    pos = WIRE_HDR_LEN
+    for f in frames:
+        n = len(f)
+        buf[pos] = n
+        buf[pos + 1 : pos + 1 + n] = f
+        pos += n + 1
+    return buf
+
+
+def unpack_frames(buf):
+    # memoryview slices of the frames in a bundle, None if it is malformed
+    mv = memoryview(buf)
+    end = len(buf)
+    frames = []
+    pos = WIRE_HDR_LEN
+    for _ in range(buf[3]):
+        if pos >= end:
+            return None
+        n = buf[pos]
+        pos += 1
+        if n == 0 or pos + n > end:
+            return None
+        frames.append(mv[pos : pos + n])
+        pos += n
+    return frames if pos == end else None
+
+
+_con_terms = {}  # con_id: FrameTemplate
+
+
+def con_term(con_id):
+    # ConTerm frames are retried, the template is copied for every one
+    t = _con_terms.get(con_id)
+    if t is None:
+        t = _con_terms[con_id] = FrameTemplate(ConTerm(con_id=con_id), ring=0)
+    return t
+
+
 def wait_index(msg):
     return msg.mac + bytes([msg.id])
 
@@ -238,16 +445,24 @@ class NowListener(object):
     The NowListener class listens and processes incoming ESP-NOW messages. It manages connections,
     handles incoming messages, and maintains an update mechanism for the seen devices.
 
-    This class is designed to function as a singleton to ensure that only one instance handles
-    the ESP-NOW communication. It provides mechanisms for registering, unregistering, and dispatching
-    messages to connections.
+    The badge has one NowListener, started with NowListener.start(). Its state lives in class
+    attributes so that NowListener.last_seen and friends can be used from anywhere.
+    NowListener(espnow, shared=False) makes an instance with state of its own, for running
+    several badge stacks in one process on firmware/vradio.py. It provides mechanisms for
+    registering, unregistering, and dispatching messages to connections.
 
     Attributes:
-        __instance (NowListener): Singleton instance of the class.
+        __instance (NowListener): The badge's own instance, see default().
         connections (dict): Dictionary holding active connections indexed by connection ID.
-        last_seen (BadgeAdrDict): Dict like object with eviction after max_size reached
+        last_seen (PeerTable): Badges seen on air by mac, least recently seen is evicted after max_size
         update_event (asyncio.Event): Asyncio event to notify updates.
         conn_request (asyncio.Event): Asyncio event for new connection requests.
+        out_q (OutScheduler): Outbound frames by priority class, NowListener.out_q.report() prints counters.
+        stats (RadioStats): Frame counters in total and per peer, NowListener.stats.report() prints them.
+        beacon_s (float): Beacon interval in use with the jitter margin, last_seen drops badges not heard for stale_multiplier times it.
+        legacy_t (int): time() a beacon of a badge that beacons only in the legacy format was last heard, see legacy_near().
+        rssi_min (int): Frames of new badges below it are dropped, known badges are kept down to rssi_min - rssi_hyst
+            by their smoothed rssi, see link_quality() and last_seen.ranked().
         __espnow (aioespnow.AIOESPNow): AIOESPNow instance to handle ESP-NOW communication.
 
     Methods:
@@ -256,23 +471,44 @@ class NowListener(object):
         get_updates(): Returns a generator that yields the last seen updates.
         register_con(connection): Registers a new connection and adds the respective peer in ESP-NOW.
         unregister_con(connection): Unregisters a connection and removes it from the active connections.
-        start(espnow): Starts the NowListener instance if not already started.
-        stop(): Stops the NowListener instance if it is running.
+        start(espnow): Starts the badge's own NowListener if not already started.
+        stop(): Stops the badge's own NowListener if it is running.
+        run(): Starts the tasks of this instance, start() does it for the badge's own one.
         dispatch_app_msg(app_msg): Dispatches an application message to the corresponding connection.
         dispatch_msg(msg, con_id): Dispatches a message to the corresponding connection based on connection ID.
+        compact(mac): True if frames to mac go in the compact wire format, see BadgeMsg.wire_format.
+        legacy_near(): True while a badge of firmware 1.0.4 or older may be in range.
     """
 
     __task = None
     __instance = None
-    __cleanup_task = None
+    _task = None
+    _cleanup_t = None
     _sender_t = None
     connections = {}
-    delivered = deque([], 50)  # Track last 50 messages to prevent re-delivery
-    last_seen = BadgeAdrDict(max_size=20, stale_multiplier=2.6)
+    delivered = DedupTable(max_peers=32)  # Per peer window of ids to prevent re-delivery
+    last_seen = PeerTable(max_size=MAX_PEERS, stale_multiplier=2.6)
+    rtt = RttTable(max_peers=16)  # per peer RTT/RTO estimates fed by acks
+    ack_stats = AckStats()
+    stats = RadioStats(max_peers=16)  # frame counters, NowListener.stats.report()
 
     update_event = asyncio.Event()
     conn_request = asyncio.Event()
-    out_q = Queue(maxsize=5)
+    out_q = OutScheduler(sizes=(16, 16, 4), rate=50, burst=8)
+    waiting_ack = {}  # wait_index: _Pending, sent messages waiting for an ack
+    deadlines = Deadlines()  # retransmission deadlines of waiting_ack, earliest first
+    # an ack buffer is reused once the ctrl class could have been sent twice over
+    _ack = FrameTemplate(AckMsg(id=0), ring=out_q.sizes[PRIO_CTRL] + 2)
+
+    rx_batch = 16  # frames handled back to back before yielding
+    rx_slice_ms = 20  # or time spent on them
+    rx_pause_ms = 2
+    coalesce_ms = 8  # hold outbound frames this long for others to the same badge, 0 disables
+    rssi_min = -70  # frames from weaker senders are ignored
+    rssi_hyst = 6  # dB below rssi_min a known badge is still heard at, by smoothed rssi
+    rssi_good = -40  # smoothed rssi of link_quality() 100
+    beacon_s = None  # beacon interval in use with the jitter margin, set by Beacon.interval()
+    legacy_t = None  # time() of the last beacon of a badge without compact beacons
 
     __espnow: aioespnow.AIOESPNow = None
     con_cb = def_con_cb
@@ -281,200 +517,320 @@ class NowListener(object):
     malformed_counter = {}
     # Blocked MACs: {mac: block_expiry_timestamp}
     blocked_macs = {}
-
-    def __init__(self, e, con_cb=None):
-        if not NowListener.__espnow:
-            NowListener.__espnow = e
-        if con_cb:
-            NowListener.con_cb = con_cb
+    _pool = None  # BadgeMsg.decode() instances, None is BadgeMsg's own
+
+    def __init__(self, e, con_cb=None, shared=True):
+        self.shared = shared
+        if shared:
+            if not NowListener.__espnow:
+                NowListener.__espnow = e
+            if con_cb:
+                NowListener.con_cb = con_cb
+            return
+        # own state, shadows the class attributes
+        self.__espnow = e
+        self.con_cb = con_cb or def_con_cb
+        self.connections = {}
+        self.delivered = DedupTable(max_peers=32)
+        self.last_seen = PeerTable(max_size=MAX_PEERS, stale_multiplier=2.6)
+        self.rtt = RttTable(max_peers=16)
+        self.ack_stats = AckStats()
+        self.stats = RadioStats(max_peers=16)
+        self.update_event = asyncio.Event()
+        self.conn_request = asyncio.Event()
+        self.out_q = OutScheduler(sizes=(16, 16, 4), rate=50, burst=8)
+        self.waiting_ack = {}
+        self.deadlines = Deadlines()
+        self._ack = FrameTemplate(AckMsg(id=0), ring=self.out_q.sizes[PRIO_CTRL] + 2)
+        self.malformed_counter = {}
+        self.blocked_macs = {}
+        self._msg_id = random.randint(0, 254)
+        self._pool = {}
+        self.legacy_t = None
+
+    def _con_cb(self):
+        # class attribute for the shared instance, boot screen sets NowListener.con_cb
+        return NowListener.con_cb if self.shared else self.con_cb
 
     def _track_malformed_message(self, mac):
         """Track malformed messages and block MAC if threshold exceeded."""
+        self.stats.count(mac, MALFORMED)
         current_time = time()
         mac_hex = ":" .join(f"{byte:02x}" for byte in mac)
         
-        if mac in NowListener.malformed_counter:
-            count, first_time = NowListener.malformed_counter[mac]
+        if mac in self.malformed_counter:
+            count, first_time = self.malformed_counter[mac]
             
             # Reset counter if more than 10 seconds have passed
             if current_time - first_time > 10:
-                NowListener.malformed_counter[mac] = (1, current_time)
+                self.malformed_counter[mac] = (1, current_time)
             else:
                 count += 1
-                NowListener.malformed_counter[mac] = (count, first_time)
+                self.malformed_counter[mac] = (count, first_time)
                 
                 # Block if threshold exceeded (3 malformed in 10 seconds)
                 if count >= 3:
                     block_until = current_time + 30  # Block for 30 seconds
-                    NowListener.blocked_macs[mac] = block_until
-                    print(f"Blocking MAC {mac_hex} for 30s (>= 3 malformed msgs)")
+                    self.blocked_macs[mac] = block_until
+                    log.warning("Blocking MAC %s for 30s (>= 3 malformed msgs)", mac_hex)
         else:
-            NowListener.malformed_counter[mac] = (1, current_time)
+            self.malformed_counter[mac] = (1, current_time)
     
     def ack_msg(self, mac, msg_id):
-        self.out_q.put_nowait(OutQueAck(mac, msg_id))
-        # start sender task to eat the out_q
-        if self._sender_t is None or self._sender_t.done():
-            self._sender_t = asyncio.create_task(self._sender())
+        # mark for retry buffer that msg is acked
+        p = self.waiting_ack.pop(wait_index_mac(mac, msg_id), None)
+        if p is None:
+            return
+        latency = ticks_diff(ticks_ms(), p.sent)
+        log.debug("ack mach %s %s %sms", mac, msg_id, latency)
+        self.ack_stats.ack(latency)
+        if p.tries == 1:
+            # Karn: rtt of a retransmitted message is ambiguous
+            self.rtt[p.mac].sample(latency)
+
+    async def send_ack(self, mac, msg_id):
+        # the listener waits for the sender rather than dropping acks
+        await self.out_q.room(PRIO_CTRL)
+        self.send_frame(self._ack.frame(msg_id, self.compact(mac)), mac, PRIO_CTRL)
 
     async def cleanup_task(self):
         """Periodically cleanup stale badges from last_seen and blocked MACs."""
         try:
             while True:
                 await asyncio.sleep(5)  # Check every 5 seconds
-                removed = NowListener.last_seen.cleanup_stale(Beacon.timeout)
+                removed = self.last_seen.cleanup_stale(self.beacon_s or Beacon.timeout * (1 + Beacon.jitter))
                 if removed > 0:
-                    print(f"Cleaned up {removed} stale badge(s)")
+                    log.info("Cleaned up %s stale badge(s)", removed)
                     self.update_event.set()  # Notify UI to update
                 
                 # Cleanup expired blocked MACs
                 current_time = time()
-                expired_blocks = [mac for mac, expiry in NowListener.blocked_macs.items() if current_time > expiry]
+                expired_blocks = [mac for mac, expiry in self.blocked_macs.items() if current_time > expiry]
                 for mac in expired_blocks:
-                    del NowListener.blocked_macs[mac]
-                    if mac in NowListener.malformed_counter:
-                        del NowListener.malformed_counter[mac]
+                    del self.blocked_macs[mac]
+                    if mac in self.malformed_counter:
+                        del self.malformed_counter[mac]
                     mac_hex = ":".join(f"{byte:02x}" for byte in mac)
-                    print(f"Unblocked MAC {mac_hex} - block expired")
+                    log.info("Unblocked MAC %s - block expired", mac_hex)
         except Exception as e:
-            print(f"cleanup_task error: {e}")
+            log.error("cleanup_task error: %s", e)
 
     async def task(self):
         """
         Main task to listen and process incoming ESP-NOW messages.
         Handles different types of messages (BeaconMsg, OpenConn, ConTerm, AppMsg) and updates connections.
         """
-        print("NowListener active")
+        log.info("NowListener active")
         no_ack = 0
+        stats = self.stats
+        batch = 0
+        slice_start = ticks_ms()
         async for mac, msg in self.__espnow:
+            # Backpressure: frames already queued by the radio are handled back
+            # to back without yielding, so after rx_batch frames or rx_slice_ms
+            # the listener sleeps rx_pause_ms to let the GUI, the sender and the
+            # esp-now stack run. When the queue is empty the iterator waits anyway.
+            if batch == 0:
+                slice_start = ticks_ms()
+            batch += 1
+            if not self.__espnow.any():
+                batch = 0
+            elif (
+                batch >= self.rx_batch
+                or ticks_diff(ticks_ms(), slice_start) >= self.rx_slice_ms
+            ):
+                await asyncio.sleep_ms(self.rx_pause_ms)
+                batch = 0
+
             if mac is None:
                 continue
+            stats.count(mac, IN)
 
             # Check if MAC is blocked
-            if mac in NowListener.blocked_macs:
-                if time() < NowListener.blocked_macs[mac]:
+            if mac in self.blocked_macs:
+                if time() < self.blocked_macs[mac]:
                     # Still blocked, silently ignore
+                    stats.count(mac, BLOCKED)
                     continue
                 else:
                     # Block expired, cleanup will handle removal
                     pass
 
+            # a new badge has to be heard at rssi_min, a known one is kept while its
+            # smoothed rssi stays within rssi_hyst of it, so badges around the
+            # cutoff don't come and go with every beacon
             rssi = self.__espnow.peers_table[mac][0]
-            if rssi < -70:
-                continue
-
-            # Protect deserialization so a malformed message doesn't cancel the listener
-            try:
-                incm_msg = BadgeMsg.desrlz(msg)
-            except Exception as e:
-                mac_hex = ":".join(f"{byte:02x}" for byte in mac)
-                print(f"NowListener: fatal deserialization from {mac_hex}: {e}")
-                self._track_malformed_message(mac)
-                continue
-
-            if incm_msg is None:
-                mac_hex = ":".join(f"{byte:02x}" for byte in mac)
-                head = msg[:32] if isinstance(msg, (bytes, bytearray)) else b""
-                print(f"Ignoring malformed msg from {mac_hex} len={len(msg)} head={head.hex()}")
-                self._track_malformed_message(mac)
-                continue
-
-            print(f">>>{mac}:{incm_msg}")
+            if rssi < self.rssi_min:
+                smooth = self.last_seen.rssi_of(mac, rssi)
+                if smooth is None or smooth < self.rssi_min - self.rssi_hyst:
+                    stats.count(mac, WEAK)
+                    continue
 
-            if isinstance(incm_msg, BeaconMsg):
-                NowListener.last_seen[mac] = BadgeAdr(mac, incm_msg.nick, rssi, time())
-                self.update_event.set()  # trigger updates function
-            elif isinstance(incm_msg, AckMsg):
-                NowListener.last_seen.update_last_seen(mac, time())
+            if (
+                len(msg) > WIRE_HDR_LEN
+                and msg[0] == WIRE_MAGIC
+                and msg[1] == WIRE_VER
+                and msg[2] == WIRE_BUNDLE
+            ):
+                frames = unpack_frames(msg)
+                if frames is None:
+                    log.warning("Ignoring malformed bundle from %s len=%s", mac, len(msg))
+                    self._track_malformed_message(mac)
+                    continue
+                for frame in frames:
+                    await self._rx_frame(mac, frame, rssi)
+            else:
+                await self._rx_frame(mac, msg, rssi)
+
+    async def _rx_frame(self, mac, msg, rssi):
+        # handles one received frame, msg can be a slice of a bundle
+        # Compact frames carry type and msg id in a fixed header. Acks, beacons
+        # of known peers and retries of an already delivered AppMsg are
+        # handled from the header alone, without building a message object.
+        if len(msg) >= WIRE_HDR_LEN and msg[0] == WIRE_MAGIC and msg[1] == WIRE_VER:
+            tid = msg[2]
+            if tid == AckMsg._tid:
+                self.last_seen.update_last_seen(mac, time())
                 # mark for retry buffer that msg is acked
-                self.ack_msg(mac, incm_msg.id)
+                self.ack_msg(mac, msg[3])
+                return
+            if tid == BeaconMsg._tid and self.last_seen.same_beacon(mac, msg):
+                # known badge, the same fields as in its last beacon
+                self.stats.count(mac, BEACONS)
+                self.last_seen.update_last_seen(mac, time(), rssi)
+                self.update_event.set()  # trigger updates function
+                return
+            elif tid == AppMsg._tid and self.delivered.seen(mac, msg[3]):
+                self.stats.count(mac, DEDUP)
+                await self.send_ack(mac, msg[3])
+                return
 
-            elif isinstance(incm_msg, OpenConn):
-                NowListener.last_seen.update_last_seen(mac, time())
-                
-                # Check if there's an existing connection for this con_id and MAC
-                existing_conn = self.connections.get(incm_msg.con_id)
-                if existing_conn and not existing_conn.closed:
-                    # Check if this is from the same peer (reply to our connection request)
-                    if existing_conn.c_mac == mac:
-                        # This is a reply to our connection request, dispatch it
-                        if await self.dispatch_msg(incm_msg, incm_msg.con_id, mac):
+        # Protect deserialization so a malformed message doesn't cancel the listener
+        # decode() reads msg in place, BeaconMsg/AckMsg/AppMsg instances are
+        # reused and must not be kept past this iteration (AppMsg.content may).
+        # The pool is the listener's, another listener's decode() can't change
+        # incm_msg while this one waits for room for its ack.
+        try:
+            incm_msg = BadgeMsg.decode(msg, self._pool)
+        except Exception as e:
+            log.error("NowListener: fatal deserialization from %s: %s", mac, e)
+            self._track_malformed_message(mac)
+            return
+
+        if incm_msg is None:
+            log.warning("Ignoring malformed msg from %s len=%s", mac, len(msg))
+            self._track_malformed_message(mac)
+            return
+
+        log.debug(">>>%s:%s", mac, incm_msg)
+
+        if isinstance(incm_msg, BeaconMsg):
+            self.stats.count(mac, BEACONS)
+            compact = msg[0] == WIRE_MAGIC
+            if not compact and self.last_seen.compact(mac):
+                # the nick only beacon for old badges of a badge that beacons compact too
+                self.last_seen.update_last_seen(mac, time(), rssi)
+                return
+            if not compact:
+                self.legacy_t = time()
+            badge = BadgeAdr(mac, incm_msg.nick, rssi, time())
+            badge.frame_key = beacon_key(msg)
+            badge.caps = incm_msg.caps
+            badge.fw = incm_msg.fw
+            badge.busy = incm_msg.busy
+            badge.compact = compact
+            self.last_seen[mac] = badge
+            self.update_event.set()  # trigger updates function
+        elif isinstance(incm_msg, AckMsg):
+            self.last_seen.update_last_seen(mac, time())
+            # mark for retry buffer that msg is acked
+            self.ack_msg(mac, incm_msg.id)
+
+        elif isinstance(incm_msg, OpenConn):
+            self.last_seen.update_last_seen(mac, time())
+
+            # Check if there's an existing connection for this con_id and MAC
+            existing_conn = self.connections.get(incm_msg.con_id)
+            if existing_conn and not existing_conn.closed:
+                # Check if this is from the same peer (reply to our connection request)
+                if existing_conn.c_mac == mac:
+                    # This is a reply to our connection request, dispatch it.
+                    # Or the peer retried its request: our reply has the same
+                    # id and is still waiting for an ack, it must be resent.
+                    is_reply = not existing_conn.active
+                    if await self.dispatch_msg(incm_msg, incm_msg.con_id, mac):
+                        if is_reply:
                             self.ack_msg(mac, incm_msg.id)
-                            continue
-                    else:
-                        # Existing connection with different peer - reject new one
-                        print(f"Rejecting OpenConn: con_id {incm_msg.con_id} already used by different peer")
-                        await send_message(
-                            self.__espnow, mac, 
-                            OpenConn(incm_msg.con_id, accept=False).srlz(), 
-                            sync=False
-                        )
-                        continue
-                elif existing_conn and existing_conn.closed:
-                    # Old closed connection still registered - clean it up
-                    print(f"Cleaning up closed connection for con_id={incm_msg.con_id}")
-                    NowListener.unregister_con(existing_conn)
-
-                # Add new incoming connection, ack the incoming OpenConn
-                await send_message(
-                    self.__espnow, mac, AckMsg(id=incm_msg.id).srlz(), sync=False
-                )
-
-                # proto connection, not yet capable of receiving other messages
-                conn = Connection(mac, incm_msg.con_id, self.__espnow)
-                # Use session_id from incoming OpenConn if available
-                if hasattr(incm_msg, 'session_id') and incm_msg.session_id:
-                    conn.session_id = incm_msg.session_id
-                conn.active = True
-
-                try:
-                    # ask user process can we accept connection
-                    (await NowListener.con_cb(conn)) or 1 / 0
-                except (asyncio.TimeoutError, ZeroDivisionError):
-                    # connection was not opened in time, or it returned false
-                    NowListener.unregister_con(conn)
-                    await asyncio.sleep(0.1)  # Allow now esp stack to run
-                    await conn.terminate()
-                    continue
-
-                # connection accepted, register to allow subsequent messages
-                NowListener.register_con(conn)
-                await asyncio.sleep(0.1)  # Allow now esp stack to run
-                # Opening connection by replying OpenConn back with same msg id and session_id
-                oc = OpenConn(incm_msg.con_id, accept=True, session_id=conn.session_id)
-                oc.__id = incm_msg.id
-                NowListener.send_msg(oc, mac)
-                # await send_message(self.__espnow, mac, msg, sync=False)
-
-            elif isinstance(incm_msg, ConTerm):
-                self.ack_msg(mac, incm_msg.id)
-                NowListener.last_seen.update_last_seen(mac, time())
-
-                if incm_msg.con_id in self.connections:
-                    print(f"con term for {incm_msg=}")
-                    conn = self.connections[incm_msg.con_id]
-                    await conn.terminate(send_out=True, reply_to_id=incm_msg.id)
-                    NowListener.unregister_con(conn)
+                        return
                 else:
-                    await send_message(
-                        self.__espnow, mac, AckMsg(id=incm_msg.id).srlz(), sync=False
+                    # Existing connection with different peer - reject new one
+                    log.warning("Rejecting OpenConn: con_id %s already used by different peer", incm_msg.con_id)
+                    self.send_frame(
+                        OpenConn(incm_msg.con_id, accept=False).srlz(self.compact(mac)), mac, PRIO_CTRL
                     )
+                    return
+            elif existing_conn and existing_conn.closed:
+                # Old closed connection still registered - clean it up
+                log.info("Cleaning up closed connection for con_id=%s", incm_msg.con_id)
+                self.unregister_con(existing_conn)
+
+            # Add new incoming connection, ack the incoming OpenConn
+            await self.send_ack(mac, incm_msg.id)
+
+            # proto connection, not yet capable of receiving other messages
+            conn = Connection(mac, incm_msg.con_id, self.__espnow, self)
+            # Use session_id from incoming OpenConn if available
+            if hasattr(incm_msg, 'session_id') and incm_msg.session_id:
+                conn.session_id = incm_msg.session_id
+            conn.active = True
 
-            elif isinstance(incm_msg, AppMsg):
-                NowListener.last_seen.update_last_seen(mac, time())
-                await send_message(
-                    self.__espnow, mac, AckMsg(id=incm_msg.id).srlz(), sync=False
-                )
-
-                if not await self.dispatch_app_msg(incm_msg, mac):
-                    print(f"No receiver for RCV:{mac}->{incm_msg=}")
+            try:
+                # ask user process can we accept connection
+                (await self._con_cb()(conn)) or 1 / 0
+            except (asyncio.TimeoutError, ZeroDivisionError):
+                # connection was not opened in time, or it returned false
+                self.unregister_con(conn)
+                await conn.terminate()
+                return
 
+            # connection accepted, register to allow subsequent messages
+            self.register_con(conn)
+            # Opening connection by replying OpenConn back with same msg id and session_id
+            oc = OpenConn(incm_msg.con_id, accept=True, session_id=conn.session_id)
+            self.send_msg(oc, mac, reply_to=incm_msg.id)
+
+        elif isinstance(incm_msg, ConTerm):
+            self.ack_msg(mac, incm_msg.id)
+            self.last_seen.update_last_seen(mac, time())
+
+            if incm_msg.con_id in self.connections:
+                log.debug("con term for incm_msg=%r", incm_msg)
+                conn = self.connections[incm_msg.con_id]
+                await conn.terminate(send_out=True, reply_to_id=incm_msg.id)
+                self.unregister_con(conn)
+            else:
+                await self.send_ack(mac, incm_msg.id)
+
+        elif isinstance(incm_msg, (BulkChunk, BulkAck)):
+            self.last_seen.update_last_seen(mac, time())
+            conn = self.connections.get(incm_msg.con_id)
+            if conn is None or conn.c_mac != mac:
+                log.warning("No bulk receiver for %s con_id=%s", mac, incm_msg.con_id)
+            elif isinstance(incm_msg, BulkChunk):
+                await conn._recv_bulk(incm_msg)
             else:
-                tmp = ":".join(f"{byte:02x}" for byte in mac)
-                print(f"{tmp} [{rssi}dBm] {msg} :")
-            await asyncio.sleep(
-                0.1
-            )  # Do not touch, MSG stack crashes when running without
+                conn._recv_bulk_ack(incm_msg)
+
+        elif isinstance(incm_msg, AppMsg):
+            self.last_seen.update_last_seen(mac, time())
+            await self.send_ack(mac, incm_msg.id)
+
+            if not await self.dispatch_app_msg(incm_msg, mac):
+                log.warning("No receiver for RCV:%s->incm_msg=%r", mac, incm_msg)
+
+        else:
+            tmp = ":".join(f"{byte:02x}" for byte in mac)
+            log.debug("%s [%sdBm] %s :", tmp, rssi, msg)
 
     @classmethod
     def updates(cls, filter_mac=None):
@@ -506,97 +862,187 @@ class NowListener(object):
 
         return Aiter(self)
 
-    async def _sender(self):
-        # temporary task to send messages for retry times or until ack arrives
-        timeout_ms = 500
-        waiting_ack = {}
-        start = ticks_ms()
-        while self.out_q.qsize() > 0 or waiting_ack:
-            try:
-                out_q_t: OutQueMsg | OutQueAck = await asyncio.wait_for(
-                    self.out_q.get(), timeout_ms / 1000
-                )
-                if type(out_q_t) == OutQueMsg:
-                    waiting_ack[wait_index(out_q_t)] = out_q_t
-                    await send_message(
-                        self.__espnow, out_q_t.mac, out_q_t.msg, sync=False
-                    )
-                elif type(out_q_t) == OutQueAck:
-                    w_index = wait_index(out_q_t)
-                    if w_index in waiting_ack:
-                        print(f"ack mach {out_q_t=}")
-                        del waiting_ack[w_index]
-
-                if ticks_diff(ticks_ms(), start) > timeout_ms:
-                    raise asyncio.TimeoutError
+    def link_quality(self, mac):
+        """
+        Link quality of a badge in last_seen, None if it is not there.
 
-            except asyncio.TimeoutError:
-                ack_items = waiting_ack.items()
-                for k, out_que_msg in ack_items:
-                    if out_que_msg.retry <= 0:
-                        print(f"retry timeout {k=} {out_que_msg=}")
-                        del waiting_ack[k]
-                        continue
-
-                    print(f"<<{'r'*out_que_msg.retry}{out_que_msg.msg} {out_que_msg=}")
-                    await send_message(
-                        self.__espnow, out_que_msg.mac, out_que_msg.msg, sync=False
-                    )
-                    waiting_ack[k] = OutQueMsg(
-                        out_que_msg.msg,
-                        out_que_msg.mac,
-                        out_que_msg.id,
-                        out_que_msg.retry - 1,
-                    )
+        0 at rssi_min - rssi_hyst to 100 at rssi_good by smoothed rssi. For the
+        badges counted in stats it is scaled by the share of frames sent to the
+        badge that did not need a retry, so a near badge with a lossy link
+        rates lower than its rssi.
+        """
+        rssi = self.last_seen.rssi_of(mac)
+        if rssi is None:
+            return None
+        floor = self.rssi_min - self.rssi_hyst
+        q = max(0, min(100, (rssi - floor) * 100 // (self.rssi_good - floor)))
+        c = self.stats.peers.get(mac)
+        if c and c[OUT]:
+            q = q * max(0, c[OUT] - c[RETRIES] - c[TIMEOUTS]) // c[OUT]
+        return q
 
-                start = ticks_ms()
+    async def _sender(self):
+        # temporary task to send queued frames and retry messages until ack arrives.
+        # Frames come from out_q in priority order, every message waiting for
+        # an ack has its own retransmission deadline from the RTO of its peer.
+        # The task sleeps until the nearest deadline, paced frame or new item.
+        waiting_ack = self.waiting_ack
+        deadlines = self.deadlines
+        stats = self.ack_stats
+        while len(self.out_q) > 0 or waiting_ack:
+            wait_ms = RTO_MAX_MS
+            k, p, left = deadlines.first(waiting_ack, ticks_ms())
+            if p is not None and left <= 0:
+                deadlines.pop()
+                if p.retry <= 0:
+                    del waiting_ack[k]
+                    log.warning("retry timeout k=%r %s", k, p.msg)
+                    stats.timeouts += 1
+                    self.stats.count(p.mac, TIMEOUTS)
+                    self.rtt[p.mac].backoff()
+                    continue
+                log.debug("<<r%s %s %s", p.retry, p.msg, p.mac)
+                p.retry -= 1
+                p.tries += 1
+                p.deadline = ticks_add(ticks_ms(), self.rtt[p.mac].retry_ms(p.tries))
+                deadlines.push(k, p)
+                # sending yields, ack_msg may remove it meanwhile
+                await send_message(self.__espnow, p.mac, p.msg, sync=False)
+                stats.retries += 1
+                self.stats.count(p.mac, OUT)
+                self.stats.count(p.mac, RETRIES)
+                continue
+            if p is not None and left < wait_ms:
+                wait_ms = left
+
+            # bundles hold compact frames only, those go to badges that understand them
+            items, ready_ms = self.out_q.pop(self.coalesce_ms, MAX_FRAME)
+            if items is None:
+                if ready_ms is not None and ready_ms < wait_ms:
+                    wait_ms = ready_ms
+                await self.out_q.wait(wait_ms)
+                continue
 
-        print("sender done")
+            now = ticks_ms()
+            mac = items[0].mac
+            if len(items) == 1:
+                frame = items[0].msg
+            else:
+                frame = pack_frames([out_q_t.msg for out_q_t in items])
+            await send_message(self.__espnow, mac, frame, sync=False)
+            self.stats.count(mac, OUT)
+            rto = self.rtt[mac].rto
+            for out_q_t in items:
+                if out_q_t.retry is None:
+                    continue  # acks and beacons are not acked
+                stats.sent += 1
+                # retries are sent alone
+                k = wait_index(out_q_t)
+                p = waiting_ack[k] = _Pending(out_q_t, now, ticks_add(now, rto))
+                deadlines.push(k, p)
+
+        deadlines.clear()  # nothing waits, what is left was acked
+        log.info("sender done")
+
+    def send_frame(self, frame: bytes, mac, prio, msg_id=0, retry=None):
+        """
+        Queues an encoded frame to out_q, retry None means no ack is expected.
 
-    @classmethod
-    def send_msg(cls, msg: BadgeMsg, mac, sync=False, retry=3):
-        out_q = cls.__instance.out_q
-        out_q.put_nowait(OutQueMsg(msg.srlz(), mac, msg.id, retry))
+        Returns False when the frame was dropped because its priority class
+        was full. Never raises.
+        """
+        if not self.out_q.put(OutQueMsg(frame, mac, msg_id, retry), mac, prio):
+            log.warning("out_q full, dropped %s frame to %s", PRIO_NAMES[prio], mac)
+            self.stats.count(mac, QFULL)
+            return False
 
         # start sender task
-        if cls.__instance._sender_t is None or cls.__instance._sender_t.done():
-            cls.__instance._sender_t = asyncio.create_task(cls.__instance._sender())
-
-    @classmethod
-    def register_con(cls, connection: "Connection"):
+        if self._sender_t is None or self._sender_t.done():
+            self._sender_t = asyncio.create_task(self._sender())
+        return True
+
+    def send_msg(self, msg: BadgeMsg, mac, sync=False, retry=3, reply_to=None):
+        if reply_to is not None:
+            msg.set_id(reply_to)  # acks the message it answers
+        elif not self.shared and msg._core:
+            # badges in one process must not share the message id counter
+            self._msg_id += 1
+            msg.set_id(self._msg_id)
+        prio = PRIO_APP if isinstance(msg, AppMsg) else PRIO_CTRL
+        return self.send_frame(msg.srlz(self.compact(mac)), mac, prio, msg.id, retry)
+
+    def send_template(self, tmpl: FrameTemplate, mac, retry=3, reply_to=None):
+        # send_msg() of a pre-encoded frame, the msg id is picked the same way
+        if reply_to is not None:
+            msg_id = reply_to
+        elif self.shared:
+            msg_id = BadgeMsg.new_id()
+        else:
+            self._msg_id += 1
+            msg_id = self._msg_id % 255
+        prio = PRIO_APP if isinstance(tmpl.msg, AppMsg) else PRIO_CTRL
+        return self.send_frame(tmpl.frame(msg_id, self.compact(mac)), mac, prio, msg_id, retry)
+
+    def compact(self, mac):
+        # a badge that beacons in the compact format understands it, the others
+        # get frames in BadgeMsg.wire_format
+        return BadgeMsg.wire_format == WIRE_COMPACT or self.last_seen.compact(mac)
+
+    def legacy_near(self):
+        # a badge that beacons only in the legacy format was heard within the
+        # time it is kept in last_seen
+        t = self.legacy_t
+        return t is not None and time() - t < self.last_seen.stale_multiplier * (self.beacon_s or Beacon.timeout)
+
+    def register_con(self, connection: "Connection"):
         """
         Registers a new connection and adds the respective peer in ESP-NOW.
 
         Args:
             connection (Connection): The connection instance to register.
         """
-        print(f"register: {connection.con_id}")
-        cls.connections[connection.con_id] = connection
+        log.debug("register: %s", connection.con_id)
+        self.connections[connection.con_id] = connection
         try:
-            cls.__espnow.add_peer(connection.c_mac)
+            self.__espnow.add_peer(connection.c_mac)
         except Exception:
             pass
 
-    @classmethod
-    def unregister_con(cls, connection: "Connection"):
+    def unregister_con(self, connection: "Connection"):
         """
         Unregisters a connection and removes it from the active connections.
 
         Args:
             connection (Connection): The connection instance to unregister.
         """
-        if connection.con_id in cls.connections:
-            print(f"unregister: {connection.con_id}")
-            del cls.connections[connection.con_id]
-            # Note: We intentionally do NOT clean up the delivered deque here.
+        if connection.con_id in self.connections:
+            log.debug("unregister: %s", connection.con_id)
+            del self.connections[connection.con_id]
+            # Note: We intentionally do NOT clean up the delivered windows here.
             # Keeping old message IDs prevents stale messages (still in retry queues)
-            # from being re-delivered in new sessions. The deque's max size will
-            # naturally evict old entries over time.
+            # from being re-delivered in new sessions. Windows of quiet peers
+            # reset on their own after dedup.IDLE_MS.
+
+    @classmethod
+    def get(cls):
+        # the badge's own NowListener, None until it is used or started
+        return cls.__instance
+
+    @classmethod
+    def default(cls, espnow=None):
+        """
+        Returns the badge's own NowListener, created on first use.
+        """
+        if not cls.__instance:
+            cls.__instance = cls(espnow)
+        elif not cls.__espnow:
+            cls.__espnow = espnow
+        return cls.__instance
 
     @classmethod
     def start(cls, espnow):
         """
-        Starts the NowListener instance if not already started.
+        Starts the badge's own NowListener if not already started.
 
         Args:
             espnow (aioespnow.AIOESPNow): ESP-NOW instance to handle communication.
@@ -604,12 +1050,22 @@ class NowListener(object):
         Returns:
             asyncio.Task: The asyncio task running the main task.
         """
-        if not cls.__instance:
-            cls.__instance = cls(espnow)
-            cls.__task = asyncio.create_task(cls.__instance.task())
-            cls.__cleanup_task = asyncio.create_task(cls.__instance.cleanup_task())
+        nl = cls.default(espnow)
+        if nl._task is None:
+            cls.__task = nl.run()
             return cls.__task
 
+    def run(self):
+        """
+        Starts the receive and cleanup tasks of this instance.
+
+        Returns:
+            asyncio.Task: The asyncio task running the main task.
+        """
+        self._task = asyncio.create_task(self.task())
+        self._cleanup_t = asyncio.create_task(self.cleanup_task())
+        return self._task
+
     @classmethod
     def stop(cls):
         """
@@ -631,18 +1087,17 @@ class NowListener(object):
         """
         if app_msg.con_id in self.connections:
             if self.connections[app_msg.con_id].c_mac != s_mac:
-                print(f"con_id mismatch {app_msg.con_id=} {s_mac=}")
+                log.warning("con_id mismatch app_msg.con_id=%r s_mac=%r", app_msg.con_id, s_mac)
                 # TODO: send ConTerm for mismached
                 return False
             # Pass only the inner content to app
             # filter out retries, don't deliver message with same id
-            w_index = wait_index_mac(s_mac, msg_id=app_msg.id)
-            if w_index not in NowListener.delivered:
+            if self.delivered.add(s_mac, app_msg.id):
                 await self.connections[app_msg.con_id].recv_msg(app_msg.content)
-                NowListener.delivered.append(w_index)
                 return True
             else:
-                print(f"Filtered out {w_index=} {app_msg=}")
+                self.stats.count(s_mac, DEDUP)
+                log.debug("Filtered out s_mac=%r app_msg.id=%r app_msg=%r", s_mac, app_msg.id, app_msg)
 
         return False
 
@@ -660,7 +1115,7 @@ class NowListener(object):
         if con_id in self.connections:
             conn = self.connections[con_id]
             if conn.c_mac != s_mac:
-                print(f"con_id mismatch {con_id=} {s_mac=}")
+                log.warning("con_id mismatch con_id=%r s_mac=%r", con_id, s_mac)
                 # TODO: send ConTerm for mismached
                 return False
 
@@ -668,27 +1123,23 @@ class NowListener(object):
             if isinstance(msg, AppMsg):
                 msg_session = getattr(msg, 'session_id', None)
                 if msg_session is not None and msg_session != conn.session_id:
-                    print(f"session_id mismatch: msg={msg_session} conn={conn.session_id}, ignoring stale message")
+                    log.warning("session_id mismatch: msg=%s conn=%s, ignoring stale message", msg_session, conn.session_id)
                     # Mark as delivered even though we're ignoring it, to prevent repeated checks
-                    w_index = wait_index_mac(s_mac, msg_id=msg.id)
-                    if w_index not in NowListener.delivered:
-                        NowListener.delivered.append(w_index)
+                    self.delivered.add(s_mac, msg.id)
                     # Still send ACK to prevent retries, but don't deliver the message
-                    await send_message(
-                        self.__espnow, s_mac, AckMsg(id=msg.id).srlz(), sync=False
-                    )
+                    await self.send_ack(s_mac, msg.id)
                     return True
 
-            # filter out retries, don't deliver message with same id
-            w_index = wait_index_mac(s_mac, msg_id=msg.id)
-            if w_index not in NowListener.delivered:
+            # filter out retries, don't deliver message with same id. A reply
+            # OpenConn carries the id of our request, not one of the sender's,
+            # recording it would filter out a later message that reuses the id.
+            if isinstance(msg, OpenConn) or self.delivered.add(s_mac, msg.id):
                 await conn.recv_msg(msg)
-                NowListener.delivered.append(w_index)
+            else:
+                self.stats.count(s_mac, DEDUP)
 
             # despite was msg retry or not send ack
-            await send_message(
-                self.__espnow, s_mac, AckMsg(id=msg.id).srlz(), sync=False
-            )
+            await self.send_ack(s_mac, msg.id)
             return True
         return False  # Connection was not found
 
@@ -696,10 +1147,13 @@ class NowListener(object):
     async def conn_req(cls, mac, app_id):
         # Send connection request for app_id to other badge
         # and if then conn is accepted open same app in current badge
-        c = Connection(mac, app_id, NowListener.__espnow)
+        return await cls.default().request_con(mac, app_id)
+
+    async def request_con(self, mac, app_id):
+        c = Connection(mac, app_id, self.__espnow, self)
         if await c.connect():  # send connection request
             # change app if request accepted
-            await cls.con_cb(c, req=True)
+            await self._con_cb()(c, req=True)
             return True
 
         return False
@@ -711,30 +1165,132 @@ class Beacon(AProc):
     # Beacon.start(task=True) will return a asyncio.task ans start running Beacon
     # Beacon.stop() will cancel the running task
     # Beacon.suspend(True|False) will suspend/resume the Beacon task # why not to use stop start?
+    # Beacon.busy(True|False) keeps beaconing but flags the badge as busy, so
+    # scanners of others hide it. Active connections flag it busy as well.
+    # The class is the badge's own beacon. Beacon(espnow, id, nl).run() is the
+    # beacon of one of several badge stacks in one process, see firmware/vradio.py.
+    #
+    # The interval adapts to the crowd, see interval(): timeout is kept with
+    # `dense` badges in range or `load_fps` frames/s heard, it grows with more
+    # of either up to max_s and shrinks down to min_s with fewer. Beacon.scanning(True)
+    # halves it while the scanner is open. Every sleep is jittered by +-jitter
+    # so that badges booted together don't keep colliding.
     __espnow: aioespnow.AIOESPNow = None
     __id: BeaconMsg = None
+    nl: NowListener = None  # listener that queues the beacons, None: the badge's own
     peer = None
     _susp = asyncio.Event()
-    timeout = 5
+    _wake = asyncio.Event()
+    timeout = 5  # s, base interval
+    min_s = 2
+    max_s = 30
+    dense = 20  # badges in range at the base interval
+    load_fps = 20  # frames/s heard at the base interval
+    jitter = 0.25
+    _scan = False
+    _busy = False
+    _tmpl: FrameTemplate = None  # of the beacon frame, rebuilt when nick or busy change
+    _heard = 0  # nl.stats IN and ticks_ms at the last beacon
+    _t = None
     _task = None
 
+    def __init__(self, espnow, id: BeaconMsg, nl: NowListener, peer=b"\xbb\xbb\xbb\xbb\xbb\xbb", timeout=5):
+        self.__espnow = espnow
+        self.__id = id
+        self.nl = nl
+        self.peer = peer
+        self.timeout = timeout
+        self._susp = asyncio.Event()
+        self._susp.set()
+        self._wake = asyncio.Event()
+        self._scan = False
+        self._busy = False
+        self._tmpl = None
+        self.stop_event = asyncio.Event()
+        Beacon._add_peer(espnow, peer)
+
+    def run(self):
+        self._task = asyncio.create_task(Beacon._beacon(self))
+        return self._task
+
     @classmethod
     def suspend(cls, value: bool):
         cls._susp.clear() if value else cls._susp.set()
 
+    @classmethod
+    def busy(cls, value: bool):
+        # in a game, beacons right away so that scanners drop the badge
+        cls._busy = value
+        cls._wake.set()
+
+    @classmethod
+    def scanning(cls, value: bool):
+        # shorter interval while the user looks for badges, beacons right away
+        cls._scan = value
+        if value:
+            cls._wake.set()
+
+    @staticmethod
+    def interval(b, nl):
+        """
+        Seconds to the next beacon of b for the badges and the traffic that nl
+        has seen since the previous one, without jitter. Sets nl.beacon_s,
+        which NowListener.cleanup_task() expires badges by, to it with the
+        jitter margin, not halved while scanning and at least timeout: badges
+        in range hear about the same crowd and beacon at about the same
+        interval, those that don't adapt beacon at timeout.
+        """
+        now = ticks_ms()
+        heard = nl.stats.total[IN]
+        fps = 0
+        if b._t is not None:
+            fps = (heard - b._heard) * 1000 / max(1, ticks_diff(now, b._t))
+        b._heard = heard
+        b._t = now
+        f = max(len(nl.last_seen) / b.dense, fps / b.load_fps)
+        if f < 1:
+            t = b.min_s + (b.timeout - b.min_s) * f
+        else:
+            t = min(b.max_s, b.timeout * f)
+        nl.beacon_s = max(t, b.timeout) * (1 + b.jitter)
+        if b._scan:
+            t = max(b.min_s, t / 2)
+        return t
+
     @classmethod
     async def task(cls, *args, **kwargs):
+        await Beacon._beacon(cls)
+
+    @staticmethod
+    async def _beacon(b):
+        # b is the Beacon class or an instance
         try:
-            while not cls.stop_event.is_set():
-                msg = BeaconMsg(nick=cls.__id.nick).srlz()
-                await send_message(cls.__espnow, cls.peer, msg)
-                await asyncio.sleep(cls.timeout)
-                if not cls._susp.is_set():
-                    print("Beacon suspended...")
-                    await cls._susp.wait()
-                    print("...Beacon resumed")
+            while not b.stop_event.is_set():
+                nick = b.__id.nick
+                # beacons yield to game traffic in the listener's out_q
+                nl = b.nl or NowListener.get()
+                busy = b._busy or bool(nl and any(c.active for c in nl.connections.values()))
+                if b._tmpl is None or b._tmpl.msg.nick != nick or b._tmpl.msg.busy != busy:
+                    b._tmpl = FrameTemplate(BeaconMsg(nick, b.__id.caps, b.__id.fw, busy))
+                # compact, and with badges of firmware 1.0.4 or older around the
+                # legacy beacon of the nick they read as well
+                for compact in (True, False) if nl and nl.legacy_near() else (True,):
+                    msg = b._tmpl.frame(BadgeMsg.new_id(), compact)
+                    if not nl or not nl.send_frame(msg, b.peer, PRIO_BULK):
+                        await send_message(b.__espnow, b.peer, msg)
+                t = Beacon.interval(b, nl) if nl else b.timeout
+                t *= 1 + b.jitter * (2 * random.random() - 1)
+                b._wake.clear()
+                try:
+                    await asyncio.wait_for_ms(b._wake.wait(), int(t * 1000))
+                except asyncio.TimeoutError:
+                    pass
+                if not b._susp.is_set():
+                    log.info("Beacon suspended...")
+                    await b._susp.wait()
+                    log.info("...Beacon resumed")
         except Exception as e:
-            print(f"Beacon exeption {e}")
+            log.error("Beacon exeption %s", e)
 
     @classmethod
     def setup(cls, espnow, id: BeaconMsg, peer=b"\xbb\xbb\xbb\xbb\xbb\xbb", timeout=5):
@@ -743,10 +1299,14 @@ class Beacon(AProc):
         Beacon.timeout = timeout
         Beacon._susp.set()
         Beacon.peer = peer
+        Beacon._add_peer(espnow, peer)
+
+    @staticmethod
+    def _add_peer(espnow, peer):
         try:
-            Beacon.__espnow.add_peer(peer)
+            espnow.add_peer(peer)
         except OSError as err:
             if len(err.args) < 2:
                 raise err
             if err.args[1] == "ESP_ERR_ESPNOW_EXIST":
-                print("Addr exist")
+                log.debug("Addr exist")
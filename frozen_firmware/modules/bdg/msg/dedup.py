@@ -0,0 +1,102 @@
+from time import ticks_ms, ticks_diff
+
+SEQ_MOD = 255 * 257  # 16 bit sequence space, a multiple of the % 255 wire ids
+WINDOW = 30  # ids remembered behind the newest one, keeps bitmap a small int
+MASK = (1 << WINDOW) - 1
+IDLE_MS = 10_000  # longer than any retry chain, older window is forgotten
+
+
+class RecvWindow:
+    """
+    Sliding receive window of message ids from one peer.
+
+    seq is the newest id seen extended to 16 bits, so it keeps counting over
+    the % 255 wraparound of wire ids (seq % 255 is always the wire id).
+    Bit n of bits is set when seq - n has been seen. An incoming id is placed
+    by its shortest distance to seq on the 255 id ring: ahead moves the window,
+    behind is looked up from the bitmap. An id outside the window, a jump of
+    half the ring or more (the sender's id counter is shared with beacons, bulk
+    chunks and other peers) or one long behind, is new and the window starts
+    over from it, so its retries are caught.
+    """
+
+    def __init__(self):
+        self.seq = -1
+        self.bits = 0
+        self.t = 0
+
+    def _delta(self, msg_id):
+        d = (msg_id - self.seq) % 255
+        return d if d < 128 else d - 255
+
+    def seen(self, msg_id, now):
+        # check without recording
+        if self.seq < 0 or ticks_diff(now, self.t) > IDLE_MS:
+            return False
+        d = self._delta(msg_id)
+        if d > 0 or -d >= WINDOW:
+            return False
+        return bool(self.bits >> -d & 1)
+
+    def add(self, msg_id, now):
+        """Record msg_id, returns False if it was already seen."""
+        if self.seq < 0 or ticks_diff(now, self.t) > IDLE_MS:
+            # first message or peer was quiet (or rebooted), start over
+            self.seq = msg_id
+            self.bits = 1
+            self.t = now
+            return True
+        self.t = now
+        d = self._delta(msg_id)
+        if d > 0:
+            self.seq = (self.seq + d) % SEQ_MOD
+            # shift only bits that stay in the window, no long int on the way
+            self.bits = (self.bits & (MASK >> d)) << d | 1 if d < WINDOW else 1
+            return True
+        d = -d
+        if d < WINDOW:
+            if self.bits >> d & 1:
+                return False
+            self.bits |= 1 << d
+            return True
+        self.seq = (self.seq + (msg_id - self.seq) % 255) % SEQ_MOD
+        self.bits = 1
+        return True
+
+
+class DedupTable:
+    """
+    RecvWindow per peer mac for filtering out retried messages.
+
+    Both checks are constant time. At most max_peers windows are kept, the
+    peer heard from longest ago is dropped when a new one arrives.
+    """
+
+    def __init__(self, max_peers=32):
+        self.max_peers = max_peers
+        self.peers = {}
+        self.hits = 0  # duplicates filtered out
+
+    def seen(self, mac, msg_id):
+        w = self.peers.get(mac)
+        return w is not None and w.seen(msg_id, ticks_ms())
+
+    def add(self, mac, msg_id):
+        """Record msg_id from mac, returns False for a duplicate."""
+        now = ticks_ms()
+        w = self.peers.get(mac)
+        if w is None:
+            if len(self.peers) >= self.max_peers:
+                oldest = min(self.peers, key=lambda m: ticks_diff(self.peers[m].t, now))
+                del self.peers[oldest]
+            w = self.peers[mac] = RecvWindow()
+        if w.add(msg_id, now):
+            return True
+        self.hits += 1
+        return False
+
+    def __contains__(self, mac):
+        return mac in self.peers
+
+    def __len__(self):
+        return len(self.peers)
@@ -0,0 +1,444 @@
+from array import array
+from time import time
+
+from bdg.msg import BadgeAdr, beacon_key
+
+NICK_LEN = 15  # bytes kept of a nick, config.clean_user_nick() cuts at 15 chars
+WHEEL = 64  # expiry wheel buckets of one second each
+RSSI_FRAC = 4  # smoothed rssi is kept in 1/16 dBm
+_NONE = -1
+
+
+def rank_key(badge):
+    # sort key of ranked(), for keeping badges in that order elsewhere
+    return -badge.band, badge.nick.lower(), badge.mac
+
+
+class PeerTable:
+    """
+    Fixed size table of badges seen on air, mac as key, replaces BadgeAdrDict.
+
+    Fields of a peer live in preallocated arrays indexed by a slot number, so a
+    peer costs about 60 bytes of heap whatever the number of peers (256 peers
+    15 KB, measured from the arrays) and an update allocates nothing:
+        macs        6 bytes per slot in one bytearray
+        rssi        smoothed rssi in 1/16 dBm, array("h")
+        band        rank_db wide rssi band of ranked(), array("b")
+        seen        last seen in whole seconds since t0, array("l")
+        fkey        BadgeAdr.frame_key of the last decoded beacon, see NowListener
+        nicks       NICK_LEN bytes per slot, utf-8, length in nlen
+        caps, fw    BeaconMsg capabilities and firmware version, array("l")
+        busy        BeaconMsg busy flag, bytearray
+        wire        1 if the badge beacons in the compact format, bytearray
+    Lookup is a linear probing hash of slot numbers over the mac bytes, deletes
+    shift entries back so there are no tombstones. Slots are on a doubly
+    linked LRU list, most recently seen first: a touch moves a slot to the
+    front and a full table evicts the last one, both O(1). Every touch also
+    stamps the slot with the table's seq, touched(since) walks the list from
+    the front only as far as the peers touched after since.
+
+    Expiry is a timing wheel of WHEEL one second buckets. A peer is filed in the
+    bucket of the second it was filed at and stays there when it is seen again.
+    cleanup_stale() only walks the buckets that went stale since the last call,
+    drops their peers that were not seen since and files the others anew. Its
+    cost is the number of peers that were due, not the table size.
+
+    rssi is an exponentially weighted moving average of the samples given to
+    update_last_seen() and of the rssi of badges stored again, a new sample
+    weighs 1 / 2**rssi_shift. BadgeAdr.rssi of a read peer is the smoothed
+    value. ranked() sorts by bands of rank_db dB, nearest first; a peer
+    changes band only once it is a quarter band past the edges of its band,
+    so peers in between don't swap places with every beacon.
+
+    Reading a peer (table[mac], values(), latest()) builds a BadgeAdr, setting
+    attributes of it does not change the table, use update_last_seen().
+    """
+
+    rssi_shift = 2  # 0 keeps the last sample only
+    rank_db = 4
+
+    def __init__(self, max_size, stale_multiplier=2.6):
+        # slot numbers are array("h"), max_size up to 16383
+        self.stale_multiplier = stale_multiplier  # Multiplier for beacon timeout (e.g., 2.6 * beacon_timeout)
+        self._seq = 0  # kept when the table is reallocated
+        self._alloc(max_size)
+
+    def _alloc(self, n):
+        self._n = n
+        size = 8
+        while size < 2 * n:
+            size <<= 1
+        self._mask = size - 1
+        self._index = array("h", [_NONE] * size)  # hash: slot
+        self.macs = bytearray(6 * n)
+        self.rssi = array("h", bytes(2 * n))
+        self.band = array("b", bytes(n))
+        self.seen = array("l", [0] * n)
+        self.fkey = array("l", [-1] * n)
+        self.caps = array("l", [-1] * n)
+        self.fw = array("l", [0] * n)
+        self.busy = bytearray(n)
+        self.wire = bytearray(n)
+        self.nicks = bytearray(NICK_LEN * n)
+        self.nlen = bytearray(n)
+        self._prev = array("h", [_NONE] * n)
+        self._next = array("h", range(1, n + 1))  # free slots chain through it
+        self._next[n - 1] = _NONE
+        self._free = 0
+        self._head = self._tail = _NONE
+        self._stamp = array("l", [0] * n)  # seq of the last touch
+        self._len = 0
+        # wheel links, a bucket's first slot has ~bucket as prev
+        self._wheel = array("h", [_NONE] * WHEEL)
+        self._wprev = array("h", [_NONE] * n)
+        self._wnext = array("h", [_NONE] * n)
+        self.t0 = int(time())
+        self._due = 0  # next wheel second to expire
+
+    @property
+    def max_size(self):
+        return self._n
+
+    @max_size.setter
+    def max_size(self, n):
+        # reallocates, peers are kept up to the new size, most recent first
+        peers = self.values()[:n]
+        self._alloc(max(1, n))
+        for badge in reversed(peers):
+            self._put(badge, badge.last_seen)
+
+    def clear(self):
+        self._alloc(self._n)
+
+    # lookup
+
+    def _hash(self, buf, b):
+        # folds the mac into 19 bits, the odd multiplier spreads runs of
+        # consecutive macs over the table, all stays a small int
+        x = (buf[b + 4] << 8 | buf[b + 5]) ^ (buf[b + 2] << 8 | buf[b + 3]) * 7 ^ (buf[b] << 8 | buf[b + 1]) * 3
+        return x * 157 & self._mask
+
+    def _slot(self, mac):
+        if len(mac) != 6:
+            return _NONE
+        index = self._index
+        macs = self.macs
+        mask = self._mask
+        i = self._hash(mac, 0)
+        while True:
+            s = index[i]
+            if s == _NONE:
+                return _NONE
+            b = 6 * s
+            if (
+                macs[b + 5] == mac[5]
+                and macs[b + 4] == mac[4]
+                and macs[b + 3] == mac[3]
+                and macs[b + 2] == mac[2]
+                and macs[b + 1] == mac[1]
+                and macs[b] == mac[0]
+            ):
+                return s
+            i = (i + 1) & mask
+
+    def _unindex(self, s):
+        index = self._index
+        mask = self._mask
+        macs = self.macs
+        i = self._hash(macs, 6 * s)
+        while index[i] != s:
+            i = (i + 1) & mask
+        # shift back entries of the probe run that would not be found past the hole
+        j = i
+        while True:
+            j = (j + 1) & mask
+            k = index[j]
+            if k == _NONE:
+                break
+            home = self._hash(macs, 6 * k)
+            if (i <= j and i < home <= j) or (i > j and (home > i or home <= j)):
+                continue
+            index[i] = k
+            i = j
+        index[i] = _NONE
+
+    # LRU list, most recent at head
+
+    def _unlink(self, s):
+        p = self._prev[s]
+        n = self._next[s]
+        if p == _NONE:
+            self._head = n
+        else:
+            self._next[p] = n
+        if n == _NONE:
+            self._tail = p
+        else:
+            self._prev[n] = p
+
+    def _push(self, s):
+        self._seq += 1
+        self._stamp[s] = self._seq
+        self._prev[s] = _NONE
+        self._next[s] = self._head
+        if self._head != _NONE:
+            self._prev[self._head] = s
+        self._head = s
+        if self._tail == _NONE:
+            self._tail = s
+
+    # expiry wheel
+
+    def _file(self, s):
+        t = self.seen[s]
+        if t < self._due:
+            t = self._due
+        w = t % WHEEL
+        first = self._wheel[w]
+        self._wprev[s] = ~w
+        self._wnext[s] = first
+        if first != _NONE:
+            self._wprev[first] = s
+        self._wheel[w] = s
+
+    def _unfile(self, s):
+        p = self._wprev[s]
+        n = self._wnext[s]
+        if p < 0:
+            self._wheel[~p] = n
+        else:
+            self._wnext[p] = n
+        if n != _NONE:
+            self._wprev[n] = p
+
+    def _drop(self, s):
+        self._unfile(s)
+        self._release(s)
+
+    def _release(self, s):
+        self._unindex(s)
+        self._unlink(s)
+        self._next[s] = self._free
+        self._free = s
+        self._len -= 1
+
+    def _put(self, badge, last_seen):
+        mac = badge.mac
+        s = self._slot(mac)
+        if s == _NONE:
+            if self._free == _NONE:
+                self._drop(self._tail)
+            s = self._free
+            self._free = self._next[s]
+            b = 6 * s
+            self.macs[b : b + 6] = mac
+            i = self._hash(mac, 0)
+            while self._index[i] != _NONE:
+                i = (i + 1) & self._mask
+            self._index[i] = s
+            self.seen[s] = int(last_seen) - self.t0
+            self._file(s)
+            self._len += 1
+            self._set_rssi(s, max(-128, min(127, badge.rssi)) << RSSI_FRAC, True)
+        else:
+            self._unlink(s)
+            self.seen[s] = int(last_seen) - self.t0
+            self._set_rssi(s, self._smooth(s, badge.rssi))
+        self._push(s)
+        self.fkey[s] = badge.frame_key
+        # con_ids past 29 would make caps a long int
+        self.caps[s] = badge.caps if badge.caps < 0 else badge.caps & 0x3FFFFFFF
+        self.fw[s] = badge.fw if 0 <= badge.fw < 1 << 30 else 0
+        self.busy[s] = 1 if badge.busy else 0
+        self.wire[s] = 1 if badge.compact else 0
+        nick = badge.nick
+        if isinstance(nick, str):
+            nick = nick.encode()
+        nick = nick[:NICK_LEN]
+        n = len(nick)
+        if n == NICK_LEN and nick[n - 1] & 0x80:
+            # don't keep half of a multibyte character
+            j = n - 1
+            while j and nick[j] & 0xC0 == 0x80:
+                j -= 1
+            lead = nick[j]
+            if n - j < (2 if lead < 0xE0 else 3 if lead < 0xF0 else 4):
+                n = j
+        b = NICK_LEN * s
+        self.nicks[b : b + n] = nick[:n]
+        self.nlen[s] = n
+
+    def _badge(self, s):
+        b = 6 * s
+        nb = NICK_LEN * s
+        badge = BadgeAdr(
+            bytes(self.macs[b : b + 6]),
+            str(self.nicks[nb : nb + self.nlen[s]], "utf-8"),
+            self._dbm(self.rssi[s]),
+            self.seen[s] + self.t0,
+        )
+        badge.frame_key = self.fkey[s]
+        badge.caps = self.caps[s]
+        badge.fw = self.fw[s]
+        badge.busy = bool(self.busy[s])
+        badge.compact = bool(self.wire[s])
+        badge.band = self.band[s]
+        return badge
+
+    def _smooth(self, s, rssi):
+        # the smoothed rssi of slot s with sample rssi added, not stored
+        v = self.rssi[s]
+        return v + ((max(-128, min(127, rssi)) << RSSI_FRAC) - v >> self.rssi_shift)
+
+    def _set_rssi(self, s, v, new=False):
+        self.rssi[s] = v
+        step = self.rank_db << RSSI_FRAC
+        low = self.band[s] * step
+        if new or v < low - (step >> 2) or v >= low + step + (step >> 2):
+            self.band[s] = v // step
+
+    @staticmethod
+    def _dbm(v):
+        # 1/16 dBm to dBm, rounded
+        return v + (1 << RSSI_FRAC - 1) >> RSSI_FRAC
+
+    def _slots(self):
+        s = self._head
+        while s != _NONE:
+            yield s
+            s = self._next[s]
+
+    # BadgeAdrDict API
+
+    def cleanup_stale(self, beacon_timeout):
+        """Remove badges that haven't been seen within stale_multiplier * beacon_timeout seconds.
+
+        Args:
+            beacon_timeout: The beacon transmission interval in seconds
+
+        Returns:
+            Number of stale badges removed
+        """
+        # seen seconds before cutoff are stale
+        cutoff = int(time()) - self.t0 - int(self.stale_multiplier * beacon_timeout)
+        if cutoff <= self._due:
+            return 0
+        removed = 0
+        start = max(self._due, cutoff - WHEEL)  # a lap covers every bucket
+        self._due = cutoff
+        for t in range(start, cutoff):
+            w = t % WHEEL
+            s = self._wheel[w]
+            self._wheel[w] = _NONE
+            while s != _NONE:
+                n = self._wnext[s]
+                if self.seen[s] < cutoff:
+                    self._release(s)  # already off the wheel
+                    removed += 1
+                else:
+                    self._file(s)
+                s = n
+        return removed
+
+    def __setitem__(self, key, value):
+        if not isinstance(value, BadgeAdr):
+            raise ValueError("Value must be an instance of BadgeAdr.")
+
+        if key != value.mac:
+            raise ValueError("Key must match the 'mac' attribute of the value.")
+
+        self._put(value, time())
+
+    def __getitem__(self, key):
+        s = self._slot(key)
+        if s == _NONE:
+            raise KeyError(f"Key {key} not found in store.")
+        return self._badge(s)
+
+    def __delitem__(self, key):
+        s = self._slot(key)
+        if s == _NONE:
+            raise KeyError(f"Key {key} not found in store.")
+        self._drop(s)
+
+    def __contains__(self, key):
+        return self._slot(key) != _NONE
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        # for casting a simple dict(badge_addr_dict)
+        for s in self._slots():
+            badge = self._badge(s)
+            yield badge.mac, badge
+
+    def items(self):
+        return list(self)
+
+    def values(self):
+        # most recently seen first
+        return [self._badge(s) for s in self._slots()]
+
+    def keys(self):
+        return [bytes(self.macs[6 * s : 6 * s + 6]) for s in self._slots()]
+
+    def latest(self):
+        # the badge seen last, None if there is none
+        return None if self._head == _NONE else self._badge(self._head)
+
+    def same_beacon(self, key, frame):
+        # True if the fields of beacon frame are those of the beacon kept for
+        # mac, by their beacon_key(). Allocates only the memoryview of it.
+        s = self._slot(key)
+        return s != _NONE and self.fkey[s] == beacon_key(frame)
+
+    def compact(self, key):
+        # True if mac beacons in the compact wire format, see NowListener.compact()
+        s = self._slot(key)
+        return s != _NONE and self.wire[s] == 1
+
+    def rssi_of(self, key, rssi=None):
+        # smoothed rssi in dBm of mac, None if unknown. With rssi it is the
+        # value that update_last_seen(key, t, rssi) would leave, the table
+        # does not change.
+        s = self._slot(key)
+        if s == _NONE:
+            return None
+        return self._dbm(self.rssi[s] if rssi is None else self._smooth(s, rssi))
+
+    def ranked(self):
+        # badges nearest first by rssi band, by nick within a band
+        badges = self.values()
+        badges.sort(key=rank_key)
+        return badges
+
+    @property
+    def seq(self):
+        # grows with every touch of a peer
+        return self._seq
+
+    def touched(self, since):
+        # badges touched after seq since, most recent first. Badges dropped
+        # since are not reported, check them with `in`.
+        badges = []
+        s = self._head
+        while s != _NONE and self._stamp[s] > since:
+            badges.append(self._badge(s))
+            s = self._next[s]
+        return badges
+
+    def update_last_seen(self, key, last_seen, rssi=None):
+        s = self._slot(key)
+        if s == _NONE:
+            return False
+        self.seen[s] = int(last_seen) - self.t0
+        if rssi is not None:
+            self._set_rssi(s, self._smooth(s, rssi))
+        if s != self._head:
+            self._unlink(s)
+            self._push(s)
+        else:
+            self._seq += 1
+            self._stamp[s] = self._seq
+        return True
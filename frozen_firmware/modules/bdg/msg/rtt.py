@@ -0,0 +1,172 @@
+from heapq import heappush, heappop
+from time import ticks_ms, ticks_diff
+
+RTO_INIT_MS = 250  # until the first ack from a peer has been timed
+RTO_MIN_MS = 100  # a busy peer (display refresh, gc) acks late
+RTO_MAX_MS = 2000
+
+# upper bounds (ms) of the ack latency histogram buckets, last bucket is open
+LATENCY_BUCKETS = (10, 20, 50, 100, 200, 500, 1000)
+
+
+class PeerRtt:
+    """
+    Round trip time estimate of one peer, RFC 6298 style.
+
+    srtt and rttvar are kept in ms scaled by 8 and 4 so that the smoothing
+    stays in small integers. rto is the retransmission timeout for a first
+    retry, backoff() doubles it after a message to the peer ran out of retries.
+    """
+
+    def __init__(self):
+        self.srtt8 = 0
+        self.rttvar4 = 0
+        self.rto = RTO_INIT_MS
+        self.samples = 0
+        self.t = ticks_ms()
+
+    @property
+    def srtt(self):
+        return self.srtt8 >> 3
+
+    def sample(self, rtt):
+        if self.samples == 0:
+            self.srtt8 = rtt << 3
+            self.rttvar4 = rtt << 1  # rtt / 2
+        else:
+            err = rtt - (self.srtt8 >> 3)
+            self.srtt8 += err
+            if err < 0:
+                err = -err
+            self.rttvar4 += err - (self.rttvar4 >> 2)
+        self.samples += 1
+        self.t = ticks_ms()
+        self.rto = min(RTO_MAX_MS, max(RTO_MIN_MS, (self.srtt8 >> 3) + self.rttvar4))
+
+    def backoff(self):
+        self.rto = min(RTO_MAX_MS, self.rto << 1)
+
+    def retry_ms(self, tries):
+        # timeout for a message already sent tries times, exponential backoff
+        return min(RTO_MAX_MS, self.rto << (tries - 1))
+
+
+
+class Deadlines:
+    """
+    Retransmission deadlines of the messages waiting for an ack, a heap.
+
+    push(key, p) files p, anything with a ticks_ms deadline, under key.
+    first(waiting) returns (key, p, ms left) of the earliest p that is still
+    waiting[key] with that deadline, or (None, None, 0): entries of acked or
+    refiled messages are dropped when they come up, so an ack costs nothing
+    here. pop() takes that earliest entry off. Each operation is O(log n) in
+    the messages waiting, a frame sent does not look at them.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._n = 0  # ties go by filing order, p is never compared
+        self._t0 = 0  # deadlines are kept relative to it, ticks_ms wraps
+
+    def __len__(self):
+        return len(self._heap)
+
+    def push(self, key, p):
+        if not self._heap:
+            self._t0 = p.deadline
+        self._n += 1
+        heappush(self._heap, (ticks_diff(p.deadline, self._t0), self._n, key, p))
+
+    def first(self, waiting, now):
+        heap = self._heap
+        while heap:
+            t, _, key, p = heap[0]
+            if waiting.get(key) is p and ticks_diff(p.deadline, self._t0) == t:
+                return key, p, ticks_diff(p.deadline, now)
+            heappop(heap)
+        return None, None, 0
+
+    def pop(self):
+        heappop(self._heap)
+
+    def clear(self):
+        self._heap.clear()
+
+
+class RttTable:
+    # PeerRtt per peer mac, at most max_peers kept, least recently used dropped
+    def __init__(self, max_peers=16):
+        self.max_peers = max_peers
+        self.peers = {}
+
+    def __getitem__(self, mac):
+        p = self.peers.get(mac)
+        if p is None:
+            if len(self.peers) >= self.max_peers:
+                now = ticks_ms()
+                oldest = min(self.peers, key=lambda m: ticks_diff(self.peers[m].t, now))
+                del self.peers[oldest]
+            p = self.peers[mac] = PeerRtt()
+        return p
+
+    def __contains__(self, mac):
+        return mac in self.peers
+
+    def items(self):
+        return self.peers.items()
+
+
+class AckStats:
+    """
+    Counters of acked messages for tuning retransmission.
+
+    Latency is from the first transmission until the ack, so it includes the
+    time spent in retries. From the REPL:
+        from bdg.msg.connection import NowListener
+        NowListener.ack_stats.report()
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.sent = 0  # messages waiting for an ack, retries not counted
+        self.acked = 0
+        self.retries = 0  # retransmissions of all messages
+        self.timeouts = 0  # messages that ran out of retries
+        self.lat_min = 0
+        self.lat_max = 0
+        self.lat_sum = 0
+        self.hist = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def ack(self, latency):
+        if self.acked == 0 or latency < self.lat_min:
+            self.lat_min = latency
+        if latency > self.lat_max:
+            self.lat_max = latency
+        self.acked += 1
+        self.lat_sum += latency
+        i = 0
+        for limit in LATENCY_BUCKETS:
+            if latency <= limit:
+                break
+            i += 1
+        self.hist[i] += 1
+
+    def report(self, rtt: RttTable = None):
+        avg = self.lat_sum // self.acked if self.acked else 0
+        print(
+            f"sent {self.sent} acked {self.acked} retries {self.retries} "
+            f"timeouts {self.timeouts}"
+        )
+        print(f"ack latency ms min {self.lat_min} avg {avg} max {self.lat_max}")
+        lo = 0
+        for i, n in enumerate(self.hist):
+            hi = LATENCY_BUCKETS[i] if i < len(LATENCY_BUCKETS) else None
+            print(f"  {lo:5d}-{hi if hi else '':<5} {n}")
+            lo = hi
+        if rtt:
+            for mac, p in rtt.items():
+                mac_hex = ":".join(f"{byte:02x}" for byte in mac)
+                print(f"{mac_hex} srtt {p.srtt} rto {p.rto} samples {p.samples}")
@@ -0,0 +1,153 @@
+import asyncio
+from time import ticks_ms, ticks_diff
+
+from bdg.msg import WIRE_MAGIC, WIRE_HDR_LEN
+
+PRIO_CTRL = 0  # acks and connection control (OpenConn, ConTerm)
+PRIO_APP = 1  # game AppMsgs
+PRIO_BULK = 2  # beacons and bulk data
+PRIO_NAMES = ("ctrl", "app", "bulk")
+
+
+class OutScheduler:
+    """
+    Outbound frame queues served strictly in priority order.
+
+    Items are kept in one bounded list per priority class, put() never raises:
+    an item that does not fit is dropped and counted. Each peer mac has a token
+    bucket of burst frames refilled at rate frames/s. pop() returns the first
+    item of the highest priority class whose peer has a token, so frames for
+    one peer keep their order and a paced peer does not hold up others. An
+    item that waits, paced or held back, keeps the later items of its peer
+    waiting behind it.
+    Control frames are not paced, they still spend tokens.
+
+    Items are OutQueMsg like, item.msg is the encoded frame. With max_bytes
+    pop() also takes the compact frames queued for the same peer that fit in
+    one bundle frame with the first one, in priority order. coalesce_ms holds
+    a compact frame back for that long after it was queued so that an ack and
+    the reply to the same message can still join it.
+    """
+
+    def __init__(self, sizes=(16, 16, 4), rate=50, burst=8):
+        self.sizes = sizes
+        self.rate = rate  # tokens per second == milli tokens per ms
+        self.burst = burst
+        self.queues = [[] for _ in sizes]
+        self.buckets = {}  # mac: [milli tokens, ticks_ms of last refill]
+        self.max_depth = [0] * len(sizes)
+        self.drops = [0] * len(sizes)
+        self.sent = [0] * len(sizes)
+        self.coalesced = 0  # items that went out inside another item's frame
+        self._ev = asyncio.Event()
+
+    def __len__(self):
+        return sum(len(q) for q in self.queues)
+
+    def depth(self, prio):
+        return len(self.queues[prio])
+
+    def put(self, item, mac, prio):
+        """Queue item for mac, returns False if the class was full and it was dropped."""
+        q = self.queues[prio]
+        if len(q) >= self.sizes[prio]:
+            self.drops[prio] += 1
+            return False
+        q.append((mac, item, ticks_ms()))
+        if len(q) > self.max_depth[prio]:
+            self.max_depth[prio] = len(q)
+        self._ev.set()
+        return True
+
+    def _tokens(self, mac, now):
+        b = self.buckets.get(mac)
+        if b is None:
+            if len(self.buckets) >= 32:
+                # forget peers with a full bucket, they look like new peers
+                full = self.burst * 1000
+                for m in [m for m, b in self.buckets.items() if b[0] >= full]:
+                    del self.buckets[m]
+            b = self.buckets[mac] = [self.burst * 1000, now]
+        else:
+            b[0] = min(self.burst * 1000, b[0] + ticks_diff(now, b[1]) * self.rate)
+            b[1] = now
+        return b
+
+    def pop(self, coalesce_ms=0, max_bytes=0):
+        """
+        Returns (items, 0) with the next item to send first in the list, or
+        (None, ms) with the time until a paced or held back item is ready
+        (ms is None when all queues are empty).
+        """
+        now = ticks_ms()
+        wait = None
+        held = None  # macs with an item not sent, their later items wait too
+        for prio, q in enumerate(self.queues):
+            for i, (mac, item, t) in enumerate(q):
+                if held and mac in held:
+                    continue
+                b = self._tokens(mac, now)
+                if prio != PRIO_CTRL and b[0] < 1000:
+                    ms = (1000 - b[0] + self.rate - 1) // self.rate
+                elif (
+                    coalesce_ms
+                    and item.msg[0] == WIRE_MAGIC
+                    and WIRE_HDR_LEN + len(item.msg) + 1 + WIRE_HDR_LEN + 1 <= max_bytes
+                ):
+                    # hold back only frames that leave room for another one
+                    ms = coalesce_ms - ticks_diff(now, t)
+                else:
+                    ms = 0
+                if ms > 0:
+                    if wait is None or ms < wait:
+                        wait = ms
+                    if held is None:
+                        held = [mac]
+                    else:
+                        held.append(mac)
+                    continue
+                b[0] = max(0, b[0] - 1000)
+                q.pop(i)
+                self.sent[prio] += 1
+                items = [item]
+                if max_bytes and item.msg[0] == WIRE_MAGIC:
+                    self._gather(mac, items, max_bytes - WIRE_HDR_LEN - len(item.msg) - 1)
+                return items, 0
+        return None, wait
+
+    def _gather(self, mac, items, room):
+        # moves compact frames for mac that still fit in room bytes to items
+        for prio, q in enumerate(self.queues):
+            i = 0
+            while i < len(q):
+                m, item, t = q[i]
+                n = len(item.msg) + 1  # length prefix in the bundle
+                if m == mac and n <= room and item.msg[0] == WIRE_MAGIC:
+                    q.pop(i)
+                    items.append(item)
+                    room -= n
+                    self.sent[prio] += 1
+                    self.coalesced += 1
+                else:
+                    i += 1
+
+    async def room(self, prio):
+        # until prio class has space, for producers that can wait
+        while len(self.queues[prio]) >= self.sizes[prio]:
+            await asyncio.sleep_ms(2)
+
+    async def wait(self, ms):
+        # until something is put or ms passed
+        self._ev.clear()
+        try:
+            await asyncio.wait_for_ms(self._ev.wait(), ms)
+        except asyncio.TimeoutError:
+            pass
+
+    def report(self):
+        for prio, name in enumerate(PRIO_NAMES):
+            print(
+                f"{name:5s} depth {self.depth(prio)}/{self.sizes[prio]} "
+                f"max {self.max_depth[prio]} sent {self.sent[prio]} drops {self.drops[prio]}"
+            )
+        print(f"coalesced {self.coalesced}")
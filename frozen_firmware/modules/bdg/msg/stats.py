@@ -0,0 +1,90 @@
+from time import ticks_ms, ticks_diff
+
+# counter indexes, the same for the totals and for every peer
+IN = 0  # frames received, a bundle counts once
+OUT = 1  # frames handed to the radio, retransmissions included
+BEACONS = 2  # beacons received
+RETRIES = 3  # retransmissions of unacked messages
+TIMEOUTS = 4  # messages that ran out of retries
+DEDUP = 5  # already delivered messages received again
+MALFORMED = 6  # frames that did not decode
+BLOCKED = 7  # frames dropped because their mac was blocked
+WEAK = 8  # frames dropped below NowListener.rssi_min, rssi_hyst lower for known badges
+QFULL = 9  # frames dropped because their out_q class was full
+NAMES = ("in", "out", "beacons", "retries", "timeouts", "dedup", "malformed", "blocked", "weak", "qfull")
+_T = len(NAMES)  # ticks_ms of the last count, per peer
+
+
+class RadioStats:
+    """
+    Integer counters of NowListener, in total and per peer mac.
+
+    count() costs two list increments, counters of a peer are a list of
+    len(NAMES) ints indexed by the constants above. At most max_peers peers are
+    kept, the one counted least recently makes room and its list is reused, so
+    a crowd allocates nothing once max_peers were counted. Peers that send
+    blocked, weak or malformed frames stay while they keep sending them, the
+    totals keep everything. Ack latencies are in NowListener.ack_stats. From the REPL:
+        from bdg.msg.connection import NowListener
+        NowListener.stats.report()
+    """
+
+    def __init__(self, max_peers=16):
+        self.max_peers = max_peers
+        self.reset()
+
+    def reset(self):
+        self.total = [0] * len(NAMES)
+        self.peers = {}  # mac: [counters..., ticks_ms]
+        self.since = ticks_ms()
+
+    def count(self, mac, i, n=1):
+        self.total[i] += n
+        p = self.peers.get(mac)
+        if p is None:
+            p = self._room()
+            self.peers[mac] = p
+        p[i] += n
+        p[_T] = ticks_ms()
+
+    def _room(self):
+        # a zeroed counter list, the least recently counted peer's if full
+        peers = self.peers
+        if len(peers) < self.max_peers:
+            return [0] * (_T + 1)
+        now = ticks_ms()
+        oldest = None
+        age = -1
+        for m, c in peers.items():
+            a = ticks_diff(now, c[_T])
+            if a > age:
+                age = a
+                oldest = m
+        p = peers.pop(oldest)
+        for j in range(_T + 1):
+            p[j] = 0
+        return p
+
+    def get(self, name, mac=None):
+        """Counter by name, of mac or in total."""
+        c = self.total if mac is None else self.peers.get(mac)
+        return c[NAMES.index(name)] if c else 0
+
+    def as_dict(self, mac=None):
+        c = self.total if mac is None else self.peers.get(mac, [0] * (_T + 1))
+        return {name: c[i] for i, name in enumerate(NAMES)}
+
+    def busiest(self, n=5):
+        # peers with the most frames in and out, most first
+        return sorted(self.peers.items(), key=lambda kv: -(kv[1][IN] + kv[1][OUT]))[:n]
+
+    def report(self, ack_stats=None):
+        secs = max(1, ticks_diff(ticks_ms(), self.since) // 1000)
+        print(f"radio stats over {secs}s")
+        print("  ".join(f"{name} {self.total[i]}" for i, name in enumerate(NAMES)))
+        print(f"{'peer':17s}" + "".join(f"{name[:7]:>8s}" for name in NAMES))
+        for mac, c in self.busiest(self.max_peers):
+            mac_hex = ":".join(f"{byte:02x}" for byte in mac)
+            print(mac_hex + "".join(f"{c[i]:8d}" for i in range(_T)))
+        if ack_stats:
+            ack_stats.report()
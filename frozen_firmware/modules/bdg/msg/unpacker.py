@@ -0,0 +1,98 @@
+from struct import unpack_from
+
+
+class Unpacker:
+    """
+    Minimal msgpack reader that decodes values in place from a receive buffer.
+
+    Covers the subset the compact codec produces: nil, bool, int, float, str,
+    bin and arrays. Unlike umsgpack.loads it needs no stream object and no
+    copy of the frame, only str/bin/float/array values allocate. One instance
+    is reset for every frame.
+
+    Raises ValueError on truncated data or types outside the subset.
+    """
+
+    def __init__(self):
+        self.mv = None
+        self.pos = 0
+        self.end = 0
+
+    def reset(self, buf, pos=0):
+        self.mv = memoryview(buf)
+        self.pos = pos
+        self.end = len(buf)
+        return self
+
+    def release(self):
+        # don't keep the receive buffer alive between frames
+        self.mv = None
+
+    def _take(self, n):
+        p = self.pos
+        if p + n > self.end:
+            raise ValueError("truncated")
+        self.pos = p + n
+        return p
+
+    def _uint(self, n):
+        p = self._take(n)
+        mv = self.mv
+        v = 0
+        for i in range(p, p + n):
+            v = (v << 8) | mv[i]
+        return v
+
+    def _int(self, n):
+        v = self._uint(n)
+        bits = n * 8
+        if v >= 1 << (bits - 1):
+            v -= 1 << bits
+        return v
+
+    def array_len(self):
+        b = self._uint(1)
+        if 0x90 <= b <= 0x9F:
+            return b & 0x0F
+        if b == 0xDC:
+            return self._uint(2)
+        raise ValueError("not an array")
+
+    def value(self):
+        b = self._uint(1)
+        if b <= 0x7F:
+            return b
+        if b >= 0xE0:
+            return b - 0x100
+        if 0xA0 <= b <= 0xBF:
+            return self._str(b & 0x1F)
+        if 0x90 <= b <= 0x9F or b == 0xDC:
+            self.pos -= 1
+            return [self.value() for _ in range(self.array_len())]
+        if b == 0xC0:
+            return None
+        if b == 0xC2:
+            return False
+        if b == 0xC3:
+            return True
+        if 0xCC <= b <= 0xCF:
+            return self._uint(1 << (b - 0xCC))
+        if 0xD0 <= b <= 0xD3:
+            return self._int(1 << (b - 0xD0))
+        if b == 0xCA:
+            return unpack_from(">f", self.mv, self._take(4))[0]
+        if b == 0xCB:
+            return unpack_from(">d", self.mv, self._take(8))[0]
+        if b == 0xD9:
+            return self._str(self._uint(1))
+        if b == 0xDA:
+            return self._str(self._uint(2))
+        if 0xC4 <= b <= 0xC5:
+            n = self._uint(b - 0xC3)
+            p = self._take(n)
+            return bytes(self.mv[p : p + n])
+        raise ValueError(f"unsupported type 0x{b:02x}")
+
+    def _str(self, n):
+        p = self._take(n)
+        return str(self.mv[p : p + n], "utf-8")
@@ -24,7 +24,7 @@ class BootScr(Screen):
         self.ready_cb = ready_cb
         self.espnow = espnow
         self.sta = sta
-        ver = Version()
+        self.ver = ver = Version()
         # verbose default indicates if fast rendering is enabled
         self.wri = CWriter(ssd, font10, GREEN, BLACK, verbose=False)
         self.ver_str = f"Ver:{ver.version} b:{ver.build}"
@@ -40,14 +40,15 @@ class BootScr(Screen):
 
         # Import global_buttons and new_con_cb from bdg.utils
         from bdg.utils import global_buttons, new_con_cb
+        from bdg.game_registry import get_registry
 
         self.reg_task(global_buttons(self.espnow, self.sta), False)
 
         nick = Config.config["espnow"]["nick"]
         print(f"BootScr: {nick=}")
-        beaconmsg = BeaconMsg(nick)
+        beaconmsg = BeaconMsg(nick, caps=get_registry().multiplayer_caps(), fw=self.ver.code())
 
-        Beacon.setup(self.espnow, beaconmsg)
+        Beacon.setup(self.espnow, beaconmsg, timeout=Config.config["espnow"]["beacon"])
         Beacon.start(task=True)
 
         NowListener.con_cb = new_con_cb
@@ -126,13 +126,11 @@ class LoadingScreen(Screen):
         
         # Only send cancel if user backed out (not if countdown finished or already cancelled)
         if self.should_send_cancel():
-            from bdg.msg import CancelActivityMsg
             print("LoadingScreen: Sending cancel to other badge")
             # Set cancelled BEFORE sending to prevent any race conditions
             self.cancelled = True
             try:
-                msg = CancelActivityMsg()
-                self.conn.send_app_msg(msg, sync=False)
+                self.conn.send_cancel()
             except Exception as e:
                 print(f"LoadingScreen: Failed to send cancel: {e}")
         else:
@@ -1,6 +1,7 @@
 from bdg.screens.solo_games_screen import SoloGamesScreen
 from bdg.screens.info_screen import InfoScreen
 from bdg.screens.credits_screen import CreditsScreen
+from bdg.screens.radio_stats_screen import RadioStatsScreen
 from gui.fonts import freesans20, font10
 from gui.core.colors import *
 from gui.core.ugui import Screen, ssd
@@ -25,6 +26,7 @@ class OptionScreen(Screen):
             "Home",
             "Info",
             "Credits",
+            "Radio stats",
             "Firmware update",
             "Solo games & apps",
         ]
@@ -67,6 +69,8 @@ class OptionScreen(Screen):
             Screen.change(InfoScreen, mode=Screen.STACK)
         elif selected == "Credits":
             Screen.change(CreditsScreen, mode=Screen.STACK)
+        elif selected == "Radio stats":
+            Screen.change(RadioStatsScreen, mode=Screen.STACK)
         elif selected == "Firmware update":
             Screen.change(
                 OTAScreen,
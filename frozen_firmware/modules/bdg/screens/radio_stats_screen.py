@@ -0,0 +1,68 @@
+import asyncio
+
+from gui.core.colors import GREEN, BLACK, CYAN, D_PINK
+from gui.fonts import font10, font14
+from gui.core.ugui import Screen, ssd
+from gui.core.writer import CWriter
+from gui.widgets import Label
+from bdg.widgets.hidden_active_widget import HiddenActiveWidget
+from bdg.msg.connection import NowListener
+from bdg.msg.stats import IN, OUT, BEACONS, RETRIES, TIMEOUTS, DEDUP, MALFORMED, BLOCKED, WEAK, QFULL
+
+PEER_LINES = 4
+
+
+class RadioStatsScreen(Screen):
+    """Live counters of the badge's NowListener, for tuning beacon, retries and RSSI cutoff"""
+
+    def __init__(self):
+        super().__init__()
+        self.update_task = None
+
+        self.wri = CWriter(ssd, font10, GREEN, BLACK, verbose=False)
+        self.wri_title = CWriter(ssd, font14, CYAN, BLACK, verbose=False)
+        self.wri_peer = CWriter(ssd, font10, D_PINK, BLACK, verbose=False)
+
+        Label(self.wri_title, 5, 10, "Radio stats")
+
+        y = 30
+        self.totals = []
+        for _ in range(4):
+            self.totals.append(Label(self.wri, y, 10, 300))
+            y += 18
+        y += 6
+        self.peers = []
+        for _ in range(PEER_LINES):
+            self.peers.append(Label(self.wri_peer, y, 10, 300))
+            y += 18
+
+        HiddenActiveWidget(self.wri)  # Enable closing with button
+
+    def on_open(self):
+        if not self.update_task or self.update_task.done():
+            self.update_task = self.reg_task(self.update_task_loop(), True)
+
+    def refresh(self):
+        nl = NowListener  # the badge's own listener keeps its state in the class
+        t = nl.stats.total
+        a = nl.ack_stats
+        avg = a.lat_sum // a.acked if a.acked else 0
+        self.totals[0].value(f"in {t[IN]}  out {t[OUT]}  beacons {t[BEACONS]}  peers {len(nl.last_seen)}")
+        self.totals[1].value(f"retries {t[RETRIES]}  timeouts {t[TIMEOUTS]}  dedup {t[DEDUP]}")
+        self.totals[2].value(f"malformed {t[MALFORMED]}  blocked {t[BLOCKED]}  weak {t[WEAK]}  qfull {t[QFULL]}")
+        self.totals[3].value(f"ack ms avg {avg} max {a.lat_max}  rssi min {nl.rssi_min} -{nl.rssi_hyst}")
+
+        busiest = nl.stats.busiest(PEER_LINES)
+        for i, lbl in enumerate(self.peers):
+            if i >= len(busiest):
+                lbl.value("")
+                continue
+            mac, c = busiest[i]
+            name = nl.last_seen[mac].nick if mac in nl.last_seen else mac[3:].hex()
+            srtt = nl.rtt[mac].srtt if mac in nl.rtt else "-"
+            lbl.value(f"{name[:12]} in {c[IN]} out {c[OUT]} r {c[RETRIES]} srtt {srtt}")
+
+    async def update_task_loop(self):
+        while True:
+            self.refresh()
+            await asyncio.sleep(1)
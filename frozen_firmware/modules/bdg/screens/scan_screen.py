@@ -3,6 +3,7 @@ import asyncio
 from bdg.msg import BadgeAdr, null_badge_adr
 from bdg.msg.connection import NowListener, Beacon
 from bdg.game_registry import get_registry
+from bdg.widgets.badge_rows import BadgeRows
 from bdg.widgets.hidden_active_widget import HiddenActiveWidget
 from gui.core.colors import GREEN, BLACK, D_PINK
 from gui.core.ugui import Screen, ssd
@@ -42,9 +43,12 @@ class MultiplayerGameSelectionScreen(SimpleListScreen):
     
     def get_initial_elements(self):
         """Return list of multiplayer game titles"""
+        # only games the other badge has too, firmware without caps in its beacon
+        # gets all, con_ids past 29 don't fit in caps and are always listed
         games = [
             game["title"] for game in self.games 
             if game.get("multiplayer", False)
+            and (game["con_id"] >= 30 or self.baddr.plays(1 << game["con_id"]))
         ]
         return games if games else None
     
@@ -77,6 +81,8 @@ class MultiplayerGameSelectionScreen(SimpleListScreen):
 class ScannerScreen(Screen):
     """Simple scanner draft that start EspNowScanner and display results in a listbox"""
 
+    redraw_ms = 500  # the list is redrawn at most every redraw_ms
+
     def __init__(self, espnow=None, sta=None):
         super().__init__()
         self.espnow = espnow
@@ -97,10 +103,19 @@ class ScannerScreen(Screen):
             bdcolor=False,
             justify=Label.CENTRE,
         )
-        self.lbl_title.value(f"{self.max_badges} near badges")
-
-        # Initialize with placeholder
-        self.elements = [("No badges found, looking..", dolittle, (null_badge_adr,))]
+        self.lbl_title.value("0 near badges")
+        self.shown = 0
+
+        # Badges nearest first, busy ones and ones without a game in common
+        # are left out
+        self.caps = get_registry().multiplayer_caps()
+        self.elements = []
+        self.rows = BadgeRows(
+            self.elements,
+            self.cb,
+            ("No badges found, looking..", dolittle, (null_badge_adr,)),
+            show=lambda badge: not badge.busy and badge.plays(self.caps),
+        )
         self.listbox = Listbox(
             wri_pink,
             50,
@@ -122,39 +137,19 @@ class ScannerScreen(Screen):
         # TODO: README This is the only way to add workers to task!!
         # if reg_task() is called in init task will not be restarted when coming
         # back from dialog of dropdown
+        Beacon.scanning(True)  # others find this badge sooner too
         if not self.update_task or self.update_task.done():
             self.update_task = self.reg_task(self.update_resuls_task(), True)
 
-    def rebuild_list(self):
-        """Rebuild the badge list from NowListener.last_seen."""
-        
-        # Get all current badges from NowListener
-        current_badges = list(NowListener.last_seen.values())
-        
-        # Clear the existing list (modifying in place)
-        self.elements.clear()
-        
-        if not current_badges:
-            # No badges found, show placeholder
-            self.elements.append(("No badges found, looking..", dolittle, (null_badge_adr,)))
-        else:
-            # Build new elements from current badges
-            new_elements = [
-                (
-                    f"{badge.nick} [{badge.rssi}dBm]",
-                    self.cb,
-                    (badge,),
-                )
-                for badge in current_badges
-            ]
-            # Sort alphabetically by nickname (case-insensitive)
-            new_elements.sort(key=lambda a: a[2][0].nick.lower())
-            
-            # Add sorted elements to the list
-            self.elements.extend(new_elements)
-        
-        # Update listbox display
-        if hasattr(self, "listbox"):
+    def on_hide(self):
+        Beacon.scanning(False)
+
+    def refresh_list(self):
+        """Apply the changes of NowListener.last_seen to the list, redraw it if a row changed."""
+        if self.rows.refresh(NowListener.last_seen):
+            if len(self.rows) != self.shown:
+                self.shown = len(self.rows)
+                self.lbl_title.value(f"{self.shown} near badges")
             self.listbox.update()
 
     async def update_resuls_task(self):
@@ -162,14 +157,13 @@ class ScannerScreen(Screen):
             NowListener.start(self.espnow)  # ensure scanner is running
             Beacon.suspend(False)  # ensure that we have beacon on
 
-            # initial update - rebuild entire list
-            self.rebuild_list()
+            self.refresh_list()
 
-            # wait for changes (both additions and removals)
-            async for latest_badge in NowListener.updates():
-                # Rebuild entire list on any change
-                # This handles both additions and removals (from cleanup_stale)
-                self.rebuild_list()
-                await asyncio.sleep(0)
+            # wait for changes (both additions and removals), updates of a burst
+            # collect in the update event while the list is redrawn and for
+            # redraw_ms after, then go in one refresh
+            async for _ in NowListener.updates():
+                self.refresh_list()
+                await asyncio.sleep_ms(self.redraw_ms)
         except Exception as e:
             print(f"update_resuls_task: {e}")
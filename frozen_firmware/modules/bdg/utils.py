@@ -3,6 +3,10 @@ import asyncio
 from time import time
 
 from gui.primitives import launch
+from bdg.display import mark
+from bdg.log import get_log
+
+log = get_log(__name__)
 
 
 def enum(**enums: int):
@@ -15,6 +19,7 @@ def copy_img_to_mvb(img_file, ssd):
         rows = int.from_bytes(f.read(2), "big")
         cols = int.from_bytes(f.read(2), "big")
         f.readinto(ssd.mvb)
+    mark(ssd, 0, 0, ssd.width, ssd.height)
 
 
 from framebuf import RGB565, GS4_HMSB, GS8
@@ -43,6 +48,7 @@ def blit(ssd, img, row=0, col=0):
     dwidth = scale(ssd.width, sz)  # Display width in bytes
     d = scale(row * ssd.width + col, sz)  # Destination index
     s = 0  # Source index
+    mark(ssd, col, row, icols, irows)
     while irows:
         mvb[d : d + dbytes] = img.data[s : s + dbytes]
         s += ibytes
@@ -84,7 +90,7 @@ class AProc:
 
     async def task(self, *args, **kwargs):
         # This needs to be overridden
-        print("ERROR: AProc task started!!!!!")
+        log.error("AProc task started!!!!!")
         pass
 
     async def wait_stop(self):
@@ -92,13 +98,13 @@ class AProc:
 
     @classmethod
     def start(cls, *args, **kwargs):
-        print(f"Starting async {type(cls).__name__}")
+        log.info("Starting async %s", type(cls).__name__)
         task = kwargs.pop("task", None)
         if task:
             if cls._task and cls._task.done() or not cls._task:
                 # now start the task with all args except "task"
                 cls._task = asyncio.create_task(cls.task(*args, **kwargs))
-                print(f"new task: {cls._task=}")
+                log.debug("new task: cls._task=%r", cls._task)
             return cls._task
         else:
             # sync run, this is missing the logic to ensure single task
@@ -113,7 +119,7 @@ class AProc:
 
     @classmethod
     def stop(cls):
-        print(f"Stopping async {cls.__name__}")
+        log.info("Stopping async %s", cls.__name__)
         if cls.stop_event:
             cls.stop_event.set()
             cls._task.cancel()
@@ -231,12 +237,14 @@ class Timer:
         self.start()
 
 
-from gui.core.colors import BLACK, RECTANGLE, GREEN, D_PINK
-from gui.core.ugui import Screen
-from gui.widgets.buttons import Button
+# GUI imports are inside the functions below: importing gui.core.ugui sets up
+# the display, modules like bdg.msg.connection that only need AProc, enum or
+# Timer from here must stay importable without it (unix port, CPython).
 
 
 def change_app(cls_new_screen, args=[], kwargs={}, base_screen=None):
+    from gui.core.ugui import Screen
+
     # Change to cls_new_screen. if cls_new_screen is already open back up to it
     # if cls_new_screen is not open it will be opened on top of base_screen
     # This prevents quick buttons stacking same screen over and over
@@ -244,10 +252,10 @@ def change_app(cls_new_screen, args=[], kwargs={}, base_screen=None):
     # Check stack for existing screen and change target according
     current = Screen.current_screen
     target_to_back = base_screen
-    print(f"change_app: {cls_new_screen=} {target_to_back=}")
+    log.info("change_app: cls_new_screen=%r target_to_back=%r", cls_new_screen, target_to_back)
     while current and base_screen is not cls_new_screen:
         if isinstance(current, cls_new_screen):
-            print(f"change_app: {cls_new_screen} already on stack")
+            log.info("change_app: %s already on stack", cls_new_screen)
             target_to_back = cls_new_screen
             break
         current = current.parent
@@ -266,6 +274,10 @@ def change_app(cls_new_screen, args=[], kwargs={}, base_screen=None):
 
 
 def fwdbutton(wri, row, col, cls_screen, text="Next"):
+    from gui.core.colors import BLACK, RECTANGLE, D_PINK
+    from gui.core.ugui import Screen
+    from gui.widgets.buttons import Button
+
     def fwd(button):
         Screen.change(cls_screen)
 
@@ -288,11 +300,13 @@ def fwdbutton(wri, row, col, cls_screen, text="Next"):
 
 
 def handle_back(ev):
-    print(f"[__Back]")
+    from gui.core.ugui import Screen
+
+    log.debug("[__Back]")
     if Screen.current_screen.parent is not None:
         Screen.back()
     else:
-        print("No screen to go back to")
+        log.warning("No screen to go back to")
 
 
 async def global_buttons(espnow=None, sta=None):
@@ -311,7 +325,7 @@ async def global_buttons(espnow=None, sta=None):
     base_screen = GameLobbyScr
 
     handlers = {
-        "btn_select": lambda ev: print(f"btn_select {ev}")
+        "btn_select": lambda ev: log.debug("btn_select %s", ev)
         or change_app(
             OptionScreen, kwargs={"espnow": espnow, "sta": sta}, base_screen=base_screen
         ),
@@ -319,7 +333,7 @@ async def global_buttons(espnow=None, sta=None):
     }
 
     async for btn, ev in be.get_btn_events():
-        handlers.get(btn, lambda e: print(f"Unknown {btn} {e}"))(ev)
+        handlers.get(btn, lambda e: log.warning("Unknown %s %s", btn, e))(ev)
 
 
 async def new_con_cb(conn, req=False):
@@ -353,7 +367,7 @@ async def new_con_cb(conn, req=False):
         current = Screen.current_screen
         
         if not isinstance(current, allowed_screens):
-            print(f"Connection auto-declined: User busy in {current.__class__.__name__}")
+            log.warning("Connection auto-declined: User busy in %s", current.__class__.__name__)
             return False  # Auto-decline
 
     accept = False
@@ -363,7 +377,7 @@ async def new_con_cb(conn, req=False):
         def resp(window):
             nonlocal accept
             # convert response to True
-            print(f"con accept: {window.value()=}")
+            log.info("con accept: window.value()=%r", window.value())
             accept = window.value() == "Yes"
             w_reply.set()
 
@@ -440,6 +454,6 @@ async def new_con_cb(conn, req=False):
                 },
             )
         else:
-            print(f"Warning: No game registered for con_id {conn.con_id}")
+            log.warning("No game registered for con_id %s", conn.con_id)
 
     return accept
@@ -11,3 +11,12 @@ class Version:
 
         with open(f"/readonly_fs/{filename}") as f:
             return f.read().strip()
+
+    def code(self) -> int:
+        # "v1.0.4" as 0x010004 for BeaconMsg.fw, 0 if the version is not x.y.z
+        try:
+            parts = self.version.lstrip("vV").split("-")[0].split(".")
+            major, minor, patch = (int(p) for p in parts[:3])
+        except ValueError:
+            return 0
+        return (major & 0xFF) << 16 | (minor & 0xFF) << 8 | patch & 0xFF
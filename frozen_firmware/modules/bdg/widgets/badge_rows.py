@@ -0,0 +1,98 @@
+from bdg.msg.peers import rank_key
+
+
+class BadgeRows:
+    """
+    Rows of a Listbox of badges from a PeerTable, in the order of its ranked().
+
+    elements is the list the Listbox was made with, it is changed in place.
+    A row is (text(badge), cb, (badge,)), badges that show() rejects get no
+    row, placeholder is the only row while there is none.
+
+    refresh() applies only the badges touched since the last refresh
+    (PeerTable.touched()) and drops the rows of badges that left the table. A
+    row is found by binary search over the sorted rank keys and inserted,
+    moved, removed or its text replaced. It returns True if the text or order
+    of a row changed, the Listbox needs update() only then. Rows of badges
+    seen again with the same text get the fresh badge without a redraw.
+    """
+
+    def __init__(self, elements, cb, placeholder, text=None, show=None):
+        self.elements = elements
+        self.cb = cb
+        self.placeholder = placeholder
+        self.text = text or (lambda badge: f"{badge.nick} [{badge.rssi}dBm]")
+        self.show = show or (lambda badge: True)
+        self.keys = []  # rank keys of elements
+        self.rows = {}  # mac: (rank key, text)
+        self.seq = 0  # table seq the rows are up to date with
+        self.reset()
+
+    def reset(self):
+        self.keys.clear()
+        self.rows.clear()
+        self.seq = 0
+        self.elements.clear()
+        self.elements.append(self.placeholder)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _find(self, key):
+        keys = self.keys
+        lo, hi = 0, len(keys)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if keys[mid] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _insert(self, key, text, badge):
+        if not self.rows:
+            self.elements.clear()  # the placeholder
+        i = self._find(key)
+        self.keys.insert(i, key)
+        self.elements.insert(i, (text, self.cb, (badge,)))
+        self.rows[badge.mac] = (key, text)
+
+    def _remove(self, mac):
+        key, _ = self.rows.pop(mac)
+        i = self._find(key)
+        del self.keys[i]
+        del self.elements[i]
+        if not self.rows:
+            self.elements.append(self.placeholder)
+
+    def apply(self, badge):
+        # one badge, True if a row changed
+        row = self.rows.get(badge.mac)
+        if not self.show(badge):
+            if row is None:
+                return False
+            self._remove(badge.mac)
+            return True
+        key = rank_key(badge)
+        text = self.text(badge)
+        if row is not None:
+            if row[0] == key:
+                self.elements[self._find(key)] = (text, self.cb, (badge,))
+                if row[1] == text:
+                    return False
+                self.rows[badge.mac] = (key, text)
+                return True
+            self._remove(badge.mac)
+        self._insert(key, text, badge)
+        return True
+
+    def refresh(self, table):
+        changed = False
+        for badge in table.touched(self.seq):
+            if self.apply(badge):
+                changed = True
+        self.seq = table.seq
+        gone = [mac for mac in self.rows if mac not in table]
+        for mac in gone:
+            self._remove(mac)
+        return changed or bool(gone)
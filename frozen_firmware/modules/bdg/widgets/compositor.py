@@ -0,0 +1,163 @@
+import asyncio
+import framebuf
+
+from bdg.display import DirtyRects
+from bdg.widgets.sprite_frames import SpriteBuffer
+
+
+class Layer:
+    """
+    A sprite of a Compositor: frame drawn at x, y over the background and the
+    layers below it, key is the transparent colour or -1. frame is anything
+    ssd.blit() takes that has a size: a SpriteBuffer, a frame of a SpriteSheet
+    or ScaledFrames. Changes go through move(), set() and show(), they mark
+    where the layer was and where it is now for the next compose().
+    """
+
+    def __init__(self, comp, frame, x, y, key, z):
+        self.comp = comp
+        self.x = x
+        self.y = y
+        self.key = key
+        self.z = z
+        self.visible = True
+        self._size(frame)
+
+    def _size(self, frame):
+        self.frame = frame
+        if isinstance(frame, tuple):
+            self.width = frame[1]
+            self.height = frame[2]
+        else:
+            self.width = frame.width
+            self.height = frame.height
+
+    def _damage(self):
+        if self.visible:
+            self.comp.damage.mark(self.x, self.y, self.width, self.height)
+
+    def move(self, x, y):
+        ox = self.x
+        oy = self.y
+        if x == ox and y == oy:
+            return
+        self.x = x
+        self.y = y
+        if not self.visible:
+            return
+        w = self.width
+        h = self.height
+        if abs(x - ox) < w and abs(y - oy) < h:
+            # a step, the old and new place overlap, one rectangle for both
+            x0 = x if x < ox else ox
+            y0 = y if y < oy else oy
+            self.comp.damage.mark(x0, y0, w + abs(x - ox), h + abs(y - oy))
+        else:
+            self.comp.damage.mark(ox, oy, w, h)
+            self._damage()
+
+    def set(self, frame):
+        if frame is not self.frame:
+            self._damage()
+            self._size(frame)
+            self._damage()
+
+    def show(self, visible):
+        if visible != self.visible:
+            self._damage()
+            self.visible = visible
+            self._damage()
+
+
+class Compositor:
+    """
+    Sprites over a static background on a width x height area of ssd at x, y.
+
+    background is a SpriteBuffer of the area: capture() copies it from the
+    screen, or draw it and call invalidate(). redraw() is for a screen drawn
+    anew, it takes the background once the drawing is over. Code that changes
+    what is under the sprites draws it into background as well and calls
+    invalidate(), or calls capture() again before any sprite is composed on
+    the screen. add() puts a Layer on top of the ones of the same z and below
+    those of a higher z, remove() takes it off.
+    compose() draws the changed rectangles, the union of where the layers
+    were and are now, anew from the background and the layers over them and
+    blits each onto ssd once, nothing else is drawn or sent. Overlapping
+    layers stay intact, each is drawn from its frame every time.
+
+    A rectangle is composed in bands of at most scratch_bytes, all drawing is
+    framebuf blits with the layers' colour keys.
+    """
+
+    def __init__(self, ssd, x=0, y=0, width=None, height=None, scratch_bytes=16 * 1024):
+        self.ssd = ssd
+        self.x = x
+        self.y = y
+        self.width = ssd.width - x if width is None else width
+        self.height = ssd.height - y if height is None else height
+        self.background = SpriteBuffer(self.width, self.height)
+        self.layers = []
+        self.damage = DirtyRects(self.width, self.height, max_rects=32, gap=4)
+        self._scratch = memoryview(bytearray(max(scratch_bytes, self.width * 2)))
+        self._pending = None  # task of redraw()
+
+    def add(self, frame, x=0, y=0, key=-1, z=0):
+        layer = Layer(self, frame, x, y, key, z)
+        layers = self.layers
+        i = len(layers)
+        while i and layers[i - 1].z > z:
+            i -= 1
+        layers.insert(i, layer)
+        layer._damage()
+        return layer
+
+    def remove(self, layer):
+        if layer in self.layers:
+            layer._damage()
+            self.layers.remove(layer)
+
+    def capture(self):
+        # the area of the screen as it is now becomes the background
+        self.background.blit(self.ssd, -self.x, -self.y)
+        self.invalidate()
+
+    def invalidate(self):
+        self.damage.full()
+
+    def redraw(self):
+        # The screen is being drawn anew, the sprites with it. Widgets after
+        # them are not drawn yet: the background is taken and the sprites
+        # composed over it in the next turn of the event loop, once the
+        # whole screen is drawn. compose() waits for it until then.
+        if self._pending is None:
+            self._pending = asyncio.create_task(self._recapture())
+
+    async def _recapture(self):
+        await asyncio.sleep_ms(0)
+        self._pending = None
+        self.capture()
+        self.compose()
+
+    def compose(self):
+        if self._pending is not None:
+            return
+        rects = self.damage.take()
+        if rects is None:
+            rects = ((0, 0, self.width, self.height),)
+        for x0, y0, x1, y1 in rects:
+            w = x1 - x0
+            band = len(self._scratch) // (w * 2)
+            for y in range(y0, y1, band):
+                self._compose(x0, y, w, min(band, y1 - y))
+
+    def _compose(self, x, y, w, h):
+        scratch = framebuf.FrameBuffer(self._scratch, w, h, framebuf.RGB565)
+        scratch.blit(self.background, -x, -y)
+        x1 = x + w
+        y1 = y + h
+        for layer in self.layers:
+            lx = layer.x
+            ly = layer.y
+            if layer.visible and lx < x1 and ly < y1 and lx + layer.width > x and ly + layer.height > y:
+                scratch.blit(layer.frame, lx - x, ly - y, layer.key)
+        self.ssd.blit((self._scratch, w, h, framebuf.RGB565), self.x + x, self.y + y)
@@ -1,6 +1,18 @@
-import framebuf
-
-from bdg.utils import blit_to_buf, blit
+from bdg.utils import blit
+from bdg.widgets.compositor import Compositor, Layer
+from bdg.widgets.sprite_frames import (
+    SpriteBuffer,
+    SpriteSheet,
+    ScaledFrames,
+    scale_rgb565,
+    Animation,
+    Animator,
+    AnimationClock,
+    LOOP,
+    BOUNCE,
+    ONCE,
+    RANDOM,
+)
 from gui.core import writer
 from gui.core.colors import BLACK, GREEN, WHITE
 from gui.core.ugui import Widget, Screen
@@ -8,21 +20,24 @@ from gui.core.writer import AlphaColor
 from hardware_setup import ssd
 
 
-class SpriteBuffer(framebuf.FrameBuffer):
-    def __init__(self, width, height):
-        buf = bytearray(height * width * 2)
-        self.mvb = memoryview(buf)
-        self.height = height  # Required by Writer class
-        self.width = width
-        self.mode = framebuf.RGB565
-        super().__init__(buf, width, height, framebuf.RGB565)
-
-    def from_image(self, image):
-        self.mvb[:] = image.data
-        return self
+def compositor(screen):
+    # the Compositor of the sprites of a screen, made with the first one
+    comp = getattr(screen, "compositor", None)
+    if comp is None:
+        comp = screen.compositor = Compositor(ssd)
+    return comp
 
 
 class Sprite(Widget):
+    # image is an image module (rows, cols, data) or a sheet of frames of the
+    # same size, a SpriteSheet or ScaledFrames, shown from its first frame.
+    # animations is a dict of name: Animation over sheets of that size,
+    # play(name) starts one on the AnimationClock, stop() stops it. No frame is
+    # drawn while another screen is current, stop it when its screen closes.
+    # The sprites of a screen are layers of its compositor, in the order they
+    # were made within a z, bgcolor is their transparent colour. Their
+    # background is taken from the screen once it is drawn, see
+    # Compositor.redraw(), capture() and invalidate().
 
     def __init__(
         self,
@@ -33,44 +48,56 @@ class Sprite(Widget):
         fgcolor=None,
         bgcolor=AlphaColor(BLACK),
         bdcolor=False,
+        animations=None,
+        z=0,
     ):
         # Determine width of sprite
-        height = image.rows
-        width = image.cols
+        if hasattr(image, "frame"):
+            height = image.height
+            width = image.width
+        else:
+            height = image.rows
+            width = image.cols
         super().__init__(writer, row, col, height, width, fgcolor, bgcolor, bdcolor)
 
-        self._sprite = SpriteBuffer(width, height).from_image(image)
-        self._bg_store = SpriteBuffer(width, height)
+        if hasattr(image, "frame"):
+            frame = image.frame(0)
+        else:
+            frame = SpriteBuffer(width, height).from_image(image)
+        self.compositor = compositor(self.screen)
+        self.layer = self.compositor.add(frame, col, row, bgcolor, z)
+        self.animator = Animator(animations, self._on_frame) if animations else None
+
+    def _on_frame(self, sheet, i):
+        if self.screen is Screen.current_screen:
+            self.layer.set(sheet.frame(i))
+            self.draw = True
 
-        self._old_row = row
-        self._old_col = col
-        self.capture_bg()
+    def play(self, name, restart=False):
+        self.animator.play(name, restart)
 
-    def capture_bg(self):
-        blit_to_buf(
-            ssd, self._bg_store.mvb, self.height, self.width, self.row, self.col
-        )  # store background
+    def stop(self):
+        if self.animator:
+            self.animator.stop()
 
     def update(self, row: int, col: int, visible: bool):
         self.row = row
         self.col = col
         self.visible = visible
+        self.layer.move(col, row)
+        self.layer.show(visible)
         self.draw = True
+        if not visible and self.screen is Screen.current_screen:
+            # the GUI skips show() of widgets that are not visible
+            self.compositor.compose()
 
     def show(self):  # Passive: no need to test show return value.
         if self.screen != Screen.current_screen:
             # Can occur if a control's action is to change screen.
             print("Sprite did not draw")
             return False  # Subclass abandons
-        self.draw = False
-        ssd.blit(self._bg_store, self._old_col, self._old_row)  # restore old background
-        blit_to_buf(  # store background in new pos
-            ssd, self._bg_store.mvb, self.height, self.width, self.row, self.col
-        )
-        if self.visible:
-            # ssd.palette.fg(WHITE)  # prepare for blitting
-            # ssd.palette.bg(self.bgcolor)
-            # blit with transparency if self.bgcolor matches the _sprite palette
-            ssd.blit(self._sprite, self.col, self.row, self.bgcolor)
-        self._old_row = self.row
-        self._old_col = self.col
+        if self.draw:
+            self.draw = False
+            self.compositor.compose()
+        else:
+            self.compositor.redraw()  # the screen is drawn anew
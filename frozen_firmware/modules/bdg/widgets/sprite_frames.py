@@ -0,0 +1,284 @@
+import asyncio
+import framebuf
+import random
+import time
+
+from bdg.utils import AProc
+
+
+class SpriteBuffer(framebuf.FrameBuffer):
+    def __init__(self, width, height):
+        buf = bytearray(height * width * 2)
+        self.mvb = memoryview(buf)
+        self.height = height  # Required by Writer class
+        self.width = width
+        self.mode = framebuf.RGB565
+        super().__init__(buf, width, height, framebuf.RGB565)
+
+    def from_image(self, image):
+        self.mvb[:] = image.data
+        return self
+
+
+class SpriteSheet:
+    """
+    Frames of width x height RGB565 pixels one after the other in data, in the
+    byte order of the display buffer like images of RGB565_I.
+
+    frame(i) returns frame i for ssd.blit() as (buffer, width, height,
+    format), the buffer a memoryview slice of data. The slices are made once,
+    nothing is copied.
+    """
+
+    def __init__(self, data, width, height):
+        self.width = width
+        self.height = height
+        size = width * height * 2
+        mv = memoryview(data)
+        self._frames = [
+            (mv[a : a + size], width, height, framebuf.RGB565) for a in range(0, len(data) - size + 1, size)
+        ]
+
+    def __len__(self):
+        return len(self._frames)
+
+    def frame(self, i):
+        return self._frames[i]
+
+    def blit(self, ssd, i, x, y, key=-1):
+        ssd.blit(self._frames[i], x, y, key)
+
+
+def scale_rgb565(src, width, height, scale, dst, swap=False):
+    # nearest neighbour, each pixel of src becomes scale x scale pixels of dst
+    # swap: src pixels are big-endian, as decoded for fill_rect()
+    run = scale * 2
+    drow = width * run
+    s = 0
+    d = 0
+    for _ in range(height):
+        a = d
+        for _ in range(width):
+            if swap:
+                px = bytes((src[s + 1], src[s]))
+            else:
+                px = bytes(src[s : s + 2])
+            dst[a : a + run] = px * scale
+            a += run
+            s += 2
+        row = dst[d : d + drow]
+        for _ in range(scale - 1):
+            d += drow
+            dst[d : d + drow] = row
+        d += drow
+
+
+class ScaledFrames:
+    """
+    Frames of a sprite sheet scaled by a whole factor, each scaled only once.
+
+    data holds the frames of width x height RGB565 pixels one after the other,
+    swap=True for big-endian pixels. frame(i) returns frame i scaled into a
+    SpriteBuffer of self.width x self.height, the scaled size. Scaled frames
+    are kept while they fit in budget bytes, the least recently used one goes
+    first and its buffer is reused, at least one is always kept. blit(ssd, i,
+    x, y) draws frame i with one ssd.blit(). clear() lets go of the scaled
+    frames.
+    """
+
+    def __init__(self, data, width, height, scale, budget=400 * 1024, swap=False):
+        self.data = memoryview(data)
+        self.src_width = width
+        self.src_height = height
+        self.width = width * scale
+        self.height = height * scale
+        self.scale = scale
+        self.swap = swap
+        self.size = width * height * 2
+        self.frames = len(data) // self.size
+        self.keep = max(1, budget // (self.size * scale * scale))
+        self._cache = {}  # frame: SpriteBuffer
+        self._used = []  # frames in _cache, least recently used first
+
+    def __len__(self):
+        return self.frames
+
+    def frame(self, i):
+        buf = self._cache.get(i)
+        if buf is not None:
+            if self._used[-1] != i:
+                self._used.remove(i)
+                self._used.append(i)
+            return buf
+        if len(self._used) >= self.keep:
+            buf = self._cache.pop(self._used.pop(0))
+        else:
+            buf = SpriteBuffer(self.width, self.height)
+        a = i * self.size
+        scale_rgb565(self.data[a : a + self.size], self.src_width, self.src_height, self.scale, buf.mvb, self.swap)
+        self._cache[i] = buf
+        self._used.append(i)
+        return buf
+
+    def blit(self, ssd, i, x, y, key=-1):
+        ssd.blit(self.frame(i), x, y, key)
+
+    def clear(self):
+        self._cache.clear()
+        self._used.clear()
+
+
+# playback modes of an Animation
+LOOP = 0
+BOUNCE = 1
+ONCE = 2
+RANDOM = 3
+
+
+class Animation:
+    """
+    A named sequence of frames of a sheet (SpriteSheet or ScaledFrames).
+
+    frames are the frame numbers in order, all of the sheet by default. ms is
+    how long each frame is shown, one for all or one per frame. mode is LOOP,
+    BOUNCE (back and forth), ONCE (stays on the last frame) or RANDOM.
+    """
+
+    def __init__(self, sheet, frames=None, ms=100, mode=LOOP):
+        self.sheet = sheet
+        self.frames = tuple(range(len(sheet))) if frames is None else tuple(frames)
+        self.ms = (ms,) * len(self.frames) if isinstance(ms, int) else tuple(ms)
+        self.mode = mode
+
+
+class Animator:
+    """
+    Plays the named animations of one sprite on the AnimationClock.
+
+    play(name) starts an animation from its first frame, unless it is the one
+    playing. on_frame(sheet, frame) is called from the clock with the frame
+    to draw, when a frame is due. stop() takes it off the clock, done is set
+    once an animation of mode ONCE got to its last frame.
+    """
+
+    def __init__(self, animations, on_frame):
+        self.animations = animations
+        self.on_frame = on_frame
+        self.name = None
+        self.anim = None
+        self.pos = 0
+        self.step = 1
+        self.due = 0
+        self.done = False
+
+    @property
+    def sheet(self):
+        return self.anim.sheet
+
+    @property
+    def frame(self):
+        return self.anim.frames[self.pos]
+
+    def play(self, name, restart=False):
+        if name == self.name and not restart and not self.done:
+            return
+        self.name = name
+        self.anim = self.animations[name]
+        self.pos = 0
+        self.step = 1
+        self.done = False
+        self.due = time.ticks_add(time.ticks_ms(), self.anim.ms[0])
+        self.on_frame(self.anim.sheet, self.anim.frames[0])
+        AnimationClock.add(self)
+
+    def stop(self):
+        AnimationClock.remove(self)
+
+    def _next(self):
+        anim = self.anim
+        n = len(anim.frames)
+        if n < 2:
+            self.done = True
+            return False
+        if anim.mode == LOOP:
+            self.pos = (self.pos + 1) % n
+        elif anim.mode == BOUNCE:
+            if not 0 <= self.pos + self.step < n:
+                self.step = -self.step
+            self.pos += self.step
+        elif anim.mode == RANDOM:
+            self.pos = random.randrange(n)
+        elif self.pos + 1 < n:
+            self.pos += 1
+        else:
+            self.done = True
+            return False
+        return True
+
+    def tick(self, now):
+        # the next frame if it is due, False once there is nothing more
+        if time.ticks_diff(self.due, now) > 0:
+            return True
+        if self.done or not self._next():
+            return False
+        ms = self.anim.ms[self.pos]
+        self.due = time.ticks_add(self.due, ms)
+        if time.ticks_diff(self.due, now) <= 0:
+            self.due = time.ticks_add(now, ms)  # behind, go on from now
+        self.on_frame(self.anim.sheet, self.anim.frames[self.pos])
+        return True
+
+
+class AnimationClock(AProc):
+    """
+    The one task that advances every playing Animator.
+
+    It sleeps until the next frame of any of them is due, at least min_ms,
+    and ends when none is left. Animators add and remove themselves, one due
+    before the clock wakes up restarts its sleep.
+    """
+
+    _animators = []
+    _wake = 0  # ticks_ms the task sleeps until
+    _ticking = False
+    min_ms = 10
+
+    @classmethod
+    def add(cls, animator):
+        if animator not in cls._animators:
+            cls._animators.append(animator)
+        if cls._ticking:
+            return  # from on_frame, the task looks at it before it sleeps
+        if cls.is_running() and time.ticks_diff(animator.due, cls._wake) < 0:
+            cls._task.cancel()
+            cls._task = None
+        cls.start(task=True)
+
+    @classmethod
+    def remove(cls, animator):
+        if animator in cls._animators:
+            cls._animators.remove(animator)
+
+    @classmethod
+    async def task(cls):
+        animators = cls._animators
+        while animators:
+            now = time.ticks_ms()
+            cls._ticking = True
+            try:
+                i = len(animators)
+                while i:
+                    i -= 1
+                    if not animators[i].tick(now):
+                        del animators[i]
+            finally:
+                cls._ticking = False
+            wait = 1000
+            for a in animators:
+                left = time.ticks_diff(a.due, now)
+                if left < wait:
+                    wait = left
+            if wait < cls.min_ms:
+                wait = cls.min_ms
+            cls._wake = time.ticks_add(now, wait)
+            await asyncio.sleep_ms(wait)